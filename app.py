@@ -7,49 +7,39 @@ Este script crea un archivo .docx separado para cada estudiante, nombrado
 con su apellido y nombre para máxima organización.
 """
 
-import pandas as pd
-from docx import Document
+import arranque  # Primero: marca el inicio para --startup-timing
 from pathlib import Path
 import os
 import sys
-import re
 import argparse # Usar argparse para argumentos de línea de comandos
 
+# Solo módulos livianos al cargar; pandas, openpyxl y python-docx se importan en main()
+import perfilado
+import exportar_pdf
+import reglas_validacion
+from archivos import NIVEL_COMPRESION
+from manifiesto import Manifiesto
+from diario import NOMBRE_INFORME, Diario, InformeErrores
+from reglas_validacion import NOMBRE_INFORME_VALIDACION
+from nombres import CAMPOS, PARTICIONES, PLANTILLA_NOMBRE, ErrorNombre, Nombrador
+from exportar_pdf import PoolPdf, esperar, ruta_pdf
+from contexto import MARKERS
+
 # --- CONFIGURACIÓN DE ARCHIVOS ---
 BASE_DIR = Path(__file__).parent
 EXCEL_FILE = BASE_DIR / "otro.xlsx"
 TEMPLATE_DOCX = BASE_DIR / "plantilla.docx"
 
-# --- NOMBRES DE LAS COLUMNAS EN EXCEL ---
-COL_CEDULA = "CÉDULA DEL ESTUDIANTE"
-COL_ID = "ID ESTUDIANTE"
-COL_APELLIDOS = "APELLIDOS"
-COL_NOMBRES = "NOMBRES"
-COL_CARRERA = "CARRERA"
-COL_TEMA = "TEMA"
-COL_TRIB1 = "TRL1"
-COL_TRIB2 = "TRL2"
-COL_TRIB3 = "TRL3"
-
-def reemplazar_texto(doc, replacements):
-    """Busca y reemplaza los marcadores de texto en el documento."""
-    for p in doc.paragraphs:
-        for key, value in replacements.items():
-            if key in p.text:
-                for run in p.runs:
-                    run.text = run.text.replace(key, str(value))
-    for table in doc.tables:
-        for row in table.rows:
-            for cell in row.cells:
-                for p in cell.paragraphs:
-                    for key, value in replacements.items():
-                        if key in p.text:
-                            for run in p.runs:
-                                run.text = run.text.replace(key, str(value))
-
-def main(output_dir):
+def main(output_dir, workers=1, incremental=False, eliminar_obsoletos=False, bloque=0,
+         pdf=False, pdf_workers=2, convertidor="unoserver", compresion=NIVEL_COMPRESION, reanudar=False,
+         nombre=PLANTILLA_NOMBRE, particion=None, empaquetar=False, por_zip=0, validacion="informar"):
     """Función principal del script."""
     # 1. VERIFICAR ARCHIVOS DE ENTRADA
+    try:
+        nombrador = Nombrador(nombre, particion)
+    except ErrorNombre as e:
+        print(f"Error: {e}")
+        sys.exit(1)
     if not os.path.exists(EXCEL_FILE):
         print(f"Error Crítico: No se encuentra el archivo Excel: {EXCEL_FILE}")
         sys.exit(1)
@@ -60,56 +50,198 @@ def main(output_dir):
     # Crear la carpeta de salida si no existe
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    # 2. LEER EL ARCHIVO EXCEL
+    # Módulos pesados: recién ahora que se van a usar
+    arranque.importar_pesados("plantilla", "paralelo", "pipeline", "contexto", "ingesta", "validacion")
+    from plantilla import PlantillaCompilada
+    from paralelo import Generador
+    from pipeline import encadenar
+    from contexto import iterar_contextos
+    from ingesta import ColumnasFaltantes, iterar_bloques, leer_estudiantes, verificar_columnas
+    from paquetes import PaqueteZip
+    from validacion import crear_validador
+
+    # Validación previa: en modo estricto, las filas con errores no se renderizan
+    validador = crear_validador(validacion)
+
+    # 2. LEER EL ARCHIVO EXCEL (solo las columnas requeridas) Y VERIFICAR COLUMNAS
     try:
-        df = pd.read_excel(EXCEL_FILE, header=0)
-        df.columns = df.columns.str.strip()
+        if bloque:
+            # Modo streaming: el Excel se lee por bloques mientras se generan los documentos
+            verificar_columnas(EXCEL_FILE)
+            lotes = iterar_bloques(EXCEL_FILE, bloque)
+            if validador is not None:
+                lotes = map(validador.validar, lotes)
+            print(f"Procesando el Excel en bloques de {bloque} filas. Generando documentos individuales...")
+        else:
+            filas_validas = leer_estudiantes(EXCEL_FILE)
+            if filas_validas.empty:
+                print("Advertencia: No se encontraron estudiantes con cédula.")
+                return
+            if validador is not None:
+                filas_validas = validador.validar(filas_validas)
+                for linea in validador.resumen():
+                    print(f"Validación: {linea}")
+                if filas_validas.empty:
+                    ruta_validacion = validador.guardar(output_dir / NOMBRE_INFORME_VALIDACION)
+                    print(f"Error: Ninguna fila pasó la validación; detalle en: {ruta_validacion.resolve()}")
+                    print("Use --validacion informar para generarlas de todos modos.")
+                    sys.exit(1)
+            lotes = [filas_validas]
+            print(f"Se encontraron {len(filas_validas)} estudiantes. Generando documentos individuales...")
+    except ColumnasFaltantes as e:
+        print(f"Error: Faltan las siguientes columnas en 'otro.xlsx': {e.faltantes}")
+        sys.exit(1)
     except Exception as e:
         print(f"Error al leer el archivo Excel: {e}")
         sys.exit(1)
 
-    # 3. VERIFICAR COLUMNAS
-    required_cols = [COL_CEDULA, COL_ID, COL_APELLIDOS, COL_NOMBRES, COL_CARRERA, COL_TEMA, COL_TRIB1, COL_TRIB2, COL_TRIB3]
-    missing_cols = [col for col in required_cols if col not in df.columns]
-    if missing_cols:
-        print(f"Error: Faltan las siguientes columnas en 'otro.xlsx': {missing_cols}")
-        sys.exit(1)
+    # La plantilla se parsea una sola vez para todo el lote
+    plantilla = PlantillaCompilada(TEMPLATE_DOCX)
+    for mensaje in plantilla.advertencias(MARKERS):
+        print(f"Advertencia: {mensaje}")
 
-    # 4. PROCESAR CADA ESTUDIANTE
-    filas_validas = df.dropna(subset=[COL_CEDULA]).copy()
-    if filas_validas.empty:
-        print("Advertencia: No se encontraron estudiantes con cédula.")
-        return
+    # Exportación a PDF: los convertidores arrancan ya y trabajan durante la generación
+    pool_pdf = None
+    if pdf:
+        try:
+            pool_pdf = PoolPdf(convertidor, pdf_workers)
+        except RuntimeError as e:
+            print(f"Error Crítico: {e}")
+            sys.exit(1)
+    conversiones = []
 
-    print(f"Se encontraron {len(filas_validas)} estudiantes. Generando documentos individuales...")
+    # Modo incremental: solo las filas nuevas o modificadas desde la última ejecución
+    manifiesto = Manifiesto(output_dir, plantilla.datos) if incremental else None
+    archivos = set()
+    total, saltados = 0, 0
 
-    for index, row in filas_validas.iterrows():
-        replacements = {
-            "{{NOMBRE_COMPLETO}}": f"{row.get(COL_NOMBRES, '')} {row.get(COL_APELLIDOS, '')}".strip(),
-            "{{CEDULA}}": str(row.get(COL_CEDULA, '')).strip(),
-            "{{TEMA}}": str(row.get(COL_TEMA, '')).strip().capitalize(),
-            "{{ID}}": str(row.get(COL_ID, '')).strip(),
-            "{{CARRERA}}": str(row.get(COL_CARRERA, '')).strip(),
-            "{{TRIBUNAL_1}}": str(row.get(COL_TRIB1, '')) if pd.notna(row.get(COL_TRIB1)) else "",
-            "{{TRIBUNAL_2}}": str(row.get(COL_TRIB2, '')) if pd.notna(row.get(COL_TRIB2)) else "",
-            "{{TRIBUNAL_3}}": str(row.get(COL_TRIB3, '')) if pd.notna(row.get(COL_TRIB3)) else "",
-        }
+    # Diario de filas completadas (para --resume) e informe de las que fallen
+    diario = Diario(output_dir, plantilla.datos, reanudar)
+    informe = InformeErrores(output_dir / NOMBRE_INFORME)
 
-        doc = Document(TEMPLATE_DOCX)
-        reemplazar_texto(doc, replacements)
+    carpetas = {output_dir}
 
-        nombre_archivo = f"Notificacion_{replacements['{{NOMBRE_COMPLETO}}']}.docx"
-        nombre_archivo_seguro = re.sub(r'[^a-zA-Z0-9_\.]', '_', nombre_archivo)
-        ruta_salida = output_dir / nombre_archivo_seguro
+    def preparar(lote):
+        """Bloque de filas → tareas (replacements, ruta) pendientes de generar."""
+        nonlocal total, saltados
+        tareas = []
+        for replacements in iterar_contextos(lote):
+            relativa = nombrador.ruta(replacements)
+            archivos.add(relativa)
+            tareas.append((replacements, output_dir / relativa))
+        total += len(tareas)
+        if not empaquetar:
+            # Subcarpetas de la partición (una sola vez cada una)
+            for _, ruta in tareas:
+                if ruta.parent not in carpetas:
+                    ruta.parent.mkdir(parents=True, exist_ok=True)
+                    carpetas.add(ruta.parent)
+        if manifiesto is not None:
+            tareas = manifiesto.pendientes(tareas)
+        # Con --resume, las filas que ya se completaron antes del corte
+        tareas, hechas = diario.pendientes(tareas)
+        saltados += len(hechas)
+        if manifiesto is not None:
+            for replacements, ruta in hechas:
+                manifiesto.registrar(replacements, ruta)
+        return tareas
 
-        try:
-            doc.save(ruta_salida)
-            print(f"- Generado: {nombre_archivo_seguro}")
-        except Exception as e:
-            print(f"- ERROR al guardar para {replacements['{{NOMBRE_COMPLETO}}']}: {e}")
+    # 3. PROCESAR CADA ESTUDIANTE: lectura y preparación en hilos; renderizado y
+    #    guardado (en paralelo si workers > 1) a medida que llegan los bloques
+    generados, completo = 0, False
+    paquete = PaqueteZip(output_dir, por_zip=por_zip) if empaquetar else None
+    try:
+        with Generador(plantilla, workers, compresion) as generador:
+            for tareas in encadenar(lotes, preparar):
+                if paquete is not None:
+                    # Directo al zip: los documentos no pasan por archivos sueltos
+                    for (replacements, ruta_salida), datos, error in generador.renderizar(tareas):
+                        if error is None:
+                            paquete.agregar(ruta_salida.relative_to(output_dir).as_posix(), datos)
+                            generados += 1
+                        else:
+                            informe.agregar(replacements, error, ruta_salida)
+                            print(f"- ERROR al generar para {replacements['{{NOMBRE_COMPLETO}}']}: {error}")
+                    continue
+                for (replacements, ruta_salida), error in generador.generar(tareas):
+                    if error is None:
+                        generados += 1
+                        diario.registrar(replacements, ruta_salida)
+                        if manifiesto is not None:
+                            manifiesto.registrar(replacements, ruta_salida)
+                        if pool_pdf is not None:
+                            conversiones.append((ruta_salida, pool_pdf.enviar(ruta_salida)))
+                        print(f"- Generado: {ruta_salida.relative_to(output_dir).as_posix()}")
+                    else:
+                        informe.agregar(replacements, error, ruta_salida)
+                        print(f"- ERROR al guardar para {replacements['{{NOMBRE_COMPLETO}}']}: {error}")
+        if paquete is not None:
+            for ruta in paquete.cerrar():
+                print(f"- Paquete: {ruta.name}")
+        completo = len(informe) == 0
+
+        if pool_pdf is not None:
+            # En modo incremental, también los documentos sin regenerar que aún no tienen PDF
+            enviados = {ruta for ruta, _ in conversiones}
+            for relativa in sorted(archivos):
+                ruta = output_dir / relativa
+                if ruta not in enviados and ruta.exists() and not ruta_pdf(ruta).exists():
+                    conversiones.append((ruta, pool_pdf.enviar(ruta)))
+            print(f"\nEsperando la conversión a PDF de {len(conversiones)} documentos...")
+            pdf_ok = 0
+            for ruta, futuro in conversiones:
+                error = esperar(futuro)
+                if error is None:
+                    pdf_ok += 1
+                else:
+                    print(f"- ERROR al convertir a PDF {ruta.name}: {error}")
+            print(f"Se exportaron {pdf_ok} de {len(conversiones)} documentos a PDF.")
+    finally:
+        if paquete is not None:
+            paquete.abortar()  # Solo si quedó uno a medio escribir
+        if pool_pdf is not None:
+            pool_pdf.cerrar(cancelar=True)
+        # Si el lote no terminó (o hubo errores), el diario queda para --resume
+        diario.cerrar(completo)
+        ruta_informe = informe.guardar()
+        if ruta_informe is not None:
+            print(f"\n{len(informe)} filas con errores; detalle en: {ruta_informe.resolve()}")
+            print("Corrija el problema y vuelva a ejecutar con --resume para generar solo las que faltan.")
+        if validador is not None:
+            ruta_validacion = validador.guardar(output_dir / NOMBRE_INFORME_VALIDACION)
+            lineas = validador.resumen()
+            if bloque:
+                # En streaming, el resumen recién está completo al final
+                for linea in lineas:
+                    print(f"Validación: {linea}")
+            if lineas:
+                print(f"Informe de validación: {ruta_validacion.resolve()}")
+
+    if validador is not None and validador.ninguna_valida:
+        # En streaming recién se sabe al final que no pasó ninguna fila
+        print("Error: Ninguna fila pasó la validación. Use --validacion informar para generarlas de todos modos.")
+        sys.exit(1)
+    if total == 0:
+        print("Advertencia: No se encontraron estudiantes con cédula.")
+        return
+
+    if manifiesto is not None:
+        print(f"Modo incremental: {total - generados} de {total} documentos sin regenerar.")
+        if eliminar_obsoletos:
+            for ruta in manifiesto.eliminar_obsoletos(archivos):
+                print(f"- Eliminado (ya no está en el Excel): {ruta.name}")
+                ruta_pdf(ruta).unlink(missing_ok=True)
+        manifiesto.guardar()
 
+    if nombrador.colisiones:
+        print(f"Se resolvieron {nombrador.colisiones} nombres de archivo repetidos (se agregó _2, _3...).")
+    if saltados:
+        print(f"Reanudación: {saltados} documentos ya estaban generados en la ejecución anterior.")
     print(f"\n¡ÉXITO! Proceso completado.")
-    print(f"Se han guardado {len(filas_validas)} documentos en la carpeta: {output_dir.resolve()}")
+    if paquete is not None:
+        print(f"Se han empaquetado {generados} documentos en {len(paquete.rutas)} archivos .zip en la carpeta: {output_dir.resolve()}")
+    else:
+        print(f"Se han guardado {generados} documentos en la carpeta: {output_dir.resolve()}")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Genera documentos de Word individuales para notificaciones a estudiantes.")
@@ -118,5 +250,77 @@ if __name__ == "__main__":
         default=BASE_DIR / "Notificaciones_Generadas",
         help="Directorio donde se guardarán los archivos generados. Por defecto, 'Notificaciones_Generadas'."
     )
+    parser.add_argument(
+        "-w", "--workers",
+        type=int,
+        default=1,
+        help="Número de procesos en paralelo para generar los documentos (0 = todos los núcleos). Por defecto, 1."
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Regenera solo los estudiantes nuevos o modificados según el manifiesto de la carpeta de salida."
+    )
+    parser.add_argument(
+        "--eliminar_obsoletos",
+        action="store_true",
+        help="Con --incremental, elimina los documentos de estudiantes que ya no están en el Excel."
+    )
+    parser.add_argument(
+        "--bloque",
+        type=int,
+        default=0,
+        help="Lee y procesa el Excel en streaming, en bloques de N filas (memoria acotada para listas muy grandes)."
+    )
+    parser.add_argument(
+        "--compresion",
+        type=int,
+        choices=range(10),
+        default=NIVEL_COMPRESION,
+        metavar="0-9",
+        help=f"Nivel de compresión de las partes generadas (0 = más rápido, 9 = más pequeño). Por defecto, {NIVEL_COMPRESION}."
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Reanuda una ejecución interrumpida: salta las filas ya generadas según el diario de la carpeta de salida."
+    )
+    parser.add_argument(
+        "--nombre",
+        default=PLANTILLA_NOMBRE,
+        help=f"Plantilla del nombre de archivo con campos entre llaves ({', '.join(CAMPOS)}). Por defecto, '{PLANTILLA_NOMBRE}'."
+    )
+    parser.add_argument(
+        "--particion",
+        choices=PARTICIONES,
+        help="Reparte los documentos en subcarpetas por carrera o por prefijo de hash (para lotes enormes)."
+    )
+    parser.add_argument(
+        "--zip",
+        action="store_true",
+        help="Escribe los documentos directamente dentro de paquetes .zip en lugar de archivos sueltos."
+    )
+    parser.add_argument(
+        "--por_zip",
+        type=int,
+        default=0,
+        help="Con --zip, máximo de documentos por paquete (0 = un solo paquete)."
+    )
+    reglas_validacion.agregar_argumentos(parser)
+    exportar_pdf.agregar_argumentos(parser)
+    perfilado.agregar_argumentos(parser)
+    arranque.agregar_argumento(parser)
     args = parser.parse_args()
-    main(Path(args.output_dir))
\ No newline at end of file
+    if args.zip and (args.incremental or args.resume or args.pdf):
+        parser.error("--zip no se puede combinar con --incremental, --resume ni --pdf (necesitan los archivos sueltos).")
+    arranque.marcar("argumentos listos")
+    try:
+        perfilado.ejecutar(
+            args, main, Path(args.output_dir), args.workers, args.incremental, args.eliminar_obsoletos, args.bloque,
+            args.pdf, args.pdf_workers, args.convertidor, args.compresion, args.resume,
+            args.nombre, args.particion, args.zip, args.por_zip, args.validacion
+        )
+    finally:
+        if args.startup_timing:
+            arranque.marcar("fin")
+            print(f"\n--- Arranque ---\n{arranque.reporte()}")
\ No newline at end of file
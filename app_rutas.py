@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+"""
+Genera TODAS las salidas de un archivo de rutas (rutas.json) en UNA SOLA
+pasada por 'otro.xlsx': documentos individuales y consolidados, con distintas
+plantillas según la carrera u otras columnas (ver rutas.py).
+
+En lugar de ejecutar app.py / app_unidoc.py una vez por formato (releyendo el
+Excel cada vez), cada bloque de filas se enruta a todas sus salidas y cada
+plantilla distinta se compila una sola vez.
+"""
+
+import arranque  # Primero: marca el inicio para --startup-timing
+from pathlib import Path
+import os
+import sys
+import argparse
+import tempfile
+
+# Solo módulos livianos al cargar; pandas, openpyxl y python-docx se importan en main()
+import perfilado
+import reglas_validacion
+from archivos import NIVEL_COMPRESION
+from nombres import Nombrador, transliterar
+from diario import NOMBRE_INFORME, InformeErrores
+from reglas_validacion import NOMBRE_INFORME_VALIDACION
+from contexto import MARKERS
+
+# --- CONFIGURACIÓN DE ARCHIVOS ---
+BASE_DIR = Path(__file__).parent
+EXCEL_FILE = BASE_DIR / "otro.xlsx"
+RUTAS_JSON = BASE_DIR / "rutas.json"
+
+def nombre_consolidado(salida, grupo=None, usados=None):
+    """
+    Nombre seguro (sin acentos) del documento consolidado de una salida y su
+    grupo. Con `usados` (rutas ya asignadas, en minúsculas) los nombres que
+    coincidan reciben _2, _3...
+    """
+    nombre = salida.nombre if salida.agrupar is None else f"{salida.nombre}_{grupo or 'sin_valor'}"
+    base = transliterar(nombre) or "consolidado"
+    if usados is None:
+        return f"{base}.docx"
+    archivo, n = f"{base}.docx", 2
+    while f"{salida.carpeta}/{archivo}".casefold() in usados:
+        archivo = f"{base}_{n}.docx"
+        n += 1
+    usados.add(f"{salida.carpeta}/{archivo}".casefold())
+    return archivo
+
+def main(rutas_json, output_dir, workers=1, bloque=0, compresion=NIVEL_COMPRESION, validacion="informar"):
+    """Función principal del script."""
+    # 1. VERIFICAR ARCHIVOS DE ENTRADA Y RUTAS
+    if not os.path.exists(EXCEL_FILE):
+        print(f"Error Crítico: No se encuentra el archivo Excel: {EXCEL_FILE}")
+        sys.exit(1)
+
+    # Módulos pesados: recién ahora que se van a usar
+    arranque.importar_pesados("rutas", "plantilla", "paralelo", "consolidado", "pipeline", "contexto", "ingesta", "validacion")
+    from rutas import ErrorRutas, cargar_rutas
+    from plantilla import PlantillaCompilada
+    from paralelo import Generador
+    from consolidado import EscritorConsolidado, renderizar_fragmento
+    from pipeline import encadenar
+    from contexto import columnas_de_contexto, contextos_de_columnas
+    from ingesta import ColumnasFaltantes, iterar_bloques, leer_estudiantes, verificar_columnas
+    from perfilado import medir
+    from validacion import crear_validador
+
+    try:
+        salidas = cargar_rutas(rutas_json)
+    except OSError as e:
+        print(f"Error Crítico: No se puede leer el archivo de rutas: {e}")
+        sys.exit(1)
+    except ErrorRutas as e:
+        print(f"Error en el archivo de rutas: {e}")
+        sys.exit(1)
+    for salida in salidas:
+        if not salida.plantilla.exists():
+            print(f"Error Crítico: No se encuentra la plantilla de '{salida.nombre}': {salida.plantilla}")
+            sys.exit(1)
+        (output_dir / salida.carpeta).mkdir(parents=True, exist_ok=True)
+
+    # Misma validación previa que app.py (y la misma cédula normalizada)
+    validador = crear_validador(validacion)
+
+    # 2. LEER EL ARCHIVO EXCEL UNA SOLA VEZ (completo o por bloques)
+    try:
+        if bloque:
+            verificar_columnas(EXCEL_FILE)
+            lotes = iterar_bloques(EXCEL_FILE, bloque)
+            if validador is not None:
+                lotes = map(validador.validar, lotes)
+            print(f"Procesando el Excel en bloques de {bloque} filas para {len(salidas)} salidas...")
+        else:
+            filas_validas = leer_estudiantes(EXCEL_FILE)
+            if filas_validas.empty:
+                print("Advertencia: No se encontraron estudiantes con cédula.")
+                return
+            if validador is not None:
+                filas_validas = validador.validar(filas_validas)
+                for linea in validador.resumen():
+                    print(f"Validación: {linea}")
+                if filas_validas.empty:
+                    ruta_validacion = validador.guardar(output_dir / NOMBRE_INFORME_VALIDACION)
+                    print(f"Error: Ninguna fila pasó la validación; detalle en: {ruta_validacion.resolve()}")
+                    print("Use --validacion informar para generarlas de todos modos.")
+                    sys.exit(1)
+            lotes = [filas_validas]
+            print(f"Se encontraron {len(filas_validas)} estudiantes. Generando {len(salidas)} salidas...")
+    except ColumnasFaltantes as e:
+        print(f"Error: Faltan las siguientes columnas en 'otro.xlsx': {e.faltantes}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error al leer el archivo Excel: {e}")
+        sys.exit(1)
+
+    # 3. PLANTILLAS: cada archivo distinto se compila una sola vez
+    plantillas = {}
+    for salida in salidas:
+        clave = str(salida.plantilla)
+        if clave not in plantillas:
+            plantillas[clave] = PlantillaCompilada(salida.plantilla)
+            # Los consolidados comparten encabezados, pies y notas de la plantilla
+            consolidado = any(s.modo == "consolidado" and str(s.plantilla) == clave for s in salidas)
+            for mensaje in plantillas[clave].advertencias(MARKERS, consolidado):
+                print(f"Advertencia ({salida.plantilla.name}): {mensaje}")
+    individuales = {str(s.plantilla): plantillas[str(s.plantilla)] for s in salidas if s.modo == "individual"}
+    # Nombres únicos dentro de cada salida (los repetidos reciben _2, _3...)
+    nombradores = {s.nombre: Nombrador() for s in salidas if s.modo == "individual"}
+
+    def preparar(lote):
+        """Bloque de filas → (tareas individuales, fragmentos consolidados, filas)."""
+        with medir("enrutamiento"):
+            columnas = columnas_de_contexto(lote)
+            mascaras = [salida.mascara(columnas).tolist() for salida in salidas]
+            contextos = list(contextos_de_columnas(columnas))
+        tareas, fragmentos = [], []
+        for i, replacements in enumerate(contextos):
+            for salida, mascara in zip(salidas, mascaras):
+                if not mascara[i]:
+                    continue
+                if salida.modo == "individual":
+                    ruta = output_dir / salida.carpeta / nombradores[salida.nombre].ruta(replacements)
+                    tareas.append((replacements, ruta, str(salida.plantilla)))
+                else:
+                    fragmentos.append((salida, replacements))
+        return tareas, fragmentos, len(contextos)
+
+    # 4. UNA PASADA: cada bloque se reparte entre todas sus salidas.
+    #    Los consolidados sin agrupar se escriben en streaming (un escritor por
+    #    salida). Los agrupados pueden tener miles de grupos: sus fragmentos se
+    #    acumulan en un único temporal y cada documento se escribe al final, de
+    #    a uno, para no tener abiertos tantos archivos como grupos.
+    total = 0
+    generados = {}  # carpeta → documentos individuales generados
+    escritores = {}  # salida → EscritorConsolidado abierto
+    grupos = {}  # (salida, grupo en minúsculas) → (salida, ruta, [(posición, largo)...])
+    consolidados = []  # (ruta, estudiantes) de los documentos terminados
+    usados = set()
+    informe = InformeErrores(output_dir / NOMBRE_INFORME)
+    try:
+        with Generador(individuales, workers if individuales else 1, compresion) as generador, \
+                tempfile.TemporaryFile(dir=output_dir) as acumulados:
+            for tareas, fragmentos, filas in encadenar(lotes, preparar):
+                total += filas
+                for (replacements, ruta_salida, _), error in generador.generar(tareas):
+                    if error is None:
+                        carpeta = ruta_salida.parent.name
+                        generados[carpeta] = generados.get(carpeta, 0) + 1
+                        print(f"- Generado: {carpeta}/{ruta_salida.name}")
+                    else:
+                        informe.agregar(replacements, error, ruta_salida)
+                        print(f"- ERROR al guardar para {replacements['{{NOMBRE_COMPLETO}}']}: {error}")
+                for salida, replacements in fragmentos:
+                    try:
+                        fragmento = renderizar_fragmento(plantillas[str(salida.plantilla)], replacements)
+                    except Exception as e:
+                        # Una fila con problemas no detiene ninguna salida
+                        informe.agregar(replacements, e)
+                        print(f"- ERROR en '{salida.nombre}' para {replacements['{{NOMBRE_COMPLETO}}']}: {e}")
+                        continue
+                    if salida.agrupar is None:
+                        escritor = escritores.get(salida.nombre)
+                        if escritor is None:
+                            ruta = output_dir / salida.carpeta / nombre_consolidado(salida, usados=usados)
+                            escritor = EscritorConsolidado(plantillas[str(salida.plantilla)], ruta, compresion)
+                            escritores[salida.nombre] = escritor
+                        escritor.escribir(fragmento)
+                        continue
+                    # Los grupos se comparan como las reglas si/no: sin mayúsculas ni espacios
+                    grupo = replacements[salida.agrupar].strip()
+                    clave = (salida.nombre, grupo.casefold())
+                    if clave not in grupos:
+                        ruta = output_dir / salida.carpeta / nombre_consolidado(salida, grupo, usados)
+                        grupos[clave] = (salida, ruta, [])
+                    grupos[clave][2].append((acumulados.tell(), len(fragmento)))
+                    acumulados.write(fragmento)
+
+            for escritor in escritores.values():
+                escritor.cerrar()
+                consolidados.append((escritor.ruta_salida, escritor.total))
+            escritores.clear()
+            with medir("consolidados_agrupados"):
+                for salida, ruta, posiciones in grupos.values():
+                    with EscritorConsolidado(plantillas[str(salida.plantilla)], ruta, compresion) as escritor:
+                        for posicion, largo in posiciones:
+                            acumulados.seek(posicion)
+                            escritor.escribir(acumulados.read(largo))
+                    consolidados.append((ruta, escritor.total))
+    except BaseException:
+        # Los consolidados a medio escribir se eliminan
+        for escritor in escritores.values():
+            escritor.abortar()
+        raise
+    finally:
+        ruta_informe = informe.guardar()
+        if validador is not None:
+            ruta_validacion = validador.guardar(output_dir / NOMBRE_INFORME_VALIDACION)
+            lineas = validador.resumen()
+            if bloque:
+                # En streaming, el resumen recién está completo al final
+                for linea in lineas:
+                    print(f"Validación: {linea}")
+            if lineas:
+                print(f"Informe de validación: {ruta_validacion.resolve()}")
+
+    print("\nResumen por salida:")
+    for carpeta, n in generados.items():
+        print(f"- {carpeta}/: {n} documentos individuales")
+    for ruta, n in consolidados:
+        print(f"- {ruta.parent.name}/{ruta.name}: {n} estudiantes")
+
+    if validador is not None and validador.ninguna_valida:
+        # En streaming recién se sabe al final que no pasó ninguna fila
+        print("Error: Ninguna fila pasó la validación. Use --validacion informar para generarlas de todos modos.")
+        sys.exit(1)
+    if total == 0:
+        print("Advertencia: No se encontraron estudiantes con cédula.")
+        return
+
+    print(f"\n¡ÉXITO! Proceso completado ({total} estudiantes leídos una sola vez).")
+    if ruta_informe is not None:
+        print(f"{len(informe)} filas con errores no se generaron; detalle en: {ruta_informe.resolve()}")
+    print(f"Salidas guardadas en la carpeta: {output_dir.resolve()}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera todas las salidas de un archivo de rutas en una sola pasada por el Excel.")
+    parser.add_argument(
+        "-r", "--rutas",
+        default=RUTAS_JSON,
+        help="Archivo JSON con las salidas y sus reglas. Por defecto, 'rutas.json'."
+    )
+    parser.add_argument(
+        "-o", "--output_dir",
+        default=BASE_DIR / "Notificaciones_Generadas",
+        help="Directorio base de las salidas. Por defecto, 'Notificaciones_Generadas'."
+    )
+    parser.add_argument(
+        "-w", "--workers",
+        type=int,
+        default=1,
+        help="Número de procesos en paralelo para los documentos individuales (0 = todos los núcleos). Por defecto, 1."
+    )
+    parser.add_argument(
+        "--bloque",
+        type=int,
+        default=0,
+        help="Lee y procesa el Excel en streaming, en bloques de N filas (memoria acotada para listas muy grandes)."
+    )
+    parser.add_argument(
+        "--compresion",
+        type=int,
+        choices=range(10),
+        default=NIVEL_COMPRESION,
+        metavar="0-9",
+        help=f"Nivel de compresión de los documentos (0 = más rápido, 9 = más pequeño). Por defecto, {NIVEL_COMPRESION}."
+    )
+    reglas_validacion.agregar_argumentos(parser)
+    perfilado.agregar_argumentos(parser)
+    arranque.agregar_argumento(parser)
+    args = parser.parse_args()
+    arranque.marcar("argumentos listos")
+    try:
+        perfilado.ejecutar(
+            args, main, Path(args.rutas), Path(args.output_dir), args.workers, args.bloque, args.compresion,
+            args.validacion
+        )
+    finally:
+        if args.startup_timing:
+            arranque.marcar("fin")
+            print(f"\n--- Arranque ---\n{arranque.reporte()}")
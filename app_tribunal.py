@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Genera UN DOCUMENTO POR CADA MIEMBRO DEL TRIBUNAL (TRL1, TRL2 y TRL3) con las
+notificaciones de todos los estudiantes que tiene asignados, cada una en su
+propia página, a partir de 'plantilla.docx' y 'otro.xlsx'.
+
+El Excel se recorre una sola vez para armar el índice profesor → estudiantes
+(ver tribunal.py) y los documentos de los profesores se escriben en paralelo.
+"""
+
+import arranque  # Primero: marca el inicio para --startup-timing
+from pathlib import Path
+import os
+import sys
+import argparse
+
+# Solo módulos livianos al cargar; pandas, openpyxl y python-docx se importan en main()
+import perfilado
+import reglas_validacion
+from archivos import NIVEL_COMPRESION
+from nombres import transliterar
+from reglas_validacion import NOMBRE_INFORME_VALIDACION
+from contexto import MARKERS
+
+# --- CONFIGURACIÓN DE ARCHIVOS ---
+BASE_DIR = Path(__file__).parent
+EXCEL_FILE = BASE_DIR / "otro.xlsx"
+TEMPLATE_DOCX = BASE_DIR / "plantilla.docx"
+
+def nombre_de_resumen(profesor, usados=None):
+    """
+    Nombre seguro (sin acentos) del .docx de un profesor. Con `usados`
+    (nombres ya asignados, en minúsculas) los que coincidan reciben _2, _3...
+    """
+    base = transliterar(f"Tribunal_{profesor}")
+    if usados is None:
+        return f"{base}.docx"
+    nombre, n = f"{base}.docx", 2
+    while nombre.casefold() in usados:
+        nombre = f"{base}_{n}.docx"
+        n += 1
+    usados.add(nombre.casefold())
+    return nombre
+
+def main(output_dir, workers=1, bloque=0, compresion=NIVEL_COMPRESION, validacion="informar"):
+    """Función principal del script."""
+    # 1. VERIFICAR ARCHIVOS DE ENTRADA
+    for f, tag in ((EXCEL_FILE, "el archivo Excel"), (TEMPLATE_DOCX, "la plantilla de Word")):
+        if not os.path.exists(f):
+            print(f"Error Crítico: No se encuentra {tag}: {f}")
+            sys.exit(1)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # Módulos pesados: recién ahora que se van a usar
+    arranque.importar_pesados("plantilla", "tribunal", "contexto", "ingesta", "validacion")
+    from plantilla import PlantillaCompilada
+    from tribunal import generar_resumenes, indexar
+    from contexto import iterar_contextos
+    from ingesta import ColumnasFaltantes, iterar_bloques, leer_estudiantes, verificar_columnas
+    from perfilado import medir
+    from validacion import crear_validador
+
+    # Misma validación previa que app.py (y la misma cédula normalizada)
+    validador = crear_validador(validacion)
+
+    # 2. LEER EL EXCEL UNA SOLA VEZ (completo o por bloques) Y ARMAR EL ÍNDICE
+    try:
+        if bloque:
+            verificar_columnas(EXCEL_FILE)
+            lotes = iterar_bloques(EXCEL_FILE, bloque)
+        else:
+            lotes = [leer_estudiantes(EXCEL_FILE)]
+        if validador is not None:
+            lotes = map(validador.validar, lotes)
+        contextos = (ctx for lote in lotes for ctx in iterar_contextos(lote))
+        with medir("indice_tribunal"):
+            indice = indexar(contextos)
+    except ColumnasFaltantes as e:
+        print(f"Error: Faltan las siguientes columnas en 'otro.xlsx': {e.faltantes}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error al leer el archivo Excel: {e}")
+        sys.exit(1)
+
+    if validador is not None:
+        ruta_validacion = validador.guardar(output_dir / NOMBRE_INFORME_VALIDACION)
+        lineas = validador.resumen()
+        for linea in lineas:
+            print(f"Validación: {linea}")
+        if lineas:
+            print(f"Informe de validación: {ruta_validacion.resolve()}")
+        if validador.ninguna_valida:
+            print("Error: Ninguna fila pasó la validación. Use --validacion informar para generarlas de todos modos.")
+            sys.exit(1)
+
+    if not indice:
+        print("Advertencia: No se encontraron estudiantes con cédula y tribunal asignado.")
+        return
+    print(f"Se encontraron {len(indice)} miembros de tribunal. Generando un documento por profesor...")
+
+    plantilla = PlantillaCompilada(TEMPLATE_DOCX)
+    # Igual que en app_unidoc.py: el consolidado comparte encabezados, pies y notas
+    for mensaje in plantilla.advertencias(MARKERS, consolidado=True):
+        print(f"Advertencia: {mensaje}")
+
+    # 3. UN DOCUMENTO CONSOLIDADO POR PROFESOR, EN PARALELO
+    # Dos profesores distintos pueden dar el mismo nombre de archivo (Martín / Martìn)
+    usados = set()
+    tareas = [
+        (profesor, estudiantes, output_dir / nombre_de_resumen(profesor, usados))
+        for profesor, estudiantes in indice.items()
+    ]
+    generados, fallidos = 0, []
+    for (profesor, estudiantes, ruta_salida), error in generar_resumenes(plantilla, tareas, workers, compresion):
+        if error is None:
+            generados += 1
+            print(f"- Generado: {ruta_salida.name} ({len(estudiantes)} estudiantes)")
+        else:
+            fallidos.append(profesor)
+            print(f"- ERROR al guardar para {profesor}: {error}")
+
+    if fallidos:
+        print(f"\n{len(fallidos)} de {len(tareas)} documentos no se pudieron generar: {', '.join(fallidos)}")
+    if generados == 0:
+        print("Error: No se generó ningún documento.")
+        sys.exit(1)
+
+    print(f"\n¡ÉXITO! Proceso completado.")
+    print(f"Se han guardado {generados} documentos en la carpeta: {output_dir.resolve()}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera un documento consolidado por cada miembro del tribunal.")
+    parser.add_argument(
+        "-o", "--output_dir",
+        default=BASE_DIR / "Notificaciones_Tribunal",
+        help="Directorio donde se guardarán los documentos por profesor. Por defecto, 'Notificaciones_Tribunal'."
+    )
+    parser.add_argument(
+        "-w", "--workers",
+        type=int,
+        default=1,
+        help="Número de procesos en paralelo para generar los documentos (0 = todos los núcleos). Por defecto, 1."
+    )
+    parser.add_argument(
+        "--bloque",
+        type=int,
+        default=0,
+        help="Lee el Excel en streaming, en bloques de N filas."
+    )
+    parser.add_argument(
+        "--compresion",
+        type=int,
+        choices=range(10),
+        default=NIVEL_COMPRESION,
+        metavar="0-9",
+        help=f"Nivel de compresión de los documentos (0 = más rápido, 9 = más pequeño). Por defecto, {NIVEL_COMPRESION}."
+    )
+    reglas_validacion.agregar_argumentos(parser)
+    perfilado.agregar_argumentos(parser)
+    arranque.agregar_argumento(parser)
+    args = parser.parse_args()
+    arranque.marcar("argumentos listos")
+    try:
+        perfilado.ejecutar(args, main, Path(args.output_dir), args.workers, args.bloque, args.compresion,
+                           args.validacion)
+    finally:
+        if args.startup_timing:
+            arranque.marcar("fin")
+            print(f"\n--- Arranque ---\n{arranque.reporte()}")
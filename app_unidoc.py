@@ -4,135 +4,152 @@ Genera un ÚNICO documento Word (.docx) con todos los estudiantes,
 cada uno en su propia página, usando 'plantilla.docx' y 'otro.xlsx'.
 """
 
+import arranque  # Primero: marca el inicio para --startup-timing
 from pathlib import Path
-import sys, os, re, argparse
-import pandas as pd
-from docx import Document
+import sys, argparse
+from functools import partial
+
+# Solo módulos livianos al cargar; pandas, openpyxl y python-docx se importan en main()
+import perfilado
+import exportar_pdf
+import reglas_validacion
+from archivos import NIVEL_COMPRESION
+from contexto import MARKERS
 
 # --- RUTAS DE ARCHIVOS ---
 BASE_DIR = Path(__file__).parent
 EXCEL_FILE    = BASE_DIR / "otro.xlsx"
 TEMPLATE_DOCX = BASE_DIR / "plantilla.docx"
 
-# --- NOMBRES DE COLUMNAS ---
-COL_CEDULA    = "CÉDULA DEL ESTUDIANTE"
-COL_ID        = "ID ESTUDIANTE"
-COL_APELLIDOS = "APELLIDOS"
-COL_NOMBRES   = "NOMBRES"
-COL_CARRERA   = "CARRERA"
-COL_TEMA      = "TEMA"
-COL_TRIB1     = "TRL1"
-COL_TRIB2     = "TRL2"
-COL_TRIB3     = "TRL3"
-
-# --- MARCADORES EN LA PLANTILLA ---
-MARKERS = {
-    "{{NOMBRE_COMPLETO}}",
-    "{{CEDULA}}",
-    "{{TEMA}}",
-    "{{ID}}",
-    "{{CARRERA}}",
-    "{{TRIBUNAL_1}}",
-    "{{TRIBUNAL_2}}",
-    "{{TRIBUNAL_3}}",
-}
-
-# ---------- UTILIDADES ----------
-def merge_runs(p):
-    """Une todos los runs de un párrafo para que un marcador no quede partido."""
-    if len(p.runs) <= 1:
-        return
-    txt = "".join(run.text for run in p.runs)
-    for _ in range(len(p.runs) - 1):
-        p.runs[0]._element.getparent().remove(p.runs[1]._element)
-    p.runs[0].text = txt
-
-
-def replace_markers(doc: Document, mapping: dict):
-    """Reemplaza marcador → valor en todo el documento (párrafos + tablas)."""
-    # Párrafos
-    for p in doc.paragraphs:
-        merge_runs(p)
-        for k, v in mapping.items():
-            if k in p.text:
-                p.text = p.text.replace(k, v)
-    # Tablas
-    for tbl in doc.tables:
-        for row in tbl.rows:
-            for cell in row.cells:
-                for p in cell.paragraphs:
-                    merge_runs(p)
-                    for k, v in mapping.items():
-                        if k in p.text:
-                            p.text = p.text.replace(k, v)
-# ----------------------------------
-
-
-def main(output_path: Path):
+
+def renderizar(escritor, punto, ctx):
+    """
+    Renderiza el fragmento de un estudiante (o lo recupera del punto de
+    control). Devuelve (ctx, fragmento, error) para no detener el documento.
+    """
+    try:
+        fragmento = escritor.fragmento(ctx) if punto is None else punto.fragmento(escritor, ctx)
+        return ctx, fragmento, None
+    except Exception as e:
+        return ctx, None, e
+
+
+def main(output_path: Path, bloque: int = 0, pdf: bool = False, convertidor: str = "unoserver",
+         compresion: int = NIVEL_COMPRESION, reanudar: bool = False, validacion: str = "informar"):
     # 1. Validación de archivos
     for f, tag in ((EXCEL_FILE, "Excel"), (TEMPLATE_DOCX, "plantilla")):
         if not f.exists():
             sys.exit(f"❌ No se encuentra el archivo {tag}: {f}")
 
-    # 2. Leer Excel
+    # Módulos pesados: recién ahora que se van a usar
+    arranque.importar_pesados("plantilla", "consolidado", "contexto", "ingesta", "pipeline", "diario", "validacion")
+    from plantilla import PlantillaCompilada
+    from consolidado import EscritorConsolidado, PuntoDeControl
+    from diario import InformeErrores
+    from contexto import iterar_contextos
+    from ingesta import ColumnasFaltantes, iterar_bloques, leer_estudiantes, verificar_columnas
+    from pipeline import encadenar
+    from validacion import crear_validador
+
+    # Validación previa: en modo estricto, las filas con errores quedan fuera del documento
+    validador = crear_validador(validacion)
+    ruta_validacion = output_path.with_name(f"{output_path.stem}_validacion.json")
+
+    # 2. Leer Excel (solo columnas obligatorias, filas con cédula)
     try:
-        df = pd.read_excel(EXCEL_FILE, header=0).copy()
-        df.columns = df.columns.str.strip()
+        if bloque:
+            # Streaming: el Excel se lee por bloques mientras se escribe el documento
+            verificar_columnas(EXCEL_FILE)
+            lotes = iterar_bloques(EXCEL_FILE, bloque)
+            if validador is not None:
+                lotes = map(validador.validar, lotes)
+            print(f"➡️  Generando documento (Excel en bloques de {bloque} filas)…")
+        else:
+            estudiantes = leer_estudiantes(EXCEL_FILE)
+            # 3. Verificar que haya estudiantes con cédula
+            if estudiantes.empty:
+                sys.exit("⚠️  No se encontraron estudiantes con cédula.")
+            if validador is not None:
+                estudiantes = validador.validar(estudiantes)
+                for linea in validador.resumen():
+                    print(f"🔎 {linea}")
+                if estudiantes.empty:
+                    validador.guardar(ruta_validacion)
+                    sys.exit(f"❌ Ninguna fila pasó la validación; detalle en: {ruta_validacion.resolve()}\n"
+                             "   Use --validacion informar para incluirlas de todos modos.")
+            lotes = [estudiantes]
+            print(f"➡️  Generando documento para {len(estudiantes)} estudiantes…")
+    except ColumnasFaltantes as e:
+        sys.exit(f"❌ Faltan columnas en Excel: {e.faltantes}")
     except Exception as e:
         sys.exit(f"❌ Error al leer Excel: {e}")
 
-    # 3. Verificar columnas obligatorias
-    required = [
-        COL_CEDULA, COL_ID, COL_APELLIDOS, COL_NOMBRES,
-        COL_CARRERA, COL_TEMA, COL_TRIB1, COL_TRIB2, COL_TRIB3
-    ]
-    missing = [c for c in required if c not in df.columns]
-    if missing:
-        sys.exit(f"❌ Faltan columnas en Excel: {missing}")
-
-    # 4. Filtrar estudiantes con cédula
-    estudiantes = df.dropna(subset=[COL_CEDULA])
-    if estudiantes.empty:
-        sys.exit("⚠️  No se encontraron estudiantes con cédula.")
-
-    print(f"➡️  Generando documento para {len(estudiantes)} estudiantes…")
-
-    # 5. Documento final
-    doc_final = Document()
-
-    for idx, row in estudiantes.iterrows():
-        # a) Crear copia de la plantilla
-        doc_tmp = Document(TEMPLATE_DOCX)
-
-        # b) Diccionario de reemplazos
-        ctx = {
-            "{{NOMBRE_COMPLETO}}": f"{row[COL_NOMBRES]} {row[COL_APELLIDOS]}".strip(),
-            "{{CEDULA}}":          str(row[COL_CEDULA]).strip(),
-            "{{TEMA}}":            str(row[COL_TEMA]).strip().capitalize(),
-            "{{ID}}":              str(row[COL_ID]).strip(),
-            "{{CARRERA}}":         str(row[COL_CARRERA]).strip(),
-            "{{TRIBUNAL_1}}":      str(row[COL_TRIB1]) if pd.notna(row[COL_TRIB1]) else "",
-            "{{TRIBUNAL_2}}":      str(row[COL_TRIB2]) if pd.notna(row[COL_TRIB2]) else "",
-            "{{TRIBUNAL_3}}":      str(row[COL_TRIB3]) if pd.notna(row[COL_TRIB3]) else "",
-        }
-
-        # c) Reemplazar marcadores
-        replace_markers(doc_tmp, ctx)
-
-        # d) Añadir al documento final
-        if idx > 0:            # ⇦ salto SOLO antes de los siguientes
-            doc_final.add_page_break()
-        for el in doc_tmp.element.body:
-            doc_final.element.body.append(el)
-
-        print(f"   ✔ {ctx['{{NOMBRE_COMPLETO}}']}")
-
-    # 6. Guardar
+    # 4. Documento final: se escribe en streaming, estudiante por estudiante.
+    #    Lectura y renderizado corren en hilos; la escritura comprimida, aquí.
+    plantilla = PlantillaCompilada(TEMPLATE_DOCX)
+    # El documento único comparte encabezados, pies y notas de la plantilla
+    for mensaje in plantilla.advertencias(MARKERS, consolidado=True):
+        print(f"⚠️  {mensaje}")
+    contextos = (ctx for lote in lotes for ctx in iterar_contextos(lote))
+    informe = InformeErrores(output_path.with_name(f"{output_path.stem}_errores.csv"))
+
+    # Solo con --resume: los fragmentos renderizados se guardan a medida que
+    # se generan y los de la ejecución interrumpida se reutilizan sin renderizar
+    punto = PuntoDeControl(output_path, plantilla.datos, reanudar=True) if reanudar else None
+
+    completo = False
     try:
-        doc_final.save(output_path)
-        print(f"\n✅ Documento creado: {output_path.resolve()}")
-    except Exception as e:
+        with EscritorConsolidado(plantilla, output_path, compresion) as escritor:
+            renderizados = encadenar(contextos, partial(renderizar, escritor, punto), tamano_cola=64)
+            for ctx, fragmento, error in renderizados:
+                if error is not None:
+                    # Una fila con problemas no detiene el documento
+                    informe.agregar(ctx, error)
+                    print(f"   ✘ {ctx['{{NOMBRE_COMPLETO}}']}: {error}")
+                    continue
+                # Escribir (con salto de página antes de los siguientes)
+                escritor.escribir(fragmento)
+
+                print(f"   ✔ {ctx['{{NOMBRE_COMPLETO}}']}")
+            if escritor.total == 0:
+                if validador is not None and validador.ninguna_valida:
+                    sys.exit("❌ Ninguna fila pasó la validación (use --validacion informar para incluirlas).")
+                sys.exit("⚠️  No se encontraron estudiantes con cédula.")
+        completo = True
+    except OSError as e:
         sys.exit(f"❌ Error al guardar DOCX: {e}")
+    finally:
+        if punto is not None:
+            punto.cerrar(completo)
+        ruta_informe = informe.guardar()
+        if ruta_informe is not None:
+            print(f"⚠️  {len(informe)} estudiantes con errores no se incluyeron; detalle en: {ruta_informe.resolve()}")
+        if validador is not None:
+            validador.guardar(ruta_validacion)
+            lineas = validador.resumen()
+            if bloque:
+                # En streaming, el resumen recién está completo al final
+                for linea in lineas:
+                    print(f"🔎 {linea}")
+            if lineas:
+                print(f"🔎 Informe de validación: {ruta_validacion.resolve()}")
+    if punto is not None and punto.recuperados:
+        print(f"↩️  Reanudación: {punto.recuperados} estudiantes recuperados sin volver a renderizar.")
+
+    # 5. Resultado
+    print(f"\n✅ Documento creado: {output_path.resolve()}")
+
+    # 6. Exportar a PDF (opcional)
+    if pdf:
+        print("➡️  Convirtiendo a PDF…")
+        try:
+            with exportar_pdf.PoolPdf(convertidor, workers=1) as pool:
+                error = exportar_pdf.esperar(pool.enviar(output_path))
+        except RuntimeError as e:
+            sys.exit(f"❌ {e}")
+        if error is not None:
+            sys.exit(f"❌ Error al convertir a PDF: {error}")
+        print(f"✅ PDF creado: {exportar_pdf.ruta_pdf(output_path).resolve()}")
 
 
 if __name__ == "__main__":
@@ -144,5 +161,36 @@ if __name__ == "__main__":
         default=BASE_DIR / "notificaciones_TODOS_EN_UNO.docx",
         help="Ruta del archivo DOCX de salida (por defecto, en el directorio del script)."
     )
+    parser.add_argument(
+        "--bloque",
+        type=int,
+        default=0,
+        help="Lee el Excel en streaming, en bloques de N filas (memoria acotada para listas muy grandes)."
+    )
+    parser.add_argument(
+        "--compresion",
+        type=int,
+        choices=range(10),
+        default=NIVEL_COMPRESION,
+        metavar="0-9",
+        help=f"Nivel de compresión del documento (0 = más rápido, 9 = más pequeño). Por defecto, {NIVEL_COMPRESION}."
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Guarda los estudiantes ya renderizados a medida que se generan y, si una ejecución anterior "
+             "con --resume se interrumpió, los reutiliza sin renderizarlos de nuevo."
+    )
+    reglas_validacion.agregar_argumentos(parser)
+    exportar_pdf.agregar_argumentos(parser)
+    perfilado.agregar_argumentos(parser)
+    arranque.agregar_argumento(parser)
     args = parser.parse_args()
-    main(Path(args.output))
+    arranque.marcar("argumentos listos")
+    try:
+        perfilado.ejecutar(args, main, Path(args.output), args.bloque, args.pdf, args.convertidor, args.compresion, args.resume,
+                           args.validacion)
+    finally:
+        if args.startup_timing:
+            arranque.marcar("fin")
+            print(f"\n--- Arranque ---\n{arranque.reporte()}")
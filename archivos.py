@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Escritura SEGURA de archivos y constantes de salida, sin dependencias pesadas.
+
+Todo lo que se guarda (documentos, paquetes, diarios, informes) pasa por un
+archivo temporal oculto en la misma carpeta que se renombra al terminar: un
+corte nunca deja un archivo a medio escribir. Este módulo no importa lxml ni
+python-docx, así que los scripts pueden usarlo al cargar sin adelantar la
+importación de las bibliotecas pesadas (ver arranque.py).
+"""
+
+import glob
+import os
+import re
+from pathlib import Path
+
+# Nivel zlib por defecto para las partes renderizadas (el mismo de zipfile)
+NIVEL_COMPRESION = 6
+
+# Temporales de ruta_temporal: ".<archivo>.<pid>.tmp"
+_TEMPORAL = re.compile(r"\.(?P<archivo>.+)\.\d+\.tmp")
+# Lo que escribe esta herramienta: documentos, paquetes, diarios e informes
+EXTENSIONES_PROPIAS = (".docx", ".zip", ".json", ".jsonl", ".csv")
+
+
+def ruta_temporal(ruta):
+    """Archivo temporal oculto junto a `ruta` (mismo disco, para poder renombrar)."""
+    ruta = os.fspath(ruta)
+    carpeta, nombre = os.path.split(ruta)
+    return os.path.join(carpeta, f".{nombre}.{os.getpid()}.tmp")
+
+
+def limpiar_temporales(carpeta, nombre=None):
+    """
+    Borra los temporales que dejó en `carpeta` un proceso interrumpido (al
+    reanudar): los del archivo `nombre` o, sin él, los de cualquier archivo
+    del tipo que escribe esta herramienta. Otros archivos ocultos no se tocan.
+    """
+    patron = glob.escape(nombre) if nombre else "*"
+    for temporal in Path(carpeta).glob(f".{patron}.*.tmp"):
+        coincidencia = _TEMPORAL.fullmatch(temporal.name)
+        if coincidencia is None:
+            continue
+        archivo = coincidencia.group("archivo")
+        if archivo == nombre or (nombre is None and archivo.lower().endswith(EXTENSIONES_PROPIAS)):
+            temporal.unlink(missing_ok=True)
+
+
+def escribir_atomico(ruta, datos: bytes):
+    """
+    Escribe `datos` en un temporal y lo renombra sobre `ruta`: si el proceso
+    se interrumpe, nunca queda un documento a medio escribir.
+    """
+    temporal = ruta_temporal(ruta)
+    try:
+        with open(temporal, "wb") as f:
+            f.write(datos)
+        os.replace(temporal, ruta)
+    except BaseException:
+        try:
+            os.unlink(temporal)
+        except OSError:
+            pass
+        raise
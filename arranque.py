@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+ARRANQUE rápido: importación diferida de los módulos pesados y su medición.
+
+pandas, openpyxl, lxml y python-docx tardan bastante más en importarse que todo lo
+demás (más aún dentro del ejecutable de PyInstaller) y no hacen falta para
+mostrar la ventana ni para --help. Los scripts los importan recién al generar
+(o la GUI, en un hilo de precarga después de mostrar la ventana) a través de
+`importar`, que anota cuánto costó cada uno. Con --startup-timing se imprime
+el reporte de tiempos desde el inicio del script.
+"""
+
+import importlib
+import sys
+import time
+
+# Instante de referencia: este módulo es lo primero que importan los scripts
+INICIO = time.perf_counter()
+
+# Bibliotecas externas pesadas, en orden de dependencia
+MODULOS_PESADOS = ("numpy", "pandas", "lxml.etree", "openpyxl", "docx")
+
+OPCION = "--startup-timing"
+
+_eventos = []
+
+
+def _ms():
+    return (time.perf_counter() - INICIO) * 1000
+
+
+def marcar(evento):
+    """Anota el momento (ms desde el inicio) en que ocurrió `evento`."""
+    _eventos.append((evento, _ms(), None))
+
+
+def importar(*nombres):
+    """Importa los módulos que aún no estén cargados y anota lo que costó cada uno."""
+    for nombre in nombres:
+        if nombre in sys.modules:
+            continue
+        inicio = time.perf_counter()
+        importlib.import_module(nombre)
+        _eventos.append((f"import {nombre}", _ms(), (time.perf_counter() - inicio) * 1000))
+
+
+def importar_pesados(*propios):
+    """Importa las bibliotecas pesadas y luego los módulos `propios` del proyecto."""
+    importar(*MODULOS_PESADOS, *propios)
+
+
+def pedido(argv=None):
+    """True si la línea de comandos incluye --startup-timing."""
+    return OPCION in (sys.argv if argv is None else argv)
+
+
+def agregar_argumento(parser):
+    """Agrega --startup-timing a un ArgumentParser."""
+    parser.add_argument(
+        OPCION,
+        dest="startup_timing",
+        action="store_true",
+        help="Muestra al final el tiempo de arranque y el costo de importar cada módulo pesado."
+    )
+
+
+def reporte():
+    """Tabla de eventos de arranque: momento (ms desde el inicio) y duración."""
+    lineas = [f"{'EVENTO':<30}{'EN ms':>10}{'DURACIÓN ms':>14}"]
+    for evento, momento, duracion in _eventos:
+        lineas.append(f"{evento:<30}{momento:>10.1f}" + (f"{duracion:>14.1f}" if duracion is not None else ""))
+    importaciones = sum(d for _, _, d in _eventos if d is not None)
+    lineas.append(f"{'total importaciones diferidas':<30}{'':>10}{importaciones:>14.1f}")
+    return "\n".join(lineas)
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks reproducibles del generador de notificaciones (sin red, Linux).
+
+Cada escenario se ejecuta en un proceso nuevo sobre datos sintéticos
+(ver generar_datos.py) y reporta el tiempo total, documentos por segundo y la
+memoria máxima (RSS) del proceso y de sus procesos hijos. Los resultados se
+guardan en un JSON etiquetado con el commit actual para poder compararlos
+entre versiones:
+
+    python benchmarks/bench.py -n 1000 10000
+    python benchmarks/bench.py -n 1000 --comparar benchmarks/resultados/abc1234.json
+
+Escenarios:
+  individual     app.main (un .docx por estudiante)
+  individual_pdf app.main --pdf con el convertidor falso (sin LibreOffice)
+  consolidado    app_unidoc.main (documento único)
+  gui_individual main_gui.generar_individuales (lógica de la GUI, sin ventana)
+  gui_unico      main_gui.generar_unico
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+DIR_BENCH = Path(__file__).resolve().parent
+DIR_REPO = DIR_BENCH.parent
+DIR_RESULTADOS = DIR_BENCH / "resultados"
+
+ESCENARIOS = ["individual", "individual_pdf", "consolidado", "gui_individual", "gui_unico"]
+
+
+# ---------- EJECUCIÓN DE UN ESCENARIO (en el proceso hijo) ----------
+def _vaciar_eventos(trabajo, terminado):
+    """Imita al bucle de Tk: vacía la cola de eventos de la GUI periódicamente."""
+    while not terminado.is_set():
+        while not trabajo.eventos.empty():
+            trabajo.eventos.get_nowait()
+        time.sleep(0.1)
+
+
+def _ejecutar_escenario(escenario, excel, plantilla, salida, workers, bloque):
+    sys.path.insert(0, str(DIR_REPO))
+    salida = Path(salida)
+
+    if escenario in ("individual", "individual_pdf", "consolidado"):
+        import app
+        import app_unidoc
+        modulo = app_unidoc if escenario == "consolidado" else app
+        modulo.EXCEL_FILE = Path(excel)
+        modulo.TEMPLATE_DOCX = Path(plantilla)
+        if escenario == "individual":
+            funcion = lambda: app.main(salida, workers=workers, bloque=bloque)
+        elif escenario == "individual_pdf":
+            # El convertidor falso se inyecta: no es una opción de los scripts
+            from convertidor_falso import ConvertidorFalso
+            funcion = lambda: app.main(salida, workers=workers, bloque=bloque, pdf=True, convertidor=ConvertidorFalso)
+        else:
+            funcion = lambda: app_unidoc.main(salida / "consolidado.docx", bloque=bloque)
+    else:
+        import main_gui
+        main_gui.EXCEL_FILE = Path(excel)
+        main_gui.TEMPLATE_DOCX = Path(plantilla)
+        trabajo = main_gui.Trabajo()
+        if escenario == "gui_individual":
+            args = (main_gui.generar_individuales, salida, workers)
+        else:
+            args = (main_gui.generar_unico, salida)
+
+        def funcion():
+            terminado = threading.Event()
+            hilo = threading.Thread(target=_vaciar_eventos, args=(trabajo, terminado))
+            hilo.start()
+            try:
+                trabajo.ejecutar(*args)
+            finally:
+                terminado.set()
+                hilo.join()
+
+    with open(os.devnull, "w") as nulo:
+        stdout, sys.stdout = sys.stdout, nulo
+        try:
+            inicio = time.perf_counter()
+            funcion()
+            segundos = time.perf_counter() - inicio
+        finally:
+            sys.stdout = stdout
+
+    print(json.dumps({
+        "segundos": segundos,
+        # ru_maxrss está en KiB en Linux
+        "rss_max_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "rss_max_hijos_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+    }))
+
+
+# ---------- ORQUESTACIÓN ----------
+def _commit_actual():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=DIR_REPO,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconocido"
+
+
+def correr(escenario, tamano, workers=1, bloque=0, con_cache=False):
+    """Ejecuta un escenario en un proceso nuevo y devuelve su resultado."""
+    from generar_datos import asegurar_datos, asegurar_plantilla
+
+    excel = asegurar_datos(tamano)
+    plantilla = asegurar_plantilla()
+    documentos = json.loads(excel.with_suffix(".json").read_text(encoding="utf-8"))["con_cedula"]
+    if not con_cache:
+        # Medir la lectura real del Excel, no la caché de ingesta.py
+        excel.with_name(f".{excel.name}.cache.pkl").unlink(missing_ok=True)
+
+    salida = Path(tempfile.mkdtemp(prefix="bench_notif_"))
+    try:
+        proceso = subprocess.run(
+            [sys.executable, __file__, "--_escenario", escenario, str(excel), str(plantilla),
+             str(salida), str(workers), str(bloque)],
+            capture_output=True, text=True,
+        )
+    finally:
+        shutil.rmtree(salida, ignore_errors=True)
+    if proceso.returncode != 0:
+        raise RuntimeError(f"El escenario {escenario} falló:\n{proceso.stderr}")
+
+    medicion = json.loads(proceso.stdout.strip().splitlines()[-1])
+    return {
+        "escenario": escenario,
+        "tamano": tamano,
+        "documentos": documentos,
+        "workers": workers,
+        "bloque": bloque,
+        "segundos": round(medicion["segundos"], 3),
+        "docs_por_s": round(documentos / medicion["segundos"], 1),
+        "rss_max_mb": round(medicion["rss_max_mb"], 1),
+        "rss_max_hijos_mb": round(medicion["rss_max_hijos_mb"], 1),
+    }
+
+
+def _clave(r):
+    return (r["escenario"], r["tamano"], r["workers"], r["bloque"])
+
+
+def imprimir(resultados, base=None):
+    """Tabla de resultados; con `base`, agrega la aceleración respecto a ella."""
+    anteriores = {_clave(r): r for r in (base or {}).get("resultados", [])}
+    print(f"{'ESCENARIO':<16}{'FILAS':>8}{'DOCS':>8}{'SEG':>10}{'DOCS/S':>10}{'RSS MB':>9}{'HIJOS MB':>10}"
+          + (f"{'VS BASE':>10}" if base else ""))
+    for r in resultados:
+        linea = (f"{r['escenario']:<16}{r['tamano']:>8}{r['documentos']:>8}{r['segundos']:>10.2f}"
+                 f"{r['docs_por_s']:>10.1f}{r['rss_max_mb']:>9.1f}{r['rss_max_hijos_mb']:>10.1f}")
+        previo = anteriores.get(_clave(r))
+        if previo:
+            linea += f"{previo['segundos'] / r['segundos']:>9.2f}x"
+        print(linea)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks del generador de notificaciones.")
+    parser.add_argument("-n", "--tamanos", type=int, nargs="+", default=[1000],
+                        help="Filas de los rosters sintéticos (p. ej. 1000 10000 100000). Por defecto, 1000.")
+    parser.add_argument("-e", "--escenarios", nargs="+", choices=ESCENARIOS, default=ESCENARIOS,
+                        help="Escenarios a ejecutar. Por defecto, todos.")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="Procesos para los escenarios individuales. Por defecto, 1.")
+    parser.add_argument("--bloque", type=int, default=0,
+                        help="Tamaño de bloque del modo streaming (0 = desactivado).")
+    parser.add_argument("--con_cache", action="store_true",
+                        help="No borra la caché del Excel antes de cada escenario.")
+    parser.add_argument("-o", "--salida",
+                        help="Archivo JSON de resultados. Por defecto, benchmarks/resultados/<commit>.json.")
+    parser.add_argument("--comparar",
+                        help="JSON de resultados de otro commit para comparar.")
+    args = parser.parse_args()
+
+    commit = _commit_actual()
+    resultados = []
+    for tamano in args.tamanos:
+        for escenario in args.escenarios:
+            print(f"... {escenario} con {tamano} filas", file=sys.stderr)
+            resultados.append(correr(escenario, tamano, args.workers, args.bloque, args.con_cache))
+
+    datos = {
+        "commit": commit,
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "resultados": resultados,
+    }
+    salida = Path(args.salida) if args.salida else DIR_RESULTADOS / f"{commit}.json"
+    salida.parent.mkdir(parents=True, exist_ok=True)
+    salida.write_text(json.dumps(datos, indent=1, ensure_ascii=False), encoding="utf-8")
+
+    base = json.loads(Path(args.comparar).read_text(encoding="utf-8")) if args.comparar else None
+    imprimir(resultados, base)
+    print(f"\nResultados guardados en: {salida}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--_escenario":
+        escenario, excel, plantilla, salida, workers, bloque = sys.argv[2:8]
+        _ejecutar_escenario(escenario, excel, plantilla, salida, int(workers), int(bloque))
+    else:
+        main()
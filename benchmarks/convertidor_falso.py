@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+Convertidor a PDF FALSO para los benchmarks: no usa LibreOffice.
+
+No es una opción de los scripts (sus PDF solo contienen el nombre del
+archivo); se inyecta pasando la clase a exportar_pdf.PoolPdf, o a app.main
+como `convertidor`, en lugar de un nombre de exportar_pdf.CONVERTIDORES.
+"""
+
+import time
+from pathlib import Path
+
+
+class ConvertidorFalso:
+    """
+    Convertidor sin LibreOffice: escribe un PDF mínimo con el nombre del
+    documento y anota cada conversión. `demora` simula el tiempo por archivo.
+    """
+
+    def __init__(self, demora=0.0):
+        self.demora = demora
+        self.convertidos = []
+
+    def iniciar(self):
+        pass
+
+    def convertir(self, origen, destino):
+        if not Path(origen).exists():
+            raise FileNotFoundError(f"No existe el documento: {origen}")
+        if self.demora:
+            time.sleep(self.demora)
+        texto = Path(origen).name.replace("\\", "").replace("(", "").replace(")", "")
+        contenido = f"BT /F1 12 Tf 72 720 Td ({texto}) Tj ET"
+        objetos = [
+            "<< /Type /Catalog /Pages 2 0 R >>",
+            "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            "/Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>",
+            f"<< /Length {len(contenido)} >>\nstream\n{contenido}\nendstream",
+            "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        ]
+        pdf, posiciones = "%PDF-1.4\n", []
+        for i, objeto in enumerate(objetos, start=1):
+            posiciones.append(len(pdf.encode("latin-1", "replace")))
+            pdf += f"{i} 0 obj\n{objeto}\nendobj\n"
+        xref = len(pdf.encode("latin-1", "replace"))
+        pdf += f"xref\n0 {len(objetos) + 1}\n0000000000 65535 f \n"
+        pdf += "".join(f"{p:010d} 00000 n \n" for p in posiciones)
+        pdf += f"trailer\n<< /Size {len(objetos) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+        Path(destino).write_bytes(pdf.encode("latin-1", "replace"))
+        self.convertidos.append(Path(origen))
+
+    def cerrar(self):
+        pass
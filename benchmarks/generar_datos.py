@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Generador de datos SINTÉTICOS para los benchmarks (sin red, reproducible).
+
+- Listas de estudiantes tipo 'otro.xlsx' de N filas, con columnas extra (como
+  los reportes anchos de secretaría), TEMA largos, celdas de tribunal vacías
+  y algunas filas sin cédula.
+- Plantillas .docx con muchos marcadores: párrafos, marcadores partidos entre
+  runs, tablas (incluida una tabla anidada), encabezado y pie de página.
+
+Los archivos se generan con una semilla fija, así que dos ejecuciones con los
+mismos parámetros producen exactamente los mismos datos.
+"""
+
+import argparse
+import json
+import random
+import sys
+from pathlib import Path
+
+from docx import Document
+from openpyxl import Workbook
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from contexto import (  # noqa: E402
+    COL_CEDULA, COL_ID, COL_APELLIDOS, COL_NOMBRES, COL_CARRERA, COL_TEMA,
+    COL_TRIB1, COL_TRIB2, COL_TRIB3,
+)
+
+DIR_DATOS = Path(__file__).resolve().parent / "_datos"
+
+# Cambiar si cambia el contenido generado (los rosters viejos se regeneran)
+VERSION_DATOS = 2
+
+NOMBRES = ["María José", "Juan Carlos", "Ana Lucía", "Pedro", "Sofía", "Andrés", "Valentina", "José Luis"]
+APELLIDOS = ["Pérez Gómez", "Zambrano", "Núñez Vélez", "Cedeño", "Muñoz Ortiz", "Loor", "Intriago", "Álava"]
+CARRERAS = ["Sistemas", "Electrónica", "Civil", "Industrial", "Software", "Telecomunicaciones"]
+PROFESORES = [f"Ing. Profesor {i:02d}" for i in range(40)]
+PALABRAS = "análisis diseño implementación sistema modelo gestión datos evaluación red control".split()
+
+COLUMNAS_EXTRA = [
+    "Nº", " RESPONSABLE UIC", "MODALIDAD", "NOMBRE DEL DIRECTOR O TUTOR", "NOTA",
+    "TRIBUNAL TRABAJO ESCRITO ", "promedio ", "fecha de defensa", "horario ",
+    "OBSERVACIONES", "CORREO", "TELÉFONO", "PERIODO", "SEDE", "PARALELO",
+]
+
+
+def cedula_sintetica(i: int) -> int:
+    """Cédula válida (provincia 13, con su dígito verificador) para la fila i."""
+    base = f"{130000000 + i:09d}"
+    suma = sum(d - 9 if d > 9 else d for d in (int(c) * (2 - k % 2) for k, c in enumerate(base)))
+    return int(base + str((10 - suma % 10) % 10))
+
+
+def generar_roster(filas: int, ruta: Path, semilla: int = 1234):
+    """Escribe un Excel sintético de `filas` filas y devuelve sus metadatos."""
+    rnd = random.Random(semilla)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Hoja1")
+    columnas = COLUMNAS_EXTRA[:5] + [
+        COL_CARRERA, COL_CEDULA, COL_ID, COL_APELLIDOS, COL_NOMBRES, COL_TEMA,
+    ] + COLUMNAS_EXTRA[5:] + [COL_TRIB1, COL_TRIB2, COL_TRIB3]
+    ws.append(columnas)
+
+    con_cedula = 0
+    for i in range(filas):
+        sin_cedula = rnd.random() < 0.02
+        con_cedula += not sin_cedula
+        tema = " ".join(rnd.choice(PALABRAS) for _ in range(rnd.randint(25, 60)))
+        tribunal = [rnd.choice(PROFESORES) if rnd.random() > 0.2 else None for _ in range(3)]
+        valores = {
+            COL_CARRERA: rnd.choice(CARRERAS),
+            COL_CEDULA: None if sin_cedula else cedula_sintetica(i),
+            COL_ID: f"E{i:07d}",
+            COL_APELLIDOS: rnd.choice(APELLIDOS),
+            COL_NOMBRES: f"{rnd.choice(NOMBRES)} {i}",
+            COL_TEMA: tema,
+            COL_TRIB1: tribunal[0],
+            COL_TRIB2: tribunal[1],
+            COL_TRIB3: tribunal[2],
+        }
+        ws.append([valores.get(c, f"{c.strip()} {rnd.randint(0, 999)}") for c in columnas])
+
+    wb.save(ruta)
+    meta = {"filas": filas, "con_cedula": con_cedula, "semilla": semilla, "version": VERSION_DATOS}
+    ruta.with_suffix(".json").write_text(json.dumps(meta), encoding="utf-8")
+    return meta
+
+
+def generar_plantilla(ruta: Path, repeticiones: int = 10, filas_tabla: int = 20):
+    """Plantilla con muchos marcadores en párrafos, tablas, encabezado y pie."""
+    marcadores = [
+        "{{NOMBRE_COMPLETO}}", "{{CEDULA}}", "{{TEMA}}", "{{ID}}",
+        "{{CARRERA}}", "{{TRIBUNAL_1}}", "{{TRIBUNAL_2}}", "{{TRIBUNAL_3}}",
+    ]
+    doc = Document()
+    seccion = doc.sections[0]
+    seccion.header.paragraphs[0].text = "Notificación para {{NOMBRE_COMPLETO}} ({{CEDULA}})"
+    seccion.footer.paragraphs[0].text = "Carrera de {{CARRERA}} · matrícula {{ID}}"
+
+    for r in range(repeticiones):
+        doc.add_paragraph(
+            f"Párrafo {r}: se informa que {{{{NOMBRE_COMPLETO}}}}, cédula {{{{CEDULA}}}}, "
+            f"de {{{{CARRERA}}}}, aprobó el tema “{{{{TEMA}}}}”."
+        )
+        # Marcador partido entre varios runs con formatos distintos
+        p = doc.add_paragraph("Tribunal: ")
+        p.add_run("{{TRIBU").bold = True
+        p.add_run("NAL_1}}").italic = True
+        p.add_run(", {{TRIBUNAL_2}} y {{TRIBUNAL_3}}.")
+        doc.add_paragraph("Texto sin marcadores para simular el cuerpo de la notificación. " * 3)
+
+    tabla = doc.add_table(rows=filas_tabla, cols=len(marcadores))
+    for fila in tabla.rows:
+        for celda, marcador in zip(fila.cells, marcadores):
+            celda.text = marcador
+    anidada = tabla.cell(0, 0).add_table(rows=2, cols=2)
+    for celda in anidada._cells:
+        celda.text = "{{ID}} / {{CEDULA}}"
+
+    doc.save(ruta)
+
+
+def asegurar_datos(filas: int) -> Path:
+    """Ruta del roster de `filas` filas; lo genera si aún no existe."""
+    DIR_DATOS.mkdir(exist_ok=True)
+    ruta = DIR_DATOS / f"roster_{filas}.xlsx"
+    meta = ruta.with_suffix(".json")
+    if not ruta.exists() or not meta.exists() or json.loads(meta.read_text(encoding="utf-8")).get("version") != VERSION_DATOS:
+        generar_roster(filas, ruta)
+    return ruta
+
+
+def asegurar_plantilla() -> Path:
+    DIR_DATOS.mkdir(exist_ok=True)
+    ruta = DIR_DATOS / "plantilla_sintetica.docx"
+    if not ruta.exists():
+        generar_plantilla(ruta)
+    return ruta
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera rosters y plantillas sintéticas para los benchmarks.")
+    parser.add_argument(
+        "-n", "--tamanos",
+        type=int, nargs="+", default=[1000, 10000, 100000],
+        help="Número de filas de cada roster. Por defecto, 1000 10000 100000."
+    )
+    args = parser.parse_args()
+    print(f"Plantilla: {asegurar_plantilla()}")
+    for n in args.tamanos:
+        print(f"Roster de {n} filas: {asegurar_datos(n)}")
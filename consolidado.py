@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+Escritura EN STREAMING del documento consolidado (todos los estudiantes).
+
+En lugar de ir agregando el cuerpo de cada estudiante a un único árbol lxml en
+memoria y guardar al final, el .docx de salida se escribe directamente como zip:
+
+  1. Se copian tal cual las partes de la plantilla (estilos, tema, fuentes,
+     imágenes, relaciones...), excepto el documento principal.
+  2. El documento principal se escribe por partes: el prólogo de la plantilla
+     (hasta <w:body>) una sola vez, luego el fragmento renderizado de cada
+     estudiante precedido de un salto de página y, al cerrar, el <w:sectPr>
+     final de la plantilla.
+
+La memoria usada no depende del número de estudiantes. El zip se escribe en
+un temporal que se renombra al cerrar, así que un corte nunca deja un .docx
+a medio escribir; el PuntoDeControl guarda los fragmentos ya renderizados
+para que una ejecución con --resume no tenga que volver a renderizarlos.
+"""
+
+import hashlib
+import io
+import os
+import struct
+import zipfile
+from pathlib import Path
+
+from docx.opc.oxml import serialize_part_xml
+from docx.oxml.ns import qn
+from lxml import etree
+
+from perfilado import medir
+from archivos import NIVEL_COMPRESION, limpiar_temporales, ruta_temporal
+from diario import hash_contexto
+
+SALTO_DE_PAGINA = b'<w:p><w:r><w:br w:type="page"/></w:r></w:p>'
+
+
+def renderizar_fragmento(plantilla, replacements) -> bytes:
+    """Renderiza un estudiante y devuelve el XML de su contenido (sin el <w:sectPr>)."""
+    doc = plantilla.renderizar(replacements)
+    with medir("agregar_cuerpo"):
+        return b"".join(
+            etree.tostring(el, encoding="UTF-8")
+            for el in doc.element.body
+            if el.tag != qn("w:sectPr")
+        )
+
+
+class EscritorConsolidado:
+    """Escribe un .docx consolidado estudiante por estudiante."""
+
+    def __init__(self, plantilla, ruta_salida, compresion=NIVEL_COMPRESION):
+        self.plantilla = plantilla
+        self.ruta_salida = Path(ruta_salida)
+        self._temporal = Path(ruta_temporal(self.ruta_salida))
+        self.total = 0
+
+        # Prólogo y epílogo del documento principal a partir de la plantilla
+        doc = plantilla.documento_nuevo()
+        self._parte_principal = doc.part.partname[1:]
+        cuerpo = doc.element.body
+        for el in list(cuerpo):
+            if el.tag != qn("w:sectPr"):
+                cuerpo.remove(el)
+        xml = serialize_part_xml(doc.element)
+        corte = xml.find(b"<w:sectPr")
+        if corte == -1:
+            corte = xml.rfind(b"</w:body>")
+        self._prologo, self._epilogo = xml[:corte], xml[corte:]
+
+        metodo = zipfile.ZIP_DEFLATED if compresion else zipfile.ZIP_STORED
+        self._zip = zipfile.ZipFile(self._temporal, "w", metodo, compresslevel=compresion or None)
+        self._copiar_partes_plantilla()
+        self._stream = self._zip.open(self._parte_principal, "w", force_zip64=True)
+        self._stream.write(self._prologo)
+
+    def _copiar_partes_plantilla(self):
+        """Copia todas las partes de la plantilla salvo el documento principal."""
+        with zipfile.ZipFile(io.BytesIO(self.plantilla.datos), "r") as origen:
+            for info in origen.infolist():
+                if info.filename != self._parte_principal:
+                    self._zip.writestr(info, origen.read(info.filename))
+
+    def fragmento(self, replacements) -> bytes:
+        """Renderiza un estudiante y devuelve el XML de su contenido."""
+        return renderizar_fragmento(self.plantilla, replacements)
+
+    def escribir(self, fragmento: bytes):
+        """Escribe un fragmento ya renderizado (con salto de página antes)."""
+        with medir("guardado"):
+            if self.total:
+                self._stream.write(SALTO_DE_PAGINA)
+            self._stream.write(fragmento)
+        self.total += 1
+
+    def agregar(self, replacements):
+        """Renderiza un estudiante y escribe su fragmento en el documento."""
+        self.escribir(self.fragmento(replacements))
+
+    def cerrar(self):
+        """Escribe el <w:sectPr> final, cierra el zip y lo mueve a su ruta definitiva."""
+        self._stream.write(self._epilogo)
+        self._stream.close()
+        self._zip.close()
+        os.replace(self._temporal, self.ruta_salida)
+
+    def abortar(self):
+        """Cierra sin terminar el documento y elimina el archivo incompleto."""
+        try:
+            self._stream.close()
+            self._zip.close()
+        finally:
+            self._temporal.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.cerrar()
+        else:
+            self.abortar()
+        return False
+
+
+class PuntoDeControl:
+    """
+    Fragmentos ya renderizados de un consolidado, en un archivo oculto junto
+    a la salida: cada registro es el hash de la fila, el largo y el XML.
+
+    Al reanudar, mientras las filas coincidan en orden y contenido con lo
+    guardado, el fragmento se lee del disco en lugar de renderizarse; desde
+    la primera diferencia se descarta el resto. Al cerrar bien, se elimina.
+    """
+
+    _REGISTRO = struct.Struct("<32sQ")
+
+    def __init__(self, ruta_salida, datos_plantilla: bytes, reanudar=False):
+        ruta_salida = Path(ruta_salida)
+        self.ruta = ruta_salida.with_name(f".{ruta_salida.name}.fragmentos")
+        self._cabecera = b"FRAGMENTOS1" + hashlib.sha256(datos_plantilla).digest()
+        self._guardados = []  # (hash, inicio, largo) de cada fragmento, en orden
+        self._siguiente = 0
+        self.recuperados = 0
+        fin = self._leer() if reanudar else 0
+        if reanudar:
+            limpiar_temporales(ruta_salida.parent, ruta_salida.name)
+        if fin:
+            self._archivo = open(self.ruta, "r+b")
+            self._archivo.truncate(fin)  # Registro a medio escribir al cortarse
+        else:
+            self._archivo = open(self.ruta, "w+b")
+            self._archivo.write(self._cabecera)
+
+    def _leer(self):
+        """Indexa los registros completos; devuelve dónde termina el último (0 = no sirve)."""
+        try:
+            with open(self.ruta, "rb") as f:
+                if f.read(len(self._cabecera)) != self._cabecera:
+                    return 0
+                fin = f.tell()
+                while True:
+                    cabecera = f.read(self._REGISTRO.size)
+                    if len(cabecera) < self._REGISTRO.size:
+                        break
+                    hash_, largo = self._REGISTRO.unpack(cabecera)
+                    inicio = f.tell()
+                    if len(f.read(largo)) < largo:
+                        break
+                    self._guardados.append((hash_, inicio, largo))
+                    fin = inicio + largo
+                return fin
+        except OSError:
+            return 0
+
+    @staticmethod
+    def _hash(replacements):
+        return bytes.fromhex(hash_contexto(replacements))
+
+    def recuperar(self, replacements):
+        """Fragmento guardado de esta fila (si es la que sigue y no cambió) o None."""
+        if self._siguiente >= len(self._guardados):
+            return None
+        hash_, inicio, largo = self._guardados[self._siguiente]
+        if hash_ != self._hash(replacements):
+            # El Excel cambió desde aquí: lo guardado a continuación ya no sirve
+            self._archivo.truncate(inicio - self._REGISTRO.size)
+            del self._guardados[self._siguiente:]
+            return None
+        self._siguiente += 1
+        self.recuperados += 1
+        self._archivo.seek(inicio)
+        return self._archivo.read(largo)
+
+    def anotar(self, replacements, fragmento: bytes):
+        """Guarda el fragmento recién renderizado de una fila."""
+        self._archivo.seek(0, os.SEEK_END)
+        self._archivo.write(self._REGISTRO.pack(self._hash(replacements), len(fragmento)))
+        self._archivo.write(fragmento)
+        self._archivo.flush()
+
+    def fragmento(self, escritor, replacements) -> bytes:
+        """Fragmento de la fila: recuperado del disco o renderizado (y anotado)."""
+        fragmento = self.recuperar(replacements)
+        if fragmento is None:
+            fragmento = escritor.fragmento(replacements)
+            self.anotar(replacements, fragmento)
+        return fragmento
+
+    def cerrar(self, completo=False):
+        """Cierra el archivo; si el documento se terminó, lo elimina."""
+        self._archivo.close()
+        if completo:
+            self.ruta.unlink(missing_ok=True)
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Construcción VECTORIZADA de los reemplazos (marcador → valor) por estudiante.
+
+Antes cada script armaba su diccionario fila por fila con iterrows(), row.get,
+pd.notna, str().strip() y .capitalize(); crear una Series de pandas por fila
+costaba más que el propio reemplazo en la plantilla. Aquí cada marcador se
+calcula de una vez para toda la columna y luego se entregan dicts simples.
+
+Las columnas del Excel y los marcadores de la plantilla también viven aquí;
+el módulo no importa pandas (solo recibe DataFrames), así que los scripts y
+los módulos livianos pueden usar estas constantes sin adelantar su carga.
+"""
+
+from perfilado import medir
+
+# --- NOMBRES DE LAS COLUMNAS EN EXCEL ---
+COL_CEDULA    = "CÉDULA DEL ESTUDIANTE"
+COL_ID        = "ID ESTUDIANTE"
+COL_APELLIDOS = "APELLIDOS"
+COL_NOMBRES   = "NOMBRES"
+COL_CARRERA   = "CARRERA"
+COL_TEMA      = "TEMA"
+COL_TRIB1     = "TRL1"
+COL_TRIB2     = "TRL2"
+COL_TRIB3     = "TRL3"
+
+COLUMNAS_REQUERIDAS = [
+    COL_CEDULA, COL_ID, COL_APELLIDOS, COL_NOMBRES,
+    COL_CARRERA, COL_TEMA, COL_TRIB1, COL_TRIB2, COL_TRIB3,
+]
+
+# --- MARCADORES EN LA PLANTILLA ---
+MARKERS = {
+    "{{NOMBRE_COMPLETO}}",
+    "{{CEDULA}}",
+    "{{TEMA}}",
+    "{{ID}}",
+    "{{CARRERA}}",
+    "{{TRIBUNAL_1}}",
+    "{{TRIBUNAL_2}}",
+    "{{TRIBUNAL_3}}",
+}
+
+
+def _texto(df, col):
+    """Columna como texto; las celdas vacías quedan como ''."""
+    return df[col].fillna("").astype(str)
+
+
+def columnas_de_contexto(df) -> dict:
+    """Calcula cada marcador para todas las filas a la vez (marcador → Series)."""
+    return {
+        "{{NOMBRE_COMPLETO}}": (_texto(df, COL_NOMBRES) + " " + _texto(df, COL_APELLIDOS)).str.strip(),
+        "{{CEDULA}}":          _texto(df, COL_CEDULA).str.strip(),
+        "{{TEMA}}":            _texto(df, COL_TEMA).str.strip().str.capitalize(),
+        "{{ID}}":              _texto(df, COL_ID).str.strip(),
+        "{{CARRERA}}":         _texto(df, COL_CARRERA).str.strip(),
+        "{{TRIBUNAL_1}}":      _texto(df, COL_TRIB1),
+        "{{TRIBUNAL_2}}":      _texto(df, COL_TRIB2),
+        "{{TRIBUNAL_3}}":      _texto(df, COL_TRIB3),
+    }
+
+
+def contextos_de_columnas(columnas: dict):
+    """Pasa de marcador → Series (columnas_de_contexto) a un dict por fila."""
+    claves = list(columnas)
+    listas = [serie.tolist() for serie in columnas.values()]
+    return (dict(zip(claves, valores)) for valores in zip(*listas))
+
+
+def iterar_contextos(df):
+    """Produce un dict marcador → valor por fila, en el orden del DataFrame."""
+    with medir("contexto"):
+        filas = contextos_de_columnas(columnas_de_contexto(df))
+    yield from filas
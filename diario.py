@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+Ejecuciones REANUDABLES: diario de filas completadas e informe de errores.
+
+Mientras se generan los documentos individuales, cada fila guardada se anota
+al instante en un diario (JSON por líneas) dentro de la carpeta de salida. Si
+el proceso se corta (una fila con datos inválidos, un archivo bloqueado, el
+disco lleno, un cierre inesperado), con --resume se saltan las filas ya
+anotadas cuyo documento sigue en disco y se continúa desde donde se quedó. Al
+terminar sin errores el diario se elimina.
+
+Las filas que fallan no detienen el lote: se escriben en un informe CSV y,
+como no quedan anotadas en el diario, --resume las vuelve a intentar.
+"""
+
+import csv
+import hashlib
+import io
+import json
+from pathlib import Path
+
+from archivos import escribir_atomico, limpiar_temporales
+
+NOMBRE_DIARIO = ".diario_notificaciones.jsonl"
+NOMBRE_INFORME = "informe_errores.csv"
+
+
+def hash_contexto(replacements, hash_plantilla="") -> str:
+    """Hash de los datos de una fila (más el de la plantilla)."""
+    contenido = json.dumps(replacements, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256((hash_plantilla + contenido).encode("utf-8")).hexdigest()
+
+
+class Diario:
+    """Diario archivo → hash de las filas ya generadas en una carpeta de salida."""
+
+    def __init__(self, output_dir, datos_plantilla: bytes, reanudar=False):
+        self.output_dir = Path(output_dir)
+        self.ruta = self.output_dir / NOMBRE_DIARIO
+        self.hash_plantilla = hashlib.sha256(datos_plantilla).hexdigest()
+        self.completadas = self._leer() if reanudar else {}
+        if reanudar:
+            limpiar_temporales(self.output_dir)
+        # Se reescribe con lo recuperado; lo nuevo se agrega línea a línea
+        cabecera = json.dumps({"plantilla": self.hash_plantilla})
+        lineas = [cabecera] + [json.dumps({"archivo": a, "hash": h}, ensure_ascii=False)
+                               for a, h in self.completadas.items()]
+        escribir_atomico(self.ruta, ("\n".join(lineas) + "\n").encode("utf-8"))
+        self._archivo = open(self.ruta, "a", encoding="utf-8")
+
+    def _leer(self):
+        """Filas anotadas en una ejecución anterior con la misma plantilla."""
+        completadas = {}
+        try:
+            with open(self.ruta, encoding="utf-8") as f:
+                if json.loads(f.readline() or "{}").get("plantilla") != self.hash_plantilla:
+                    return {}
+                for linea in f:
+                    try:
+                        fila = json.loads(linea)
+                    except ValueError:
+                        break  # Última línea a medio escribir al cortarse
+                    completadas[fila["archivo"]] = fila["hash"]
+        except (OSError, ValueError, KeyError):
+            pass
+        return completadas
+
+    def _relativa(self, ruta):
+        try:
+            return Path(ruta).relative_to(self.output_dir).as_posix()
+        except ValueError:
+            return Path(ruta).name
+
+    def pendientes(self, tareas):
+        """
+        Separa las tareas (replacements, ruta, ...) en (pendientes, saltadas):
+        se saltan las ya anotadas, sin cambios y cuyo archivo sigue en disco.
+        """
+        pendientes, saltadas = [], []
+        for tarea in tareas:
+            replacements, ruta = tarea[0], Path(tarea[1])
+            hecho = self.completadas.get(self._relativa(ruta))
+            if hecho == hash_contexto(replacements, self.hash_plantilla) and ruta.exists():
+                saltadas.append(tarea)
+            else:
+                pendientes.append(tarea)
+        return pendientes, saltadas
+
+    def registrar(self, replacements, ruta):
+        """Anota (y vuelca al disco) una fila generada correctamente."""
+        archivo = self._relativa(ruta)
+        hash_ = hash_contexto(replacements, self.hash_plantilla)
+        self.completadas[archivo] = hash_
+        self._archivo.write(json.dumps({"archivo": archivo, "hash": hash_}, ensure_ascii=False) + "\n")
+        self._archivo.flush()
+
+    def cerrar(self, completo=False):
+        """Cierra el diario; si el lote terminó sin errores, lo elimina."""
+        self._archivo.close()
+        if completo:
+            self.ruta.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cerrar()
+        return False
+
+
+class InformeErrores:
+    """Filas que fallaron, para revisarlas sin detener el lote."""
+
+    COLUMNAS = ("cedula", "nombre", "archivo", "error")
+
+    def __init__(self, ruta):
+        self.ruta = Path(ruta)
+        self.filas = []
+
+    def __len__(self):
+        return len(self.filas)
+
+    def agregar(self, replacements, error, archivo=""):
+        self.filas.append((
+            replacements.get("{{CEDULA}}", ""),
+            replacements.get("{{NOMBRE_COMPLETO}}", ""),
+            Path(archivo).name if archivo else "",
+            str(error),
+        ))
+
+    def guardar(self):
+        """Escribe el informe (CSV) si hubo errores; si no, borra el de una ejecución anterior."""
+        if not self.filas:
+            self.ruta.unlink(missing_ok=True)
+            return None
+        texto = io.StringIO()
+        escritor = csv.writer(texto)
+        escritor.writerow(self.COLUMNAS)
+        escritor.writerows(self.filas)
+        # Con BOM para que Excel lo abra con los acentos correctos
+        escribir_atomico(self.ruta, texto.getvalue().encode("utf-8-sig"))
+        return self.ruta
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Guardado de los documentos individuales directamente como ZIP.
+
+doc.save() vuelve a serializar y a comprimir TODAS las partes del paquete por
+cada estudiante (estilos, tema, fuentes, imágenes...), aunque solo cambian el
+documento principal y, si tienen marcadores, los encabezados y pies de página.
+Con un logo incrustado, casi todo el tiempo de guardado se iba en comprimir
+una y otra vez la misma imagen.
+
+Aquí las entradas que no cambian se toman de la plantilla YA COMPRIMIDAS (los
+bytes crudos del zip, con su CRC y tamaños) y se preparan una sola vez; por
+estudiante solo se serializan y comprimen las partes renderizadas, con un
+nivel de compresión configurable (0 = sin compresión, 9 = máxima).
+"""
+
+import io
+import struct
+import zipfile
+import zlib
+
+from lxml import etree
+
+from perfilado import medir
+from archivos import NIVEL_COMPRESION, escribir_atomico
+
+# Bit 11 de las flags: nombre de la entrada en UTF-8
+_UTF8 = 0x800
+
+
+def _fecha_dos(date_time):
+    anio, mes, dia, hora, minuto, segundo = date_time
+    return (hora << 11) | (minuto << 5) | (segundo // 2), ((anio - 1980) << 9) | (mes << 5) | dia
+
+
+class _Entrada:
+    """Una entrada del zip de salida: cabecera local + datos ya comprimidos."""
+
+    __slots__ = ("nombre", "flags", "metodo", "hora", "fecha", "crc", "comprimido", "tamano")
+
+    def __init__(self, nombre, flags, metodo, date_time, crc, comprimido, tamano):
+        self.nombre = nombre.encode("utf-8")
+        self.flags = flags | (_UTF8 if not nombre.isascii() else 0)
+        self.metodo = metodo
+        self.hora, self.fecha = _fecha_dos(date_time)
+        self.crc = crc
+        self.comprimido = comprimido
+        self.tamano = tamano
+
+    def local(self):
+        return struct.pack(
+            "<4s5H3L2H", b"PK\x03\x04", 20, self.flags, self.metodo, self.hora, self.fecha,
+            self.crc, len(self.comprimido), self.tamano, len(self.nombre), 0,
+        ) + self.nombre + self.comprimido
+
+    def central(self, desplazamiento):
+        return struct.pack(
+            "<4s6H3L5H2L", b"PK\x01\x02", 20, 20, self.flags, self.metodo, self.hora, self.fecha,
+            self.crc, len(self.comprimido), self.tamano, len(self.nombre), 0, 0, 0, 0, 0,
+            desplazamiento,
+        ) + self.nombre
+
+
+class EscritorDocx:
+    """
+    Guarda documentos renderizados con `plantilla` copiando de su zip las
+    partes que no cambian. Los documentos resultantes son equivalentes a los
+    de doc.save(), pero sin recomprimir nada más que lo renderizado.
+    """
+
+    def __init__(self, plantilla, nivel=NIVEL_COMPRESION):
+        if not 0 <= nivel <= 9:
+            raise ValueError(f"Nivel de compresión inválido: {nivel} (debe estar entre 0 y 9)")
+        self.plantilla = plantilla
+        self.nivel = nivel
+        self._renderizadas = set(plantilla.partes_renderizadas)
+
+        # Entradas fijas: se preparan una vez y se escriben al inicio de cada
+        # zip, así sus desplazamientos y registros centrales no cambian.
+        datos = plantilla.datos
+        copiadas, self._date_time = [], {}
+        with zipfile.ZipFile(io.BytesIO(datos)) as origen:
+            for info in origen.infolist():
+                self._date_time[info.filename] = info.date_time
+                if info.filename in self._renderizadas:
+                    continue
+                largo_nombre, largo_extra = struct.unpack(
+                    "<2H", datos[info.header_offset + 26:info.header_offset + 30]
+                )
+                inicio = info.header_offset + 30 + largo_nombre + largo_extra
+                copiadas.append(_Entrada(
+                    info.filename, info.flag_bits & _UTF8, info.compress_type, info.date_time,
+                    info.CRC, datos[inicio:inicio + info.compress_size], info.file_size,
+                ))
+
+        locales, centrales, desplazamiento = [], [], 0
+        for entrada in copiadas:
+            local = entrada.local()
+            centrales.append(entrada.central(desplazamiento))
+            locales.append(local)
+            desplazamiento += len(local)
+        self._prefijo = b"".join(locales)
+        self._centrales = b"".join(centrales)
+        self._n_copiadas = len(copiadas)
+
+    def _comprimir(self, xml):
+        if self.nivel == 0:
+            return zipfile.ZIP_STORED, xml
+        compresor = zlib.compressobj(self.nivel, zlib.DEFLATED, -15)
+        return zipfile.ZIP_DEFLATED, compresor.compress(xml) + compresor.flush()
+
+    def a_bytes(self, documento):
+        """Contenido del .docx de `documento` (renderizado con la plantilla)."""
+        desplazamiento = len(self._prefijo)
+        locales, centrales = [self._prefijo], [self._centrales]
+        partes = [documento.part] + [rel.target_part for rel in documento.part.rels.values()
+                                     if not rel.is_external]
+        escritas = set()
+        for parte in partes:
+            nombre = parte.partname[1:]
+            if nombre not in self._renderizadas or nombre in escritas:
+                continue
+            escritas.add(nombre)
+            # Igual que docx.opc.oxml.serialize_part_xml (sin importar python-docx)
+            xml = etree.tostring(parte.element, encoding="UTF-8", standalone=True)
+            metodo, comprimido = self._comprimir(xml)
+            entrada = _Entrada(nombre, 0, metodo, self._date_time[nombre],
+                               zlib.crc32(xml), comprimido, len(xml))
+            local = entrada.local()
+            centrales.append(entrada.central(desplazamiento))
+            locales.append(local)
+            desplazamiento += len(local)
+
+        directorio = b"".join(centrales)
+        total = self._n_copiadas + len(escritas)
+        fin = struct.pack("<4s4H2LH", b"PK\x05\x06", 0, 0, total, total,
+                          len(directorio), desplazamiento, 0)
+        return b"".join(locales) + directorio + fin
+
+    def guardar(self, documento, ruta_salida):
+        """Escribe `documento` (renderizado con la plantilla) en `ruta_salida`, de forma atómica."""
+        escribir_atomico(ruta_salida, self.a_bytes(documento))
+
+    def generar_bytes(self, replacements):
+        """Renderiza un estudiante y devuelve el contenido de su .docx."""
+        documento = self.plantilla.renderizar(replacements)
+        with medir("guardado"):
+            return self.a_bytes(documento)
+
+    def generar(self, replacements, ruta_salida):
+        """Renderiza un estudiante y lo guarda."""
+        documento = self.plantilla.renderizar(replacements)
+        with medir("guardado"):
+            self.guardar(documento, ruta_salida)
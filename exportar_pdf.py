@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+"""
+Exportación MASIVA a PDF de los documentos generados.
+
+Lanzar un LibreOffice por documento (soffice --convert-to pdf) cuesta varios
+segundos por archivo y era, con diferencia, lo más lento de todo el proceso.
+Aquí se mantiene un pool de convertidores de larga vida (servidores
+`unoserver`, cada uno con su propio LibreOffice headless y perfil de usuario)
+que reciben los documentos por XML-RPC a medida que se van generando.
+
+Convertidor: unoserver, LibreOffice headless (pip install unoserver). Los
+benchmarks inyectan uno sin LibreOffice (benchmarks/convertidor_falso.py)
+pasando su clase a PoolPdf en lugar del nombre.
+
+Uso independiente, sobre documentos ya generados:
+    python exportar_pdf.py Notificaciones_Generadas -w 4
+    python exportar_pdf.py notificaciones_TODOS_EN_UNO.docx
+"""
+
+import argparse
+import queue
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import perfilado
+from perfilado import medir
+
+# Segundos de espera a que un servidor unoserver acepte conexiones
+TIEMPO_ARRANQUE = 60
+
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def ruta_pdf(origen, output_dir=None):
+    """Ruta del PDF de un .docx: al lado del original o en `output_dir`."""
+    origen = Path(origen)
+    carpeta = Path(output_dir) if output_dir else origen.parent
+    return carpeta / origen.with_suffix(".pdf").name
+
+
+# ---------- CONVERTIDORES ----------
+class ConvertidorUnoserver:
+    """Un servidor unoserver (LibreOffice headless) de larga vida."""
+
+    def __init__(self):
+        self._proceso = None
+        self._perfil = None
+        self._cliente = None
+
+    def iniciar(self):
+        try:
+            from unoserver.client import UnoClient
+        except ImportError:
+            raise RuntimeError(
+                "El convertidor 'unoserver' requiere el paquete unoserver (pip install unoserver) "
+                "y LibreOffice instalado."
+            ) from None
+        ejecutable = shutil.which("unoserver")
+        if ejecutable is None:
+            raise RuntimeError("No se encuentra el comando 'unoserver' en el PATH.")
+
+        puerto, puerto_uno = _puerto_libre(), _puerto_libre()
+        # Perfil propio: dos LibreOffice no pueden compartir el mismo perfil
+        self._perfil = tempfile.mkdtemp(prefix="notif_lo_")
+        self._proceso = subprocess.Popen(
+            [ejecutable, "--interface", "127.0.0.1", "--port", str(puerto),
+             "--uno-interface", "127.0.0.1", "--uno-port", str(puerto_uno),
+             "--user-installation", Path(self._perfil).as_uri()],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        limite = time.monotonic() + TIEMPO_ARRANQUE
+        while True:
+            if self._proceso.poll() is not None:
+                self.cerrar()
+                raise RuntimeError("El servidor unoserver terminó al arrancar.")
+            try:
+                socket.create_connection(("127.0.0.1", puerto), timeout=1).close()
+                break
+            except OSError:
+                if time.monotonic() > limite:
+                    self.cerrar()
+                    raise RuntimeError(f"unoserver no respondió en {TIEMPO_ARRANQUE} s.")
+                time.sleep(0.2)
+        self._cliente = UnoClient(server="127.0.0.1", port=str(puerto))
+
+    def convertir(self, origen, destino):
+        self._cliente.convert(inpath=str(Path(origen).resolve()),
+                              outpath=str(Path(destino).resolve()), convert_to="pdf")
+
+    def cerrar(self):
+        if self._proceso is not None:
+            self._proceso.terminate()
+            try:
+                self._proceso.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._proceso.kill()
+            self._proceso = None
+        if self._perfil is not None:
+            shutil.rmtree(self._perfil, ignore_errors=True)
+            self._perfil = None
+        self._cliente = None
+
+
+CONVERTIDORES = {
+    "unoserver": ConvertidorUnoserver,
+}
+
+
+# ---------- POOL ----------
+class PoolPdf:
+    """
+    Pool de convertidores de larga vida. `enviar` encola un documento y
+    devuelve un Future, así la conversión corre mientras se siguen generando
+    los demás; cada hilo toma un convertidor libre y lo devuelve al terminar.
+    Si una conversión falla, el convertidor se reinicia y se reintenta una vez;
+    si no vuelve a arrancar, sale del pool (y sin ninguno, todo falla).
+    `convertidor` es un nombre de CONVERTIDORES o una clase/fábrica.
+    """
+
+    def __init__(self, convertidor="unoserver", workers=2, output_dir=None):
+        fabrica = CONVERTIDORES[convertidor] if isinstance(convertidor, str) else convertidor
+        self.workers = max(1, workers)
+        self.output_dir = Path(output_dir) if output_dir else None
+        self.convertidores = [fabrica() for _ in range(self.workers)]
+        self._libres = queue.Queue()
+        self._vivos = self.workers
+        self._candado = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pdf")
+        # Los LibreOffice arrancan a la vez, no uno tras otro
+        try:
+            list(self._executor.map(lambda c: c.iniciar(), self.convertidores))
+        except Exception:
+            self.cerrar()
+            raise
+        for c in self.convertidores:
+            self._libres.put(c)
+        if self.output_dir:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+
+    def _convertir(self, origen, destino):
+        convertidor = self._libres.get()
+        if convertidor is None:
+            # Marca de que no queda ninguno: se deja para los siguientes
+            self._libres.put(None)
+            raise RuntimeError("No queda ningún convertidor a PDF en funcionamiento.")
+        sano = True
+        try:
+            with medir("pdf"):
+                try:
+                    convertidor.convertir(origen, destino)
+                except FileNotFoundError:
+                    raise
+                except Exception:
+                    convertidor.cerrar()
+                    try:
+                        convertidor.iniciar()
+                    except Exception:
+                        sano = False
+                        raise
+                    convertidor.convertir(origen, destino)
+        finally:
+            if sano:
+                self._libres.put(convertidor)
+            else:
+                self._descartar(convertidor)
+        return destino
+
+    def _descartar(self, convertidor):
+        """Saca del pool un convertidor que no volvió a arrancar."""
+        convertidor.cerrar()
+        with self._candado:
+            self._vivos -= 1
+            if self._vivos == 0:
+                self._libres.put(None)
+
+    def enviar(self, origen):
+        """Encola la conversión de `origen`; el Future devuelve la ruta del PDF."""
+        return self._executor.submit(self._convertir, origen, ruta_pdf(origen, self.output_dir))
+
+    def convertir(self, rutas):
+        """Convierte `rutas` y produce (ruta, error) en el mismo orden."""
+        futuros = [(ruta, self.enviar(ruta)) for ruta in rutas]
+        for ruta, futuro in futuros:
+            yield ruta, esperar(futuro)
+
+    def cerrar(self, cancelar=False):
+        """Espera (o descarta, con cancelar=True) lo pendiente y detiene los convertidores."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=cancelar)
+            self._executor = None
+        for c in self.convertidores:
+            c.cerrar()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cerrar(cancelar=exc_type is not None)
+        return False
+
+
+def esperar(futuro):
+    """Resultado de una conversión: None si terminó bien o el mensaje de error."""
+    try:
+        futuro.result()
+    except Exception as e:
+        return str(e) or type(e).__name__
+    return None
+
+
+def documentos_a_convertir(rutas):
+    """Expande carpetas a sus .docx (también en subcarpetas); los archivos se toman tal cual."""
+    documentos = []
+    for ruta in map(Path, rutas):
+        if ruta.is_dir():
+            documentos.extend(sorted(d for d in ruta.rglob("*.docx") if not d.name.startswith(".")))
+        else:
+            documentos.append(ruta)
+    return documentos
+
+
+def main(rutas, workers=2, convertidor="unoserver", output_dir=None):
+    documentos = documentos_a_convertir(rutas)
+    if not documentos:
+        print("Advertencia: No se encontraron documentos para convertir.")
+        return
+    print(f"Convirtiendo {len(documentos)} documentos a PDF con {workers} convertidores ({convertidor})...")
+    try:
+        pool = PoolPdf(convertidor, workers, output_dir)
+    except RuntimeError as e:
+        print(f"Error Crítico: {e}")
+        sys.exit(1)
+
+    convertidos = 0
+    with pool:
+        for ruta, error in pool.convertir(documentos):
+            if error is None:
+                convertidos += 1
+                print(f"- PDF: {ruta_pdf(ruta, output_dir).name}")
+            else:
+                print(f"- ERROR al convertir {ruta.name}: {error}")
+    print(f"\nSe exportaron {convertidos} de {len(documentos)} documentos a PDF.")
+
+
+def agregar_argumentos(parser):
+    """Agrega --pdf, --pdf_workers y --convertidor a un ArgumentParser."""
+    parser.add_argument(
+        "--pdf",
+        action="store_true",
+        help="Exporta también cada documento generado a PDF."
+    )
+    parser.add_argument(
+        "--pdf_workers",
+        type=int,
+        default=2,
+        help="Número de convertidores (LibreOffice) en paralelo para --pdf. Por defecto, 2."
+    )
+    parser.add_argument(
+        "--convertidor",
+        choices=sorted(CONVERTIDORES),
+        default="unoserver",
+        help="Convertidor a PDF. Por defecto, 'unoserver'."
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convierte a PDF las notificaciones generadas.")
+    parser.add_argument(
+        "rutas",
+        nargs="+",
+        help="Documentos .docx o carpetas (se toman sus .docx, también en subcarpetas)."
+    )
+    parser.add_argument(
+        "-w", "--workers",
+        type=int,
+        default=2,
+        help="Número de convertidores (LibreOffice) en paralelo. Por defecto, 2."
+    )
+    parser.add_argument(
+        "--convertidor",
+        choices=sorted(CONVERTIDORES),
+        default="unoserver",
+        help="Convertidor a PDF. Por defecto, 'unoserver'."
+    )
+    parser.add_argument(
+        "-o", "--output_dir",
+        help="Carpeta de los PDF. Por defecto, la misma de cada documento."
+    )
+    perfilado.agregar_argumentos(parser)
+    args = parser.parse_args()
+    perfilado.ejecutar(args, main, args.rutas, args.workers, args.convertidor, args.output_dir)
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+Lectura RÁPIDA del Excel de estudiantes.
+
+- Solo se extraen las nueve columnas COL_* (proyección), recorriendo la hoja
+  con openpyxl en modo de solo lectura (streaming), sin construir un DataFrame
+  con todas las columnas del reporte.
+- Para archivos muy grandes, iterar_bloques() entrega la hoja por bloques
+  de filas sin cargarla entera en memoria.
+- La tabla ya leída y validada se guarda en caché, en memoria y en disco
+  (pickle junto al Excel), con clave en la fecha de modificación y el tamaño
+  del archivo: si el libro no cambió, no se vuelve a parsear.
+- El índice de los DataFrames es el número de fila en la hoja (la del
+  encabezado es la 1), para que los informes apunten a la fila del Excel.
+"""
+
+import pickle
+from pathlib import Path
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from contexto import COL_CEDULA, COLUMNAS_REQUERIDAS
+from perfilado import medir
+
+# Cambiar si cambia el formato de la tabla guardada en caché
+VERSION_CACHE = 3
+
+# Caché en memoria: ruta → (clave, DataFrame)
+_memoria = {}
+
+
+class ColumnasFaltantes(ValueError):
+    """El Excel no tiene todas las columnas requeridas."""
+
+    def __init__(self, faltantes):
+        super().__init__(f"Faltan columnas en el Excel: {faltantes}")
+        self.faltantes = faltantes
+
+
+def _encabezado(filas):
+    """Nombres de columna (sin espacios) de la primera fila; valida las requeridas."""
+    encabezado = [str(c).strip() if c is not None else "" for c in next(filas, ())]
+    faltantes = [col for col in COLUMNAS_REQUERIDAS if col not in encabezado]
+    if faltantes:
+        raise ColumnasFaltantes(faltantes)
+    return encabezado
+
+
+def _bloques_proyectados(ruta: Path, tamano_bloque=None):
+    """
+    Lee solo las columnas requeridas de la primera hoja del libro y produce
+    DataFrames de hasta `tamano_bloque` filas (o uno solo con todo si es None),
+    indexados por el número de fila en la hoja.
+    """
+    wb = load_workbook(ruta, read_only=True, data_only=True)
+    try:
+        filas = wb.worksheets[0].iter_rows(values_only=True)
+        encabezado = _encabezado(filas)
+        posiciones = [encabezado.index(col) for col in COLUMNAS_REQUERIDAS]
+
+        columnas = {col: [] for col in COLUMNAS_REQUERIDAS}
+        numeros = []
+        # iter_rows empieza en la fila 1 (el encabezado) y entrega también las vacías
+        for numero, fila in enumerate(filas, start=2):
+            valores = [fila[i] if i < len(fila) else None for i in posiciones]
+            if all(v is None for v in valores):
+                continue  # Fila vacía
+            for lista, valor in zip(columnas.values(), valores):
+                lista.append(valor)
+            numeros.append(numero)
+            if tamano_bloque and len(numeros) >= tamano_bloque:
+                yield pd.DataFrame(columnas, index=pd.Index(numeros, name="fila"))
+                columnas = {col: [] for col in COLUMNAS_REQUERIDAS}
+                numeros = []
+        if numeros or not tamano_bloque:
+            yield pd.DataFrame(columnas, index=pd.Index(numeros, name="fila", dtype="int64"))
+    finally:
+        wb.close()
+
+
+def _sin_decimales(valor):
+    """123.0 → 123; cualquier otro valor queda igual."""
+    return int(valor) if isinstance(valor, float) and valor.is_integer() else valor
+
+
+def _por_celda(serie: pd.Series) -> pd.Series:
+    # dtype object explícito: map() volvería a inferir float para [123, nan]
+    return pd.Series([_sin_decimales(v) for v in serie.tolist()], index=serie.index, dtype=object)
+
+
+def _enteros_sin_decimales(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Números enteros guardados como decimales → int (sin '.0'). Se decide
+    celda por celda, no por columna: en modo --bloque el mismo valor sale
+    igual sin importar qué otras filas caigan en su bloque.
+    """
+    for col in df.columns:
+        serie = df[col]
+        if serie.dtype.kind == "f":
+            enteros = serie.notna() & (serie % 1 == 0)
+            if enteros.all():
+                df[col] = serie.astype("int64")
+            elif enteros.any():
+                df[col] = _por_celda(serie)
+        elif serie.dtype == object:
+            df[col] = _por_celda(serie)
+    return df
+
+
+def _filtrar(df: pd.DataFrame) -> pd.DataFrame:
+    """Descarta las filas sin cédula (conservando el número de fila) y normaliza los números enteros."""
+    return _enteros_sin_decimales(df.dropna(subset=[COL_CEDULA]))
+
+
+def _ruta_cache(ruta: Path) -> Path:
+    return ruta.with_name(f".{ruta.name}.cache.pkl")
+
+
+def _clave(ruta: Path):
+    info = ruta.stat()
+    return (VERSION_CACHE, str(ruta.resolve()), info.st_mtime_ns, info.st_size)
+
+
+def leer_estudiantes(ruta, usar_cache=True) -> pd.DataFrame:
+    """
+    Devuelve las filas con cédula del Excel, solo con las columnas requeridas.
+
+    Lanza ColumnasFaltantes si falta alguna columna; cualquier otro error de
+    lectura se propaga tal cual.
+    """
+    ruta = Path(ruta)
+    clave = _clave(ruta)
+
+    if usar_cache:
+        en_memoria = _memoria.get(ruta)
+        if en_memoria is not None and en_memoria[0] == clave:
+            return en_memoria[1].copy()
+        try:
+            with medir("lectura_excel"), open(_ruta_cache(ruta), "rb") as f:
+                clave_guardada, df = pickle.load(f)
+            if clave_guardada == clave:
+                _memoria[ruta] = (clave, df)
+                return df.copy()
+        except Exception:
+            pass  # Sin caché o caché inválida: se lee el Excel
+
+    with medir("lectura_excel"):
+        (df,) = _bloques_proyectados(ruta)
+    with medir("validacion"):
+        df = _filtrar(df)
+
+    if usar_cache:
+        _memoria[ruta] = (clave, df)
+        try:
+            with open(_ruta_cache(ruta), "wb") as f:
+                pickle.dump((clave, df), f, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError:
+            pass  # Carpeta de solo lectura: basta con la caché en memoria
+    return df.copy()
+
+
+def verificar_columnas(ruta):
+    """Comprueba solo el encabezado del Excel; lanza ColumnasFaltantes si falta algo."""
+    wb = load_workbook(ruta, read_only=True, data_only=True)
+    try:
+        _encabezado(wb.worksheets[0].iter_rows(values_only=True))
+    finally:
+        wb.close()
+
+
+def iterar_bloques(ruta, tamano_bloque):
+    """
+    Lee el Excel en streaming y produce bloques de hasta `tamano_bloque` filas
+    con cédula (sin caché): la memoria no depende del tamaño del archivo.
+    """
+    bloques = _bloques_proyectados(Path(ruta), tamano_bloque)
+    while True:
+        with medir("lectura_excel"):
+            bloque = next(bloques, None)
+        if bloque is None:
+            return
+        with medir("validacion"):
+            bloque = _filtrar(bloque)
+        if not bloque.empty:
+            yield bloque
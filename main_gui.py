@@ -6,15 +6,25 @@ Permite al usuario elegir entre generar archivos individuales por estudiante
 o un único documento consolidado con todos los estudiantes.
 """
 
+import arranque  # Primero: marca el inicio para --startup-timing
 import tkinter as tk
 from tkinter import ttk, scrolledtext, filedialog
-import pandas as pd
-from docx import Document
 from pathlib import Path
 import os
 import sys
-import re
 import threading
+import queue
+import time
+import multiprocessing
+
+# Solo módulos livianos al cargar: la ventana aparece sin esperar a pandas ni a
+# python-docx, que se precargan en segundo plano (ver precargar()).
+import perfilado
+from exportar_pdf import PoolPdf, esperar, ruta_pdf
+from contexto import MARKERS
+
+# Módulos de generación (importan pandas, openpyxl y python-docx)
+MODULOS_GENERACION = ("plantilla", "paralelo", "consolidado", "contexto", "ingesta", "diario", "validacion")
 
 # --- CONFIGURACIÓN GLOBAL ---
 
@@ -36,181 +46,302 @@ EXCEL_FILE = resource_path("otro.xlsx")
 TEMPLATE_DOCX = resource_path("plantilla.docx")
 
 
-# --- NOMBRES DE COLUMNAS (igual que en los otros scripts) ---
-COL_CEDULA = "CÉDULA DEL ESTUDIANTE"
-COL_ID = "ID ESTUDIANTE"
-COL_APELLIDOS = "APELLIDOS"
-COL_NOMBRES = "NOMBRES"
-COL_CARRERA = "CARRERA"
-COL_TEMA = "TEMA"
-COL_TRIB1 = "TRL1"
-COL_TRIB2 = "TRL2"
-COL_TRIB3 = "TRL3"
+# --- EJECUCIÓN EN SEGUNDO PLANO ---
+
+class Cancelado(Exception):
+    """El usuario pulsó Cancelar durante la generación."""
+
+
+class Trabajo:
+    """
+    Canal entre el hilo de generación y la interfaz.
+
+    El hilo de trabajo nunca toca los widgets de Tk: solo publica eventos en
+    una cola que el bucle principal vacía periódicamente con root.after().
+    """
+
+    def __init__(self, perfilar=False):
+        self.eventos = queue.Queue()
+        self.perfilar = perfilar
+        self._cancelar = threading.Event()
+
+    def log(self, mensaje):
+        self.eventos.put(("log", mensaje))
+
+    def progreso(self, hechos, total):
+        self.eventos.put(("progreso", (hechos, total)))
+
+    def cancelar(self):
+        self._cancelar.set()
+
+    def comprobar_cancelacion(self):
+        """Lanza Cancelado si el usuario pidió detener el proceso."""
+        if self._cancelar.is_set():
+            raise Cancelado()
+
+    def ejecutar(self, funcion, *args):
+        """Cuerpo del hilo de trabajo: siempre termina publicando 'fin'."""
+        if self.perfilar:
+            perfilado.activar()
+        try:
+            funcion(self, *args)
+        except Cancelado:
+            self.log("\nProceso cancelado por el usuario.\n")
+        except Exception as e:
+            self.log(f"\nError inesperado: {e}\n")
+        finally:
+            if self.perfilar:
+                perfilado.desactivar()
+                self.log(f"\n--- Tiempo por etapa ---\n{perfilado.tabla_resumen()}\n")
+            self.eventos.put(("fin", None))
+
 
 # --- LÓGICA DE GENERACIÓN (funciones adaptadas de los scripts anteriores) ---
 
-def reemplazar_texto(doc, replacements):
-    """Busca y reemplaza texto en párrafos y tablas."""
-    for p in doc.paragraphs:
-        for key, value in replacements.items():
-            if key in p.text:
-                for run in p.runs:
-                    run.text = run.text.replace(key, str(value))
-    for table in doc.tables:
-        for row in table.rows:
-            for cell in row.cells:
-                for p in cell.paragraphs:
-                    for key, value in replacements.items():
-                        if key in p.text:
-                            for run in p.runs:
-                                run.text = run.text.replace(key, str(value))
-
-def leer_y_validar_excel(log_area):
-    """Lee y valida el archivo Excel. Devuelve el DataFrame o None si hay error."""
+def precargar():
+    """Importa los módulos de generación (en un hilo, tras mostrar la ventana)."""
+    try:
+        arranque.importar_pesados(*MODULOS_GENERACION)
+    except Exception:
+        pass  # Si algo falta, el error se informa al generar
+    arranque.marcar("precarga completa")
+
+def leer_y_validar_excel(trabajo, ruta_informe=None, filtrar=False):
+    """
+    Lee y valida el archivo Excel. Devuelve el DataFrame (sin las filas con
+    errores si filtrar) o None si hay error. El informe de validación se
+    guarda en ruta_informe.
+    """
+    from ingesta import ColumnasFaltantes, leer_estudiantes
+    from validacion import Validador
+
     if not os.path.exists(EXCEL_FILE):
-        log_area.insert(tk.END, f"Error Crítico: No se encuentra el archivo Excel: {EXCEL_FILE}\n")
+        trabajo.log(f"Error Crítico: No se encuentra el archivo Excel: {EXCEL_FILE}\n")
         return None
     if not os.path.exists(TEMPLATE_DOCX):
-        log_area.insert(tk.END, f"Error Crítico: No se encuentra la plantilla de Word: {TEMPLATE_DOCX}\n")
+        trabajo.log(f"Error Crítico: No se encuentra la plantilla de Word: {TEMPLATE_DOCX}\n")
         return None
 
     try:
-        df = pd.read_excel(EXCEL_FILE, header=0)
-        df.columns = df.columns.str.strip()
-        log_area.insert(tk.END, "Archivo Excel leído correctamente.\n")
+        # Solo las columnas requeridas; si el Excel no cambió se reutiliza la caché
+        filas_validas = leer_estudiantes(EXCEL_FILE)
+        trabajo.log("Archivo Excel leído correctamente.\n")
+    except ColumnasFaltantes as e:
+        trabajo.log(f"Error: Faltan columnas en 'otro.xlsx': {e.faltantes}\n")
+        return None
     except Exception as e:
-        log_area.insert(tk.END, f"Error al leer el archivo Excel: {e}\n")
+        trabajo.log(f"Error al leer el archivo Excel: {e}\n")
         return None
 
-    required_cols = [COL_CEDULA, COL_ID, COL_APELLIDOS, COL_NOMBRES, COL_CARRERA, COL_TEMA, COL_TRIB1, COL_TRIB2, COL_TRIB3]
-    missing_cols = [col for col in required_cols if col not in df.columns]
-    if missing_cols:
-        log_area.insert(tk.END, f"Error: Faltan columnas en 'otro.xlsx': {missing_cols}\n")
+    if filas_validas.empty:
+        trabajo.log("Advertencia: No se encontraron estudiantes con cédula.\n")
         return None
 
-    filas_validas = df.dropna(subset=[COL_CEDULA]).copy()
+    # Reglas de cédula, duplicados y columnas obligatorias antes de renderizar
+    validador = Validador(filtrar=filtrar)
+    filas_validas = validador.validar(filas_validas)
+    lineas = validador.resumen()
+    for linea in lineas:
+        trabajo.log(f"Validación: {linea}\n")
+    if ruta_informe is not None:
+        validador.guardar(ruta_informe)
+        if lineas:
+            trabajo.log(f"Informe de validación: {Path(ruta_informe).resolve()}\n")
     if filas_validas.empty:
-        log_area.insert(tk.END, "Advertencia: No se encontraron estudiantes con cédula.\n")
+        trabajo.log("Advertencia: Ninguna fila pasó la validación (desmarque 'Excluir filas con errores' para generarlas).\n")
         return None
-        
+
     return filas_validas
 
-def generar_individuales(log_area, root, output_path_var):
-    """Lógica para generar archivos de Word individuales."""
-    output_dir_str = output_path_var.get()
-    if not output_dir_str or not os.path.isdir(output_dir_str):
-        log_area.delete('1.0', tk.END)
-        log_area.insert(tk.END, "Error: Por favor, seleccione una carpeta de destino válida primero.\n")
-        return
+def compilar_plantilla(trabajo, consolidado=False):
+    """Compila la plantilla y avisa de marcadores desconocidos o sin usar."""
+    from plantilla import PlantillaCompilada
 
-    output_dir = Path(output_dir_str)
-    log_area.delete('1.0', tk.END)
-    log_area.insert(tk.END, f"Iniciando generación de archivos individuales en: {output_dir}\n")
-    root.update_idletasks()
+    plantilla = PlantillaCompilada(TEMPLATE_DOCX)
+    for mensaje in plantilla.advertencias(MARKERS, consolidado):
+        trabajo.log(f"Advertencia: {mensaje}\n")
+    return plantilla
 
-    filas_validas = leer_y_validar_excel(log_area)
+def abrir_pool_pdf(trabajo, convertidor, workers):
+    """Arranca los convertidores a PDF. Devuelve el pool o None si hay error."""
+    trabajo.log("Iniciando los convertidores a PDF...\n")
+    try:
+        return PoolPdf(convertidor, workers)
+    except RuntimeError as e:
+        trabajo.log(f"Error Crítico: {e}\n")
+        return None
+
+def esperar_pdfs(trabajo, conversiones):
+    """Espera las conversiones (ruta, futuro) pendientes, con progreso."""
+    total = len(conversiones)
+    trabajo.log(f"\nEsperando la conversión a PDF de {total} documentos...\n")
+    trabajo.progreso(0, total)
+    for hechos, (ruta, futuro) in enumerate(conversiones, start=1):
+        error = esperar(futuro)
+        if error is not None:
+            trabajo.log(f"- ERROR al convertir a PDF {ruta.name}: {error}\n")
+        trabajo.progreso(hechos, total)
+        trabajo.comprobar_cancelacion()
+
+def informar_errores(trabajo, informe):
+    """Guarda el informe de filas con errores y lo anuncia en el log."""
+    ruta = informe.guardar()
+    if ruta is not None:
+        trabajo.log(f"\n{len(informe)} filas con errores; detalle en: {ruta.resolve()}\n")
+
+def generar_individuales(trabajo, output_dir, workers=1, pdf=False, reanudar=False, filtrar=False, convertidor="unoserver"):
+    """Lógica para generar archivos de Word individuales (y opcionalmente sus PDF)."""
+    from paralelo import generar_documentos
+    from contexto import iterar_contextos
+    from diario import NOMBRE_INFORME, Diario, InformeErrores
+    from nombres import Nombrador
+    from reglas_validacion import NOMBRE_INFORME_VALIDACION
+
+    trabajo.log(f"Iniciando generación de archivos individuales en: {output_dir}\n")
+
+    filas_validas = leer_y_validar_excel(trabajo, output_dir / NOMBRE_INFORME_VALIDACION, filtrar)
     if filas_validas is None:
-        log_area.insert(tk.END, "Proceso detenido por errores.\n")
+        trabajo.log("Proceso detenido por errores.\n")
         return
 
-    log_area.insert(tk.END, f"Se encontraron {len(filas_validas)} estudiantes.\n")
-
-    for _, row in filas_validas.iterrows():
-        replacements = {
-            "{{NOMBRE_COMPLETO}}": f"{row.get(COL_NOMBRES, '')} {row.get(COL_APELLIDOS, '')}".strip(),
-            "{{CEDULA}}": str(row.get(COL_CEDULA, '')).strip(),
-            "{{TEMA}}": str(row.get(COL_TEMA, '')).strip().capitalize(),
-            "{{ID}}": str(row.get(COL_ID, '')).strip(),
-            "{{CARRERA}}": str(row.get(COL_CARRERA, '')).strip(),
-            "{{TRIBUNAL_1}}": str(row.get(COL_TRIB1, '')) if pd.notna(row.get(COL_TRIB1)) else "",
-            "{{TRIBUNAL_2}}": str(row.get(COL_TRIB2, '')) if pd.notna(row.get(COL_TRIB2)) else "",
-            "{{TRIBUNAL_3}}": str(row.get(COL_TRIB3, '')) if pd.notna(row.get(COL_TRIB3)) else "",
-        }
-        doc = Document(TEMPLATE_DOCX)
-        reemplazar_texto(doc, replacements)
-        nombre_archivo = f"Notificacion_{replacements['{{NOMBRE_COMPLETO}}']}.docx"
-        nombre_archivo_seguro = re.sub(r'[^a-zA-Z0-9_\.]', '_', nombre_archivo)
-        ruta_salida = output_dir / nombre_archivo_seguro
-        doc.save(ruta_salida)
-        log_area.insert(tk.END, f"- Generado: {nombre_archivo_seguro}\n")
-        root.update_idletasks()
-
-    log_area.insert(tk.END, f"\n¡ÉXITO! Proceso completado.\nSe guardaron los archivos en: {output_dir.resolve()}\n")
-
-def generar_unico(log_area, root, output_path_var):
-    """Lógica para generar un único archivo de Word con saltos de página."""
-    output_dir_str = output_path_var.get()
-    if not output_dir_str or not os.path.isdir(output_dir_str):
-        log_area.delete('1.0', tk.END)
-        log_area.insert(tk.END, "Error: Por favor, seleccione una carpeta de destino válida primero.\n")
+    total = len(filas_validas)
+    trabajo.log(f"Se encontraron {total} estudiantes.\n")
+    trabajo.progreso(0, total)
+    plantilla = compilar_plantilla(trabajo)
+
+    # Nombres con cédula y sin acentos; los repetidos reciben _2, _3...
+    nombrador = Nombrador()
+    tareas = []
+    for replacements in iterar_contextos(filas_validas):
+        tareas.append((replacements, output_dir / nombrador.ruta(replacements)))
+    if nombrador.colisiones:
+        trabajo.log(f"Se resolvieron {nombrador.colisiones} nombres de archivo repetidos.\n")
+
+    # Los PDF se convierten mientras se siguen generando los demás documentos
+    # (el pool se abre antes que el diario: si falla, no queda nada abierto)
+    pool_pdf = abrir_pool_pdf(trabajo, convertidor, 2) if pdf else None
+    if pdf and pool_pdf is None:
+        trabajo.log("Proceso detenido por errores.\n")
         return
-        
-    output_dir = Path(output_dir_str)
-    log_area.delete('1.0', tk.END)
-    log_area.insert(tk.END, f"Iniciando generación de documento único en: {output_dir}\n")
-    root.update_idletasks()
+    conversiones = []
+
+    # Diario de filas completadas: si se corta o se cancela, se puede reanudar
+    try:
+        diario = Diario(output_dir, plantilla.datos, reanudar)
+    except BaseException:
+        if pool_pdf is not None:
+            pool_pdf.cerrar(cancelar=True)
+        raise
+    informe = InformeErrores(output_dir / NOMBRE_INFORME)
+    tareas, hechas = diario.pendientes(tareas)
+    if hechas:
+        trabajo.log(f"Reanudando: {len(hechas)} documentos ya estaban generados.\n")
+    trabajo.progreso(len(hechas), total)
+
+    resultados = generar_documentos(plantilla, tareas, workers)
+    completo = False
+    try:
+        for hechos, ((replacements, ruta_salida), error) in enumerate(resultados, start=len(hechas) + 1):
+            if error is None:
+                diario.registrar(replacements, ruta_salida)
+                trabajo.log(f"- Generado: {ruta_salida.name}\n")
+                if pool_pdf is not None:
+                    conversiones.append((ruta_salida, pool_pdf.enviar(ruta_salida)))
+            else:
+                informe.agregar(replacements, error, ruta_salida)
+                trabajo.log(f"- ERROR al guardar para {replacements['{{NOMBRE_COMPLETO}}']}: {error}\n")
+            trabajo.progreso(hechos, total)
+            trabajo.comprobar_cancelacion()
+        completo = len(informe) == 0
+        if pool_pdf is not None:
+            # También los documentos de la ejecución anterior que aún no tienen PDF
+            conversiones += [(ruta, pool_pdf.enviar(ruta)) for _, ruta in hechas if not ruta_pdf(ruta).exists()]
+            esperar_pdfs(trabajo, conversiones)
+    finally:
+        # Al cancelar, cierra los pools y descarta lo que quedaba pendiente
+        resultados.close()
+        if pool_pdf is not None:
+            pool_pdf.cerrar(cancelar=True)
+        diario.cerrar(completo)
+        informar_errores(trabajo, informe)
+
+    trabajo.log(f"\n¡ÉXITO! Proceso completado.\nSe guardaron los archivos en: {output_dir.resolve()}\n")
+
+def generar_unico(trabajo, output_dir, pdf=False, reanudar=False, filtrar=False, convertidor="unoserver"):
+    """Lógica para generar un único archivo de Word con saltos de página."""
+    from consolidado import EscritorConsolidado, PuntoDeControl
+    from contexto import iterar_contextos
+    from diario import InformeErrores
 
-    filas_validas = leer_y_validar_excel(log_area)
+    trabajo.log(f"Iniciando generación de documento único en: {output_dir}\n")
+
+    filas_validas = leer_y_validar_excel(trabajo, output_dir / "notificaciones_TODOS_EN_UNO_validacion.json", filtrar)
     if filas_validas is None:
-        log_area.insert(tk.END, "Proceso detenido por errores.\n")
+        trabajo.log("Proceso detenido por errores.\n")
         return
 
-    log_area.insert(tk.END, f"Se encontraron {len(filas_validas)} estudiantes.\n")
-
-    # --- Procesa el primer estudiante para crear el documento base ---
-    primer_estudiante = filas_validas.iloc[0]
-    replacements = {
-        "{{NOMBRE_COMPLETO}}": f"{primer_estudiante.get(COL_NOMBRES, '')} {primer_estudiante.get(COL_APELLIDOS, '')}".strip(),
-        "{{CEDULA}}": str(primer_estudiante.get(COL_CEDULA, '')).strip(),
-        "{{TEMA}}": str(primer_estudiante.get(COL_TEMA, '')).strip().capitalize(),
-        "{{ID}}": str(primer_estudiante.get(COL_ID, '')).strip(),
-        "{{CARRERA}}": str(primer_estudiante.get(COL_CARRERA, '')).strip(),
-        "{{TRIBUNAL_1}}": str(primer_estudiante.get(COL_TRIB1, '')) if pd.notna(primer_estudiante.get(COL_TRIB1)) else "",
-        "{{TRIBUNAL_2}}": str(primer_estudiante.get(COL_TRIB2, '')) if pd.notna(primer_estudiante.get(COL_TRIB2)) else "",
-        "{{TRIBUNAL_3}}": str(primer_estudiante.get(COL_TRIB3, '')) if pd.notna(primer_estudiante.get(COL_TRIB3)) else "",
-    }
-    doc_final = Document(TEMPLATE_DOCX)
-    reemplazar_texto(doc_final, replacements)
-    log_area.insert(tk.END, f"- Procesado: {replacements['{{NOMBRE_COMPLETO}}']}\n")
-    root.update_idletasks()
-
-    # --- Procesa el resto de los estudiantes ---
-    if len(filas_validas) > 1:
-        for _, row in filas_validas.iloc[1:].iterrows():
-            # Añade un salto de página ANTES de agregar el nuevo contenido
-            doc_final.add_page_break()
-            
-            replacements = {
-                "{{NOMBRE_COMPLETO}}": f"{row.get(COL_NOMBRES, '')} {row.get(COL_APELLIDOS, '')}".strip(),
-                "{{CEDULA}}": str(row.get(COL_CEDULA, '')).strip(),
-                "{{TEMA}}": str(row.get(COL_TEMA, '')).strip().capitalize(),
-                "{{ID}}": str(row.get(COL_ID, '')).strip(),
-                "{{CARRERA}}": str(row.get(COL_CARRERA, '')).strip(),
-                "{{TRIBUNAL_1}}": str(row.get(COL_TRIB1, '')) if pd.notna(row.get(COL_TRIB1)) else "",
-                "{{TRIBUNAL_2}}": str(row.get(COL_TRIB2, '')) if pd.notna(row.get(COL_TRIB2)) else "",
-                "{{TRIBUNAL_3}}": str(row.get(COL_TRIB3, '')) if pd.notna(row.get(COL_TRIB3)) else "",
-            }
-            
-            # Crea un documento temporal para rellenar la plantilla
-            doc_template = Document(TEMPLATE_DOCX)
-            reemplazar_texto(doc_template, replacements)
-            
-            # Añade el contenido del temporal al documento final
-            for element in doc_template.element.body:
-                doc_final.element.body.append(element)
-            
-            log_area.insert(tk.END, f"- Procesado: {replacements['{{NOMBRE_COMPLETO}}']}\n")
-            root.update_idletasks()
+    total = len(filas_validas)
+    trabajo.log(f"Se encontraron {total} estudiantes.\n")
+    trabajo.progreso(0, total)
+    plantilla = compilar_plantilla(trabajo, consolidado=True)
 
+    # --- El documento se escribe en streaming, estudiante por estudiante ---
+    # (si se cancela, el archivo incompleto se elimina; con "Reanudar", los
+    # estudiantes ya renderizados quedan en el punto de control)
     output_path = output_dir / "notificaciones_TODOS_EN_UNO.docx"
-    doc_final.save(output_path)
-    log_area.insert(tk.END, f"\n¡ÉXITO! Proceso completado.\nDocumento único guardado en: {output_path.resolve()}\n")
+    informe = InformeErrores(output_dir / "notificaciones_TODOS_EN_UNO_errores.csv")
+    punto = PuntoDeControl(output_path, plantilla.datos, reanudar=True) if reanudar else None
+    completo = False
+    try:
+        with EscritorConsolidado(plantilla, output_path) as escritor:
+            for hechos, replacements in enumerate(iterar_contextos(filas_validas), start=1):
+                # Añade un salto de página y el contenido del estudiante
+                try:
+                    if punto is None:
+                        fragmento = escritor.fragmento(replacements)
+                    else:
+                        fragmento = punto.fragmento(escritor, replacements)
+                except Exception as e:
+                    # Una fila con problemas no detiene el documento
+                    informe.agregar(replacements, e)
+                    trabajo.log(f"- ERROR con {replacements['{{NOMBRE_COMPLETO}}']}: {e}\n")
+                else:
+                    escritor.escribir(fragmento)
+                    trabajo.log(f"- Procesado: {replacements['{{NOMBRE_COMPLETO}}']}\n")
+                trabajo.progreso(hechos, total)
+                trabajo.comprobar_cancelacion()
+        completo = True
+    finally:
+        if punto is not None:
+            punto.cerrar(completo)
+        informar_errores(trabajo, informe)
+    if punto is not None and punto.recuperados:
+        trabajo.log(f"Reanudación: {punto.recuperados} estudiantes recuperados sin volver a renderizar.\n")
+
+    if pdf:
+        pool_pdf = abrir_pool_pdf(trabajo, convertidor, 1)
+        if pool_pdf is None:
+            return
+        with pool_pdf:
+            esperar_pdfs(trabajo, [(output_path, pool_pdf.enviar(output_path))])
+        trabajo.log(f"PDF guardado en: {ruta_pdf(output_path).resolve()}\n")
+
+    trabajo.log(f"\n¡ÉXITO! Proceso completado.\nDocumento único guardado en: {output_path.resolve()}\n")
+
+
+def formatear_progreso(hechos, total, segundos):
+    """Texto de la barra de progreso: filas, filas/s y tiempo restante estimado."""
+    if hechos == 0 or segundos <= 0:
+        return f"{hechos}/{total}"
+    velocidad = hechos / segundos
+    restante = int((total - hechos) / velocidad)
+    return f"{hechos}/{total} · {velocidad:.1f} filas/s · ETA {restante // 60:02d}:{restante % 60:02d}"
 
 # --- CREACIÓN DE LA INTERFAZ GRÁFICA ---
 def main_gui():
     root = tk.Tk()
     root.title("Generador de Notificaciones v1.1")
-    root.geometry("600x500")
+    root.geometry("600x600")
     root.resizable(False, False)
 
     style = ttk.Style()
@@ -249,28 +380,161 @@ def main_gui():
     dir_label = ttk.Label(main_frame, text="Aún no ha seleccionado una carpeta...", font=("Helvetica", 9), foreground="grey")
     dir_label.pack(fill=tk.X, pady=(0, 10))
 
+    # --- Procesos en paralelo (archivos individuales) ---
+    workers_var = tk.IntVar(value=1)
+    workers_frame = ttk.Frame(main_frame)
+    workers_frame.pack(fill=tk.X, pady=(0, 5))
+    ttk.Label(workers_frame, text="Procesos en paralelo:", font=("Helvetica", 10)).pack(side=tk.LEFT)
+    ttk.Spinbox(
+        workers_frame, from_=1, to=os.cpu_count() or 1, width=5,
+        textvariable=workers_var, state="readonly"
+    ).pack(side=tk.LEFT, padx=5)
+
+    # --- Tiempos por etapa al terminar cada proceso ---
+    perfil_var = tk.BooleanVar(value=False)
+    ttk.Checkbutton(workers_frame, text="Mostrar tiempos por etapa", variable=perfil_var).pack(side=tk.RIGHT)
+
+    # --- Exportación a PDF (requiere LibreOffice y unoserver) ---
+    pdf_var = tk.BooleanVar(value=False)
+    opciones_frame = ttk.Frame(main_frame)
+    opciones_frame.pack(fill=tk.X, pady=(0, 5))
+    ttk.Checkbutton(opciones_frame, text="Exportar también a PDF", variable=pdf_var).pack(side=tk.LEFT)
+
+    # --- Reanudar una ejecución interrumpida en la misma carpeta ---
+    reanudar_var = tk.BooleanVar(value=False)
+    ttk.Checkbutton(opciones_frame, text="Reanudar ejecución interrumpida", variable=reanudar_var).pack(side=tk.RIGHT)
+
+    # --- Validación previa: las filas con errores (cédula, duplicados...) no se generan ---
+    filtrar_var = tk.BooleanVar(value=False)
+    validacion_frame = ttk.Frame(main_frame)
+    validacion_frame.pack(fill=tk.X, pady=(0, 5))
+    ttk.Checkbutton(validacion_frame, text="Excluir filas con errores de validación", variable=filtrar_var).pack(side=tk.LEFT)
+
     # --- Botones de Acción ---
     btn_individual = ttk.Button(
         main_frame, 
         text="1. Generar Archivos Individuales", 
-        command=lambda: threading.Thread(target=generar_individuales, args=(log_area, root, output_path_var)).start()
+        command=lambda: iniciar(generar_individuales, workers_var.get(), pdf_var.get(), reanudar_var.get(), filtrar_var.get())
     )
     btn_individual.pack(fill=tk.X, pady=5)
 
     btn_unico = ttk.Button(
         main_frame, 
         text="2. Generar Documento Único", 
-        command=lambda: threading.Thread(target=generar_unico, args=(log_area, root, output_path_var)).start()
+        command=lambda: iniciar(generar_unico, pdf_var.get(), reanudar_var.get(), filtrar_var.get())
     )
     btn_unico.pack(fill=tk.X, pady=5)
 
+    # --- Progreso y cancelación ---
+    progreso_frame = ttk.Frame(main_frame)
+    progreso_frame.pack(fill=tk.X, pady=(10, 0))
+    barra = ttk.Progressbar(progreso_frame, mode="determinate")
+    barra.pack(side=tk.LEFT, expand=True, fill=tk.X)
+    btn_cancelar = ttk.Button(
+        progreso_frame,
+        text="Cancelar",
+        state=tk.DISABLED,
+        command=lambda: cancelar()
+    )
+    btn_cancelar.pack(side=tk.LEFT, padx=(5, 0))
+    progreso_label = ttk.Label(main_frame, text="", font=("Helvetica", 9))
+    progreso_label.pack(anchor="w")
+
     # --- Área de logs ---
     log_label = ttk.Label(main_frame, text="Progreso:", font=("Helvetica", 10))
     log_label.pack(pady=(15, 5), anchor="w")
     log_area = scrolledtext.ScrolledText(main_frame, height=10, wrap=tk.WORD, font=("Courier New", 9))
     log_area.pack(expand=True, fill=tk.BOTH)
 
+    # --- Ejecución de trabajos (un solo trabajo a la vez) ---
+    estado = {"trabajo": None, "inicio": 0.0}
+    botones = (btn_select_dir, btn_individual, btn_unico)
+
+    def iniciar(funcion, *args):
+        output_dir_str = output_path_var.get()
+        if not output_dir_str or not os.path.isdir(output_dir_str):
+            log_area.delete('1.0', tk.END)
+            log_area.insert(tk.END, "Error: Por favor, seleccione una carpeta de destino válida primero.\n")
+            return
+        if estado["trabajo"] is not None:
+            return
+
+        log_area.delete('1.0', tk.END)
+        barra.config(value=0, maximum=1)
+        progreso_label.config(text="")
+        for boton in botones:
+            boton.config(state=tk.DISABLED)
+        btn_cancelar.config(state=tk.NORMAL)
+
+        trabajo = Trabajo(perfilar=perfil_var.get())
+        estado["trabajo"] = trabajo
+        estado["inicio"] = time.monotonic()
+        threading.Thread(
+            target=trabajo.ejecutar, args=(funcion, Path(output_dir_str), *args), daemon=True
+        ).start()
+        root.after(100, procesar_eventos)
+
+    def cancelar():
+        if estado["trabajo"] is not None:
+            estado["trabajo"].cancelar()
+            btn_cancelar.config(state=tk.DISABLED)
+            progreso_label.config(text="Cancelando...")
+
+    def procesar_eventos():
+        """Vacía la cola de eventos del trabajo (en el hilo de Tk)."""
+        trabajo = estado["trabajo"]
+        lineas, progreso, terminado = [], None, False
+        while True:
+            try:
+                tipo, dato = trabajo.eventos.get_nowait()
+            except queue.Empty:
+                break
+            if tipo == "log":
+                lineas.append(dato)
+            elif tipo == "progreso":
+                progreso = dato
+            elif tipo == "fin":
+                terminado = True
+
+        # Una sola inserción por ciclo en lugar de una por estudiante
+        if lineas:
+            log_area.insert(tk.END, "".join(lineas))
+            log_area.see(tk.END)
+        if progreso is not None:
+            hechos, total = progreso
+            barra.config(maximum=max(total, 1), value=hechos)
+            progreso_label.config(
+                text=formatear_progreso(hechos, total, time.monotonic() - estado["inicio"])
+            )
+
+        if terminado:
+            estado["trabajo"] = None
+            for boton in botones:
+                boton.config(state=tk.NORMAL)
+            btn_cancelar.config(state=tk.DISABLED)
+        else:
+            root.after(100, procesar_eventos)
+
+    # --- Precarga de los módulos pesados, con la ventana ya visible ---
+    def iniciar_precarga():
+        arranque.marcar("ventana visible")
+        hilo = threading.Thread(target=precargar, daemon=True)
+        hilo.start()
+        if arranque.pedido():
+            root.after(100, lambda: reportar_arranque(hilo))
+
+    def reportar_arranque(hilo):
+        if hilo.is_alive():
+            root.after(100, lambda: reportar_arranque(hilo))
+            return
+        reporte = f"--- Arranque ---\n{arranque.reporte()}\n"
+        print(reporte)
+        log_area.insert(tk.END, reporte)
+
+    root.after_idle(iniciar_precarga)
     root.mainloop()
 
 if __name__ == "__main__":
+    # Necesario para el ProcessPoolExecutor dentro del ejecutable de PyInstaller
+    multiprocessing.freeze_support()
     main_gui()
\ No newline at end of file
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Regeneración INCREMENTAL de las notificaciones individuales.
+
+En la carpeta de salida se guarda un manifiesto JSON que asocia a cada
+documento generado el hash de los datos renderizados junto con el de la
+plantilla. La clave es la ruta relativa del documento, única dentro del lote
+(ver nombres.Nombrador), así que dos filas con la misma cédula tienen cada
+una su entrada.
+
+En la siguiente ejecución solo se vuelven a generar las filas nuevas o
+modificadas (o cuyo archivo ya no existe) y, opcionalmente, se eliminan los
+documentos de estudiantes que ya no están en el Excel.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+from archivos import escribir_atomico
+from diario import hash_contexto
+
+NOMBRE_MANIFIESTO = ".manifiesto_notificaciones.json"
+
+# Formato de las entradas; los manifiestos de otra versión se descartan
+VERSION_MANIFIESTO = 2
+
+
+def _sha256(datos: bytes) -> str:
+    return hashlib.sha256(datos).hexdigest()
+
+
+class Manifiesto:
+    """Manifiesto archivo → {hash, cedula} de una carpeta de salida."""
+
+    def __init__(self, output_dir, datos_plantilla: bytes):
+        self.output_dir = Path(output_dir)
+        self.ruta = self.output_dir / NOMBRE_MANIFIESTO
+        self.hash_plantilla = _sha256(datos_plantilla)
+        self.filas = {}
+        if self.ruta.exists():
+            try:
+                datos = json.loads(self.ruta.read_text(encoding="utf-8"))
+                if datos.get("version") == VERSION_MANIFIESTO:
+                    self.filas = datos.get("filas", {})
+            except (OSError, ValueError, AttributeError):
+                # Manifiesto dañado: se regenera todo
+                self.filas = {}
+
+    def relativa(self, ruta) -> str:
+        """Ruta del documento relativa a la carpeta de salida (con subcarpetas)."""
+        try:
+            return Path(ruta).relative_to(self.output_dir).as_posix()
+        except ValueError:
+            return Path(ruta).name
+
+    def pendientes(self, tareas):
+        """Filtra las tareas (replacements, ruta) que hay que volver a generar."""
+        resultado = []
+        for replacements, ruta in tareas:
+            previo = self.filas.get(self.relativa(ruta))
+            if (
+                previo is None
+                or previo.get("hash") != hash_contexto(replacements, self.hash_plantilla)
+                or not Path(ruta).exists()
+            ):
+                resultado.append((replacements, ruta))
+        return resultado
+
+    def registrar(self, replacements, ruta):
+        """Anota un documento generado correctamente."""
+        self.filas[self.relativa(ruta)] = {
+            "hash": hash_contexto(replacements, self.hash_plantilla),
+            "cedula": replacements["{{CEDULA}}"],
+        }
+
+    def eliminar_obsoletos(self, archivos_vigentes):
+        """
+        Borra los documentos anotados que ya no están en `archivos_vigentes`
+        (rutas relativas del lote completo actual) y los quita del manifiesto.
+        Devuelve las rutas borradas.
+        """
+        eliminados = []
+        for archivo in [a for a in self.filas if a not in archivos_vigentes]:
+            del self.filas[archivo]
+            ruta = self.output_dir / archivo
+            if ruta.exists():
+                ruta.unlink()
+                eliminados.append(ruta)
+        return eliminados
+
+    def guardar(self):
+        """Escribe el manifiesto de forma atómica (ver archivos.escribir_atomico)."""
+        datos = {"version": VERSION_MANIFIESTO, "plantilla": self.hash_plantilla, "filas": self.filas}
+        escribir_atomico(self.ruta, json.dumps(datos, ensure_ascii=False, indent=1).encode("utf-8"))
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+NOMBRES DE ARCHIVO de los documentos individuales.
+
+- El nombre sale de una plantilla configurable con los marcadores (sin llaves)
+  como campos, p. ej. "Notificacion_{CEDULA}_{NOMBRE_COMPLETO}". Por defecto
+  incluye la cédula, para que dos estudiantes con el mismo nombre no se pisen.
+- Los acentos se transliteran (José Peña → Jose_Pena) en lugar de perderse.
+- Las colisiones que aún queden se detectan con un conjunto en memoria (sin
+  tocar el disco) y se resuelven agregando _2, _3...
+- Con lotes enormes, los documentos pueden repartirse en subcarpetas por
+  carrera o por un prefijo del hash de la cédula (256 carpetas): los
+  estudiantes con el mismo nombre no terminan todos en la misma carpeta.
+"""
+
+import hashlib
+import re
+import string
+import unicodedata
+from collections import defaultdict
+from pathlib import PurePosixPath
+
+from contexto import MARKERS
+
+PLANTILLA_NOMBRE = "Notificacion_{CEDULA}_{NOMBRE_COMPLETO}"
+PARTICIONES = ("carrera", "hash")
+
+# Campos válidos en la plantilla del nombre: los marcadores sin llaves
+CAMPOS = sorted(m.strip("{}") for m in MARKERS)
+
+_NO_SEGURO = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+class ErrorNombre(ValueError):
+    """La plantilla de nombres de archivo no es válida."""
+
+
+def transliterar(texto) -> str:
+    """Texto seguro para un nombre de archivo: sin acentos, espacios ni símbolos."""
+    sin_acentos = unicodedata.normalize("NFKD", str(texto)).encode("ascii", "ignore").decode("ascii")
+    return _NO_SEGURO.sub("_", sin_acentos).strip("_.")
+
+
+def validar_plantilla(plantilla):
+    """
+    Comprueba la plantilla con el mismo analizador de str.format (llaves sin
+    cerrar, campos desconocidos) y con un formateo de prueba; devuelve la
+    plantilla o lanza ErrorNombre antes de generar nada.
+    """
+    try:
+        campos = [campo for _, campo, _, _ in string.Formatter().parse(plantilla) if campo is not None]
+    except ValueError as e:
+        raise ErrorNombre(f"Plantilla de nombre inválida '{plantilla}': {e}") from None
+    desconocidos = [c for c in campos if c not in CAMPOS]
+    if desconocidos or not campos:
+        raise ErrorNombre(
+            f"Plantilla de nombre inválida '{plantilla}': "
+            + (f"campos desconocidos {desconocidos}" if desconocidos else "no usa ningún campo")
+            + f" (válidos: {', '.join(CAMPOS)})"
+        )
+    try:
+        plantilla.format_map(dict.fromkeys(CAMPOS, "x"))
+    except (ValueError, TypeError) as e:
+        # Especificación de formato inválida, p. ej. {CEDULA:d}
+        raise ErrorNombre(f"Plantilla de nombre inválida '{plantilla}': {e}") from None
+    return plantilla
+
+
+def nombre_de_archivo(replacements, plantilla=PLANTILLA_NOMBRE):
+    """Nombre seguro del .docx de un estudiante (sin resolver colisiones; ver Nombrador)."""
+    return Nombrador(plantilla).base(replacements) + ".docx"
+
+
+class Nombrador:
+    """
+    Asigna a cada estudiante su ruta relativa en la salida, única dentro del
+    lote. Las rutas se comparan sin distinguir mayúsculas (como en Windows).
+    """
+
+    def __init__(self, plantilla=PLANTILLA_NOMBRE, particion=None, extension=".docx"):
+        if particion is not None and particion not in PARTICIONES:
+            raise ErrorNombre(f"Partición inválida '{particion}' (válidas: {', '.join(PARTICIONES)})")
+        self.plantilla = validar_plantilla(plantilla)
+        self.particion = particion
+        self.extension = extension
+        self.colisiones = 0
+        self._usados = set()
+
+    def base(self, replacements) -> str:
+        """Nombre (sin extensión ni sufijo de colisión) según la plantilla."""
+        valores = defaultdict(str, {m.strip("{}"): transliterar(v) for m, v in replacements.items()})
+        return transliterar(self.plantilla.format_map(valores)) or "documento"
+
+    def carpeta(self, replacements, base) -> str:
+        """Subcarpeta de la partición ('' sin partición)."""
+        if self.particion == "carrera":
+            return transliterar(replacements.get("{{CARRERA}}", "")) or "sin_carrera"
+        if self.particion == "hash":
+            # La cédula identifica al estudiante; el nombre se repite entre homónimos
+            clave = replacements.get("{{CEDULA}}", "").strip() or base.casefold()
+            return hashlib.sha1(clave.encode("utf-8")).hexdigest()[:2]
+        return ""
+
+    def ruta(self, replacements) -> str:
+        """Ruta relativa ('carpeta/nombre.docx') nueva para este estudiante."""
+        base = self.base(replacements)
+        carpeta = PurePosixPath(self.carpeta(replacements, base))
+        ruta, n = carpeta / f"{base}{self.extension}", 2
+        while str(ruta).casefold() in self._usados:
+            ruta = carpeta / f"{base}_{n}{self.extension}"
+            n += 1
+        if n > 2:
+            self.colisiones += 1
+        self._usados.add(str(ruta).casefold())
+        return str(ruta)
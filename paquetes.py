@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Salida EMPAQUETADA: los documentos se escriben directamente dentro de uno o
+varios .zip en lugar de crear decenas de miles de archivos sueltos.
+
+Cada .docx ya es un zip comprimido, así que se guarda sin volver a comprimir
+(ZIP_STORED): empaquetar cuesta poco más que copiar los bytes. Cada paquete
+se escribe en un temporal y se renombra al cerrarse, igual que los demás
+documentos.
+"""
+
+import os
+import time
+import zipfile
+from pathlib import Path
+
+from archivos import ruta_temporal
+
+
+class PaqueteZip:
+    """Reparte documentos (ruta relativa, bytes) en paquetes .zip de hasta `por_zip`."""
+
+    def __init__(self, output_dir, prefijo="Notificaciones", por_zip=0):
+        self.output_dir = Path(output_dir)
+        self.prefijo = prefijo
+        self.por_zip = por_zip
+        self.rutas = []  # Paquetes ya cerrados
+        self.total = 0
+        self._zip = None
+        self._ruta = self._temporal = None
+        self._en_actual = 0
+
+    def _abrir(self):
+        numero = len(self.rutas) + 1
+        nombre = f"{self.prefijo}.zip" if not self.por_zip else f"{self.prefijo}_{numero:03d}.zip"
+        self._ruta = self.output_dir / nombre
+        self._temporal = Path(ruta_temporal(self._ruta))
+        self._zip = zipfile.ZipFile(self._temporal, "w", zipfile.ZIP_STORED, allowZip64=True)
+        self._en_actual = 0
+
+    def _cerrar_actual(self):
+        self._zip.close()
+        os.replace(self._temporal, self._ruta)
+        self.rutas.append(self._ruta)
+        self._zip = None
+
+    def agregar(self, nombre, datos: bytes):
+        """Agrega un documento con su ruta relativa dentro del paquete."""
+        if self._zip is not None and self.por_zip and self._en_actual >= self.por_zip:
+            self._cerrar_actual()
+        if self._zip is None:
+            self._abrir()
+        info = zipfile.ZipInfo(str(nombre), date_time=time.localtime()[:6])
+        info.compress_type = zipfile.ZIP_STORED
+        self._zip.writestr(info, datos)
+        self._en_actual += 1
+        self.total += 1
+
+    def cerrar(self):
+        """Cierra el paquete en curso; devuelve la lista de paquetes escritos."""
+        if self._zip is not None:
+            self._cerrar_actual()
+        return self.rutas
+
+    def abortar(self):
+        """Cierra y elimina el paquete a medio escribir (los ya cerrados quedan)."""
+        if self._zip is not None:
+            try:
+                self._zip.close()
+            finally:
+                self._temporal.unlink(missing_ok=True)
+                self._zip = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.cerrar()
+        else:
+            self.abortar()
+        return False
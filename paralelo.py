@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Generación en PARALELO de los documentos individuales.
+
+Cada documento es independiente (XML + compresión zip, trabajo de CPU), así
+que las filas se reparten entre varios procesos con un ProcessPoolExecutor.
+Cada proceso recibe una sola vez los bytes de la plantilla y la compila al
+arrancar; los resultados vuelven en el mismo orden de las filas, con el
+error de cada fila (si lo hubo) en lugar de abortar todo el lote.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from plantilla import PlantillaCompilada
+from archivos import NIVEL_COMPRESION
+from escritor_docx import EscritorDocx
+
+# Escritores (con su plantilla compilada) propios de cada proceso trabajador,
+# por clave de plantilla (None cuando hay una sola)
+_escritores = None
+
+
+def _inicializar(datos, compresion=NIVEL_COMPRESION):
+    """Inicializador de cada proceso: compila cada plantilla una vez."""
+    global _escritores
+    _escritores = {clave: EscritorDocx(PlantillaCompilada(d), compresion) for clave, d in datos.items()}
+
+
+def _generar(tarea, escritores=None):
+    """
+    Renderiza y guarda un documento. Devuelve None o el mensaje de error.
+
+    La tarea es (replacements, ruta_salida) o, con varias plantillas,
+    (replacements, ruta_salida, clave_plantilla).
+    """
+    replacements, ruta_salida, *clave = tarea
+    try:
+        (escritores or _escritores)[clave[0] if clave else None].generar(replacements, ruta_salida)
+    except Exception as e:
+        return str(e)
+    return None
+
+
+def _renderizar(tarea, escritores=None):
+    """Como _generar, pero devuelve (bytes del .docx, None) o (None, error) sin escribir."""
+    replacements, _, *clave = tarea
+    try:
+        return (escritores or _escritores)[clave[0] if clave else None].generar_bytes(replacements), None
+    except Exception as e:
+        return None, str(e)
+
+
+def normalizar_workers(workers):
+    """Número de procesos a usar: 0 o negativo significa todos los núcleos."""
+    if workers is None or workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+class Generador:
+    """
+    Pool de procesos reutilizable entre varios lotes de tareas (p. ej. los
+    bloques del pipeline en streaming). Con workers=1 no se crean procesos.
+
+    `plantilla` es una PlantillaCompilada o un dict clave → PlantillaCompilada;
+    en el segundo caso cada tarea indica la clave de su plantilla.
+    """
+
+    def __init__(self, plantilla, workers=1, compresion=NIVEL_COMPRESION):
+        plantillas = plantilla if isinstance(plantilla, dict) else {None: plantilla}
+        self.plantilla = plantilla
+        self.workers = normalizar_workers(workers)
+        self._escritores = {clave: EscritorDocx(p, compresion) for clave, p in plantillas.items()}
+        self._executor = None
+        if self.workers > 1:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_inicializar,
+                initargs=({clave: p.datos for clave, p in plantillas.items()}, compresion),
+            )
+
+    def generar(self, tareas):
+        """Produce (tarea, error) para cada tarea, en el mismo orden."""
+        tareas = list(tareas)
+        if self._executor is None:
+            for tarea in tareas:
+                yield tarea, _generar(tarea, self._escritores)
+            return
+        chunksize = max(1, len(tareas) // (self.workers * 4))
+        yield from zip(tareas, self._executor.map(_generar, tareas, chunksize=chunksize))
+
+    def renderizar(self, tareas):
+        """Produce (tarea, datos, error) para cada tarea, en el mismo orden (p. ej. para un zip)."""
+        tareas = list(tareas)
+        if self._executor is None:
+            resultados = (_renderizar(tarea, self._escritores) for tarea in tareas)
+        else:
+            chunksize = max(1, len(tareas) // (self.workers * 4))
+            resultados = self._executor.map(_renderizar, tareas, chunksize=chunksize)
+        for tarea, (datos, error) in zip(tareas, resultados):
+            yield tarea, datos, error
+
+    def cerrar(self):
+        """Cierra el pool; lo que aún no empezó (p. ej. al cancelar) se descarta."""
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cerrar()
+        return False
+
+
+def generar_documentos(plantilla, tareas, workers=1, compresion=NIVEL_COMPRESION):
+    """
+    Genera cada tarea (replacements, ruta_salida) y produce (tarea, error)
+    en el mismo orden de `tareas`; `error` es None si el documento se guardó.
+
+    Con workers=1 todo se hace en el proceso actual, sin crear procesos.
+    """
+    tareas = list(tareas)
+    workers = min(normalizar_workers(workers), max(len(tareas), 1))
+    with Generador(plantilla, workers, compresion) as generador:
+        yield from generador.generar(tareas)
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+Medición de tiempos POR ETAPA (lectura del Excel, validación, contexto, carga
+de la plantilla, sustitución, armado del cuerpo, guardado...).
+
+Los módulos de generación envuelven cada etapa con `medir("etapa")`. Mientras
+el perfilado no esté activado, `medir` no hace nada (coste prácticamente nulo).
+Al activarlo se guarda la duración de cada llamada, lo que permite obtener
+totales, conteos y percentiles por fila, imprimir una tabla resumen, exportar
+la traza a JSON/CSV y, opcionalmente, volcar un perfil de cProfile.
+
+Nota: con varios procesos (--workers > 1) solo se mide lo que ocurre en el
+proceso principal; para ver el renderizado por fila use un solo proceso.
+"""
+
+import contextlib
+import cProfile
+import csv
+import json
+import math
+import time
+from collections import defaultdict
+from pathlib import Path
+
+_activo = False
+_tiempos = defaultdict(list)
+_NULO = contextlib.nullcontext()
+
+
+class _Medicion:
+    __slots__ = ("etapa", "inicio")
+
+    def __init__(self, etapa):
+        self.etapa = etapa
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+
+    def __exit__(self, *exc):
+        _tiempos[self.etapa].append(time.perf_counter() - self.inicio)
+        return False
+
+
+def activar():
+    """Activa el perfilado y descarta las mediciones anteriores."""
+    global _activo
+    _tiempos.clear()
+    _activo = True
+
+
+def desactivar():
+    global _activo
+    _activo = False
+
+
+def medir(etapa):
+    """Context manager que acumula la duración de `etapa` (si está activo)."""
+    if not _activo:
+        return _NULO
+    return _Medicion(etapa)
+
+
+def _percentil(ordenados, p):
+    """Percentil p (0-100) por el método del rango más cercano."""
+    indice = max(0, math.ceil(p / 100 * len(ordenados)) - 1)
+    return ordenados[indice]
+
+
+def resumen():
+    """Una fila por etapa: conteo, total y percentiles (en milisegundos)."""
+    filas = []
+    for etapa, duraciones in _tiempos.items():
+        ordenados = sorted(duraciones)
+        total = sum(ordenados)
+        filas.append({
+            "etapa": etapa,
+            "n": len(ordenados),
+            "total_s": round(total, 4),
+            "media_ms": round(total / len(ordenados) * 1000, 3),
+            "p50_ms": round(_percentil(ordenados, 50) * 1000, 3),
+            "p95_ms": round(_percentil(ordenados, 95) * 1000, 3),
+            "max_ms": round(ordenados[-1] * 1000, 3),
+        })
+    filas.sort(key=lambda f: f["total_s"], reverse=True)
+    return filas
+
+
+def tabla_resumen():
+    """Resumen como texto de tabla, de la etapa más costosa a la menos."""
+    filas = resumen()
+    if not filas:
+        return "(sin mediciones)"
+    lineas = [
+        f"{'ETAPA':<18}{'N':>8}{'TOTAL s':>10}{'MEDIA ms':>10}{'P50 ms':>10}{'P95 ms':>10}{'MAX ms':>10}"
+    ]
+    for f in filas:
+        lineas.append(
+            f"{f['etapa']:<18}{f['n']:>8}{f['total_s']:>10.3f}{f['media_ms']:>10.3f}"
+            f"{f['p50_ms']:>10.3f}{f['p95_ms']:>10.3f}{f['max_ms']:>10.3f}"
+        )
+    return "\n".join(lineas)
+
+
+def guardar_traza(ruta):
+    """Exporta la traza: .csv (una fila por medición) o JSON (resumen + duraciones)."""
+    ruta = Path(ruta)
+    if ruta.suffix.lower() == ".csv":
+        with open(ruta, "w", newline="", encoding="utf-8") as f:
+            escritor = csv.writer(f)
+            escritor.writerow(["etapa", "indice", "segundos"])
+            for etapa, duraciones in _tiempos.items():
+                for i, segundos in enumerate(duraciones):
+                    escritor.writerow([etapa, i, f"{segundos:.6f}"])
+    else:
+        datos = {"resumen": resumen(), "duraciones_s": dict(_tiempos)}
+        ruta.write_text(json.dumps(datos, indent=1), encoding="utf-8")
+
+
+@contextlib.contextmanager
+def cprofile(ruta=None):
+    """Vuelca un perfil de cProfile (solo hilo principal) en `ruta`, si se indica."""
+    if not ruta:
+        yield
+        return
+    perfil = cProfile.Profile()
+    perfil.enable()
+    try:
+        yield
+    finally:
+        perfil.disable()
+        perfil.dump_stats(str(ruta))
+
+
+# ---------- INTEGRACIÓN CON LA LÍNEA DE COMANDOS ----------
+def agregar_argumentos(parser):
+    """Agrega --profile, --traza y --cprofile a un ArgumentParser."""
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Muestra al final una tabla con el tiempo y los percentiles de cada etapa."
+    )
+    parser.add_argument(
+        "--traza",
+        help="Guarda la traza de tiempos por etapa en un archivo .json o .csv."
+    )
+    parser.add_argument(
+        "--cprofile",
+        help="Guarda un perfil de cProfile (.prof) de la ejecución (hilo principal)."
+    )
+
+
+def ejecutar(args, funcion, *posicionales, **nombrados):
+    """Ejecuta `funcion` con el perfilado pedido en `args` y emite los reportes."""
+    if args.profile or args.traza:
+        activar()
+    with cprofile(args.cprofile):
+        resultado = funcion(*posicionales, **nombrados)
+    if args.profile:
+        print("\n--- Tiempo por etapa ---")
+        print(tabla_resumen())
+    if args.traza:
+        guardar_traza(args.traza)
+        print(f"Traza de tiempos guardada en: {Path(args.traza).resolve()}")
+    return resultado
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Pipeline en STREAMING para listas de estudiantes muy grandes.
+
+En lugar de cargar toda la hoja en un DataFrame, copiarla con dropna() y luego
+recorrerla, cada etapa (lectura por bloques, validación/contexto, renderizado
+y escritura) trabaja sobre bloques de filas y se ejecuta en su propio hilo.
+Las etapas se comunican por colas acotadas: la lectura del siguiente bloque se
+solapa con el renderizado del actual y la memoria máxima queda fija (tamaño
+de bloque × tamaño de cola), sin importar cuántas filas tenga el Excel.
+"""
+
+import queue
+import threading
+
+# Tamaño por defecto de las colas entre etapas (en bloques)
+TAMANO_COLA = 2
+
+_FIN = object()
+
+
+def en_hilo(iterable, tamano_cola=TAMANO_COLA):
+    """
+    Consume `iterable` en un hilo aparte y produce sus elementos a través de
+    una cola acotada. Las excepciones del hilo se relanzan en el consumidor;
+    si el consumidor deja de iterar, el hilo se detiene.
+    """
+    cola = queue.Queue(maxsize=tamano_cola)
+    detener = threading.Event()
+
+    def poner(item):
+        while not detener.is_set():
+            try:
+                cola.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def producir():
+        try:
+            for item in iterable:
+                if not poner((True, item)):
+                    break
+            else:
+                poner(_FIN)
+        except BaseException as e:
+            poner((False, e))
+        finally:
+            cerrar = getattr(iterable, "close", None)
+            if cerrar is not None:
+                cerrar()
+
+    hilo = threading.Thread(target=producir, daemon=True)
+    hilo.start()
+    try:
+        while True:
+            item = cola.get()
+            if item is _FIN:
+                return
+            ok, valor = item
+            if not ok:
+                raise valor
+            yield valor
+    finally:
+        detener.set()
+
+
+def _aplicar(funcion, flujo):
+    """map() que cierra el flujo de entrada al terminar o al abortar."""
+    try:
+        for item in flujo:
+            yield funcion(item)
+    finally:
+        flujo.close()
+
+
+def encadenar(fuente, *etapas, tamano_cola=TAMANO_COLA):
+    """
+    Conecta `fuente` con cada etapa (función elemento → elemento), cada una en
+    su propio hilo con una cola acotada entre ellas. Devuelve un generador con
+    los resultados de la última etapa, en orden.
+    """
+    flujo = en_hilo(fuente, tamano_cola)
+    for etapa in etapas:
+        flujo = en_hilo(_aplicar(etapa, flujo), tamano_cola)
+    return flujo
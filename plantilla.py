@@ -0,0 +1,341 @@
+# -*- coding: utf-8 -*-
+"""
+Plantilla de Word COMPILADA: 'plantilla.docx' se lee y se analiza una sola vez.
+
+Antes, cada estudiante hacía un Document(TEMPLATE_DOCX), lo que descomprime y
+vuelve a parsear todo el paquete en cada fila. Aquí se guarda una copia intacta
+del XML de cada parte con texto (cuerpo, encabezados, pies de página y notas)
+junto con la ruta (índices de hijo desde la raíz) de los párrafos que
+contienen marcadores {{...}}, estén donde estén: tablas anidadas, cuadros de
+texto, controles de contenido o hipervínculos. Para cada estudiante solo se
+restaura una copia profunda de ese XML y se va directo a esos párrafos, sin
+recorrer el árbol.
+
+Para revisar una plantilla (dónde está cada marcador y cuáles no se conocen):
+    python plantilla.py plantilla.docx
+"""
+
+import argparse
+import bisect
+import copy
+import functools
+import io
+import re
+from collections import defaultdict
+from pathlib import Path
+
+from docx import Document
+from docx.opc.constants import CONTENT_TYPE as CT, RELATIONSHIP_TYPE as RT
+from docx.opc.part import PartFactory, XmlPart
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+
+from perfilado import medir
+
+# Cualquier texto entre llaves dobles: así también aparecen en el informe de
+# desconocidos los errores de tipeo como {{Nombre}} o {{ NOMBRE }}
+PATRON_MARCADOR = re.compile(r"\{\{[^{}]*\}\}")
+
+# python-docx carga las notas al pie y al final como binarios opacos; como
+# XmlPart quedan parseadas y se pueden recorrer y reemplazar como las demás.
+for _tipo in (CT.WML_FOOTNOTES, CT.WML_ENDNOTES):
+    PartFactory.part_type_for.setdefault(_tipo, XmlPart)
+
+# Relaciones del documento principal que apuntan a partes con texto
+_RELACIONES_CON_TEXTO = (RT.HEADER, RT.FOOTER, RT.FOOTNOTES, RT.ENDNOTES)
+
+# Contenido eliminado con control de cambios: no se muestra, no se reemplaza
+_ELIMINADO = {qn("w:del"), qn("w:moveFrom")}
+
+# Saltos de línea y tabulaciones dentro de un valor
+_CONTROL = re.compile(r"([\t\n\r])")
+_XML_SPACE = "{http://www.w3.org/XML/1998/namespace}space"
+
+
+# ---------- UTILIDADES ----------
+def _runs(p):
+    """
+    Runs del párrafo en orden, también los anidados en hipervínculos,
+    controles de contenido, campos o cambios insertados. No entra en los
+    runs, así que los párrafos de un cuadro de texto quedan fuera (son otros
+    párrafos).
+    """
+    for hijo in p:
+        if hijo.tag == qn("w:r"):
+            yield hijo
+        elif hijo.tag not in _ELIMINADO and len(hijo):
+            yield from _runs(hijo)
+
+
+def texto_parrafo(p):
+    """Texto completo de un párrafo <w:p> (concatenación de sus runs)."""
+    return "".join(r.text for r in _runs(p))
+
+
+def _ubicacion(p):
+    """Descripción legible de dónde está un párrafo dentro de su parte."""
+    tablas = 0
+    donde = None
+    for ancestro in p.iterancestors():
+        if ancestro.tag == qn("w:tbl"):
+            tablas += 1
+        elif donde is None and ancestro.tag == qn("w:txbxContent"):
+            donde = "cuadro de texto"
+        elif donde is None and ancestro.tag == qn("w:sdtContent"):
+            donde = "control de contenido"
+    if donde is None and any(r.getparent().tag == qn("w:sdtContent") for r in _runs(p)):
+        donde = "control de contenido"
+    if donde is None and tablas:
+        donde = "tabla anidada" if tablas > 1 else "tabla"
+    return donde or "párrafo"
+
+
+def _ruta_hijos(nodo, raiz):
+    """Índices de hijo que llevan desde `raiz` hasta `nodo`."""
+    ruta = []
+    while nodo is not raiz:
+        padre = nodo.getparent()
+        ruta.append(padre.index(nodo))
+        nodo = padre
+    return tuple(reversed(ruta))
+
+
+def _resolver(raiz, ruta):
+    """Nodo en la `ruta` de índices de hijo desde `raiz` (inversa de _ruta_hijos)."""
+    for i in ruta:
+        raiz = raiz[i]
+    return raiz
+
+
+@functools.lru_cache(maxsize=32)
+def patron_marcadores(claves):
+    """Regex con la alternativa de todas las claves (las más largas primero)."""
+    return re.compile("|".join(re.escape(k) for k in sorted(claves, key=len, reverse=True)))
+
+
+def _textos(p):
+    """Nodos <w:t> de los runs del párrafo, en orden."""
+    return [t for r in _runs(p) for t in r.iterchildren(qn("w:t"))]
+
+
+def _escribir(t, texto):
+    """
+    Cambia el texto de un nodo <w:t> sin tocar el resto del run (tabulaciones,
+    saltos, dibujos o campos). Los saltos de línea y tabulaciones del valor se
+    convierten en <w:br/> y <w:tab/>, como haría Word.
+    """
+    partes = _CONTROL.split(texto)
+    t.text = partes[0]
+    _preservar_espacios(t)
+    anterior = t
+    for separador, resto in zip(partes[1::2], partes[2::2]):
+        for nuevo in (OxmlElement("w:tab" if separador == "\t" else "w:br"), OxmlElement("w:t")):
+            anterior.addnext(nuevo)
+            anterior = nuevo
+        anterior.text = resto
+        _preservar_espacios(anterior)
+
+
+def _preservar_espacios(t):
+    # Sin xml:space="preserve", Word descarta los espacios de los extremos
+    texto = t.text or ""
+    if texto != texto.strip():
+        t.set(_XML_SPACE, "preserve")
+
+
+def reemplazar_en_parrafo(p, replacements, patron=None):
+    """
+    Reemplaza todos los marcadores del párrafo en una sola pasada.
+
+    Se busca sobre el texto concatenado de los nodos <w:t>, así que un
+    marcador partido entre varios runs también se reemplaza. El valor queda
+    en el nodo donde empieza el marcador (con el formato de su run) y el resto
+    del marcador se recorta de los nodos siguientes; solo se escriben los
+    nodos <w:t> que abarca cada marcador.
+    """
+    nodos = _textos(p)
+    textos = [t.text or "" for t in nodos]
+    texto = "".join(textos)
+    if "{{" not in texto:
+        return
+    if patron is None:
+        patron = patron_marcadores(tuple(replacements))
+    coincidencias = list(patron.finditer(texto))
+    if not coincidencias:
+        return
+
+    inicios = []
+    pos = 0
+    for t in textos:
+        inicios.append(pos)
+        pos += len(t)
+
+    nuevos = list(textos)
+    # De derecha a izquierda: los desplazamientos originales siguen siendo válidos
+    for m in reversed(coincidencias):
+        i = bisect.bisect_right(inicios, m.start()) - 1
+        j = bisect.bisect_right(inicios, m.end() - 1) - 1
+        valor = str(replacements[m.group()])
+        ini, fin = m.start() - inicios[i], m.end() - inicios[j]
+        if i == j:
+            nuevos[i] = nuevos[i][:ini] + valor + nuevos[i][fin:]
+        else:
+            nuevos[i] = nuevos[i][:ini] + valor
+            for k in range(i + 1, j):
+                nuevos[k] = ""
+            nuevos[j] = nuevos[j][fin:]
+
+    for t, antes, despues in zip(nodos, textos, nuevos):
+        if antes != despues:
+            _escribir(t, despues)
+
+
+def _partes(documento):
+    """Partes con texto: documento principal, encabezados, pies y notas."""
+    partes = [documento.part]
+    for rel in documento.part.rels.values():
+        if rel.reltype in _RELACIONES_CON_TEXTO and not rel.is_external:
+            partes.append(rel.target_part)
+    return partes
+
+
+def _raices(documento):
+    """Elementos raíz de cada parte con texto (el <w:body> en el principal)."""
+    return [documento.element.body] + [parte.element for parte in _partes(documento)[1:]]
+# ----------------------------------
+
+
+class PlantillaCompilada:
+    """Plantilla .docx parseada una vez y lista para 'estampar' por estudiante."""
+
+    def __init__(self, origen):
+        with medir("carga_plantilla"):
+            if isinstance(origen, (str, Path)):
+                origen = Path(origen).read_bytes()
+            self.datos = bytes(origen)
+
+            # Documento de trabajo: se reutiliza en cada renderizado.
+            self._doc = Document(io.BytesIO(self.datos))
+            raices = _raices(self._doc)
+            self._originales = [copy.deepcopy(raiz) for raiz in raices]
+
+            # Índice de párrafos con marcadores (ruta de índices de hijo desde la
+            # raíz de su parte) y, por marcador, en qué parte y tipo de contenido
+            # aparece.
+            self.indice = []
+            self.marcadores = set()
+            self.ubicaciones = defaultdict(list)
+            for parte, raiz in zip(_partes(self._doc), raices):
+                posiciones = []
+                for p in raiz.iter(qn("w:p")):
+                    texto = texto_parrafo(p)
+                    if "{{" in texto:
+                        posiciones.append(_ruta_hijos(p, raiz))
+                        for marcador in PATRON_MARCADOR.findall(texto):
+                            self.marcadores.add(marcador)
+                            self.ubicaciones[marcador].append(f"{parte.partname[1:]} · {_ubicacion(p)}")
+                self.indice.append(posiciones)
+
+            # Partes que cambian entre estudiantes (las demás son idénticas a la plantilla)
+            self.partes_renderizadas = [
+                parte.partname[1:]
+                for i, (parte, posiciones) in enumerate(zip(_partes(self._doc), self.indice))
+                if i == 0 or posiciones
+            ]
+
+    def revisar_marcadores(self, conocidos):
+        """
+        Compara los marcadores de la plantilla con los `conocidos`. Devuelve
+        (desconocidos, sin_usar): los que quedarían sin reemplazar y los que
+        la plantilla no usa.
+        """
+        conocidos = set(conocidos)
+        return sorted(self.marcadores - conocidos), sorted(conocidos - self.marcadores)
+
+    def advertencias(self, conocidos, consolidado=False):
+        """
+        Mensajes de advertencia de revisar_marcadores (lista vacía si todo
+        cuadra). Con consolidado=True avisa además de los marcadores de
+        encabezados, pies y notas: un documento consolidado comparte esas
+        partes entre todos los estudiantes y quedan como en la plantilla.
+        """
+        desconocidos, sin_usar = self.revisar_marcadores(conocidos)
+        mensajes = []
+        if consolidado and len(self.partes_renderizadas) > 1:
+            mensajes.append(
+                f"Los marcadores de {', '.join(self.partes_renderizadas[1:])} no se reemplazan en un documento "
+                "consolidado (quedan como en la plantilla): páselos al cuerpo del documento"
+            )
+        for marcador in desconocidos:
+            lugares = ", ".join(sorted(set(self.ubicaciones[marcador])))
+            mensajes.append(f"Marcador desconocido {marcador} (quedará sin reemplazar) en: {lugares}")
+        for marcador in sin_usar:
+            mensajes.append(f"Marcador {marcador} no aparece en la plantilla")
+        return mensajes
+
+    def documento_nuevo(self):
+        """Documento independiente (p. ej. base de un documento consolidado)."""
+        return Document(io.BytesIO(self.datos))
+
+    def _restaurar(self):
+        """Devuelve el documento de trabajo al XML original de la plantilla."""
+        for raiz, original in zip(_raices(self._doc), self._originales):
+            raiz[:] = [copy.deepcopy(hijo) for hijo in original]
+
+    def parrafos_con_marcadores(self, documento):
+        """Párrafos <w:p> de `documento` donde la plantilla tiene marcadores."""
+        for raiz, posiciones in zip(_raices(documento), self.indice):
+            # Se resuelven todos antes de reemplazar: un valor con saltos de
+            # línea agrega nodos al run y puede mover a sus hijos (p. ej. un
+            # cuadro de texto)
+            yield from [_resolver(raiz, ruta) for ruta in posiciones]
+
+    def renderizar(self, replacements, documento=None):
+        """
+        Rellena la plantilla con `replacements` y devuelve el Document.
+
+        Sin `documento` se usa (y restaura) el documento de trabajo interno,
+        que solo es válido hasta la siguiente llamada: guárdelo o copie sus
+        elementos antes de renderizar otro estudiante.
+        """
+        if documento is None:
+            documento = self._doc
+            with medir("restauracion"):
+                self._restaurar()
+        with medir("sustitucion"):
+            patron = patron_marcadores(tuple(replacements))
+            for p in self.parrafos_con_marcadores(documento):
+                reemplazar_en_parrafo(p, replacements, patron)
+        return documento
+
+
+if __name__ == "__main__":
+    from contexto import MARKERS
+
+    TEMPLATE_DOCX = Path(__file__).parent / "plantilla.docx"
+
+    parser = argparse.ArgumentParser(
+        description="Muestra dónde está cada marcador de la plantilla y cuáles no se reconocen."
+    )
+    parser.add_argument(
+        "plantilla",
+        nargs="?",
+        default=TEMPLATE_DOCX,
+        help="Plantilla .docx a revisar. Por defecto, 'plantilla.docx'."
+    )
+    args = parser.parse_args()
+
+    plantilla = PlantillaCompilada(args.plantilla)
+    print(f"Marcadores en {args.plantilla}:")
+    for marcador in sorted(plantilla.ubicaciones):
+        lugares = plantilla.ubicaciones[marcador]
+        conteo = {lugar: lugares.count(lugar) for lugar in lugares}
+        print(f"  {marcador}")
+        for lugar, n in conteo.items():
+            print(f"      {lugar} ×{n}")
+    mensajes = plantilla.advertencias(MARKERS)
+    print()
+    for mensaje in mensajes:
+        print(f"⚠️  {mensaje}")
+    if not mensajes:
+        print("✅ Todos los marcadores de la plantilla son conocidos y se usan.")
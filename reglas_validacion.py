@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+Reglas, severidades y modos de la VALIDACIÓN previa del Excel.
+
+Solo datos y la opción --validacion de los scripts, sin dependencias
+pesadas: se importa al cargar (para --help y la línea de comandos) sin
+adelantar pandas. El motor que aplica las reglas está en validacion.py.
+"""
+
+ERROR = "error"
+ADVERTENCIA = "advertencia"
+
+# Modos de los scripts: descartar las filas con errores, solo informar, o nada
+MODOS = ("estricta", "informar", "no")
+# Por defecto solo se informa: descartar filas es una decisión explícita
+MODO_POR_DEFECTO = "informar"
+NOMBRE_INFORME_VALIDACION = "validacion.json"
+
+# código → (severidad, descripción)
+REGLAS = {
+    "cedula_formato":      (ERROR,       "La cédula no tiene 10 dígitos"),
+    "cedula_estructura":   (ERROR,       "Provincia (01–24, 30) o tercer dígito (0–5) inválidos"),
+    "cedula_verificador":  (ERROR,       "El dígito verificador de la cédula no coincide"),
+    "cedula_duplicada":    (ERROR,       "Cédula repetida (se conserva la primera fila)"),
+    "id_vacio":            (ERROR,       "ID del estudiante vacío"),
+    "nombres_vacio":       (ERROR,       "NOMBRES vacío"),
+    "apellidos_vacio":     (ERROR,       "APELLIDOS vacío"),
+    "id_formato":          (ADVERTENCIA, "El ID tiene caracteres no válidos"),
+    "id_duplicado":        (ADVERTENCIA, "ID repetido"),
+    "carrera_vacia":       (ADVERTENCIA, "CARRERA vacía"),
+    "tema_vacio":          (ADVERTENCIA, "TEMA vacío"),
+    "tribunal_incompleto": (ADVERTENCIA, "Falta algún miembro del tribunal (TRL1–TRL3)"),
+}
+
+
+def agregar_argumentos(parser):
+    """Agrega --validacion a un ArgumentParser."""
+    parser.add_argument(
+        "--validacion",
+        choices=MODOS,
+        default=MODO_POR_DEFECTO,
+        help="Validación previa del Excel: 'informar' reporta las filas con errores sin excluirlas, 'estricta' "
+             "las descarta (y termina con error si no queda ninguna) y 'no' la omite. "
+             f"Por defecto, '{MODO_POR_DEFECTO}'."
+    )
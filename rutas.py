@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+ENRUTAMIENTO de estudiantes a plantillas.
+
+Un archivo JSON de rutas describe todas las salidas que se quieren obtener de
+una sola lectura del Excel; cada fila puede ir a ninguna, una o varias:
+
+    {
+      "salidas": [
+        {"nombre": "notificaciones", "plantilla": "plantilla.docx"},
+        {"nombre": "medicina", "plantilla": "plantilla_medicina.docx",
+         "si": {"CARRERA": "Medicina"}},
+        {"nombre": "tribunal", "plantilla": "plantilla_tribunal.docx",
+         "si": {"CARRERA": ["Sistemas", "Software"]}, "no": {"TRIBUNAL_3": ""}},
+        {"nombre": "por_carrera", "plantilla": "plantilla.docx",
+         "modo": "consolidado", "agrupar": "CARRERA"}
+      ]
+    }
+
+- "modo": "individual" (un .docx por estudiante, como app.py; por defecto) o
+  "consolidado" (un documento con todos, como app_unidoc.py).
+- "si" / "no": condiciones por marcador (sin llaves); el valor puede ser un
+  texto o una lista. Se comparan sin distinguir mayúsculas ni espacios en los
+  extremos. Todas las condiciones de "si" deben cumplirse y ninguna de "no".
+- "agrupar": con "consolidado", un documento por cada valor del marcador
+  (los valores se agrupan igual que en "si" / "no": sin distinguir
+  mayúsculas ni espacios en los extremos).
+- "carpeta": subcarpeta de salida (por defecto, el nombre de la salida).
+- Las rutas de las plantillas son relativas al archivo JSON.
+
+Las condiciones se evalúan por columnas (vectorizadas) sobre cada bloque.
+"""
+
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from contexto import MARKERS
+
+MODOS = ("individual", "consolidado")
+
+
+class ErrorRutas(ValueError):
+    """El archivo de rutas no es válido."""
+
+
+def _marcador(nombre, salida):
+    marcador = nombre if nombre.startswith("{{") else f"{{{{{nombre}}}}}"
+    if marcador not in MARKERS:
+        conocidos = ", ".join(sorted(m.strip("{}") for m in MARKERS))
+        raise ErrorRutas(f"Salida '{salida}': marcador desconocido '{nombre}' (válidos: {conocidos})")
+    return marcador
+
+
+def _condiciones(valor, salida):
+    """{"CARRERA": "X" | ["X", "Y"]} → {"{{CARRERA}}": {"x", "y"}}."""
+    if valor is None:
+        return {}
+    if not isinstance(valor, dict):
+        raise ErrorRutas(f"Salida '{salida}': las condiciones deben ser un objeto JSON")
+    condiciones = {}
+    for nombre, valores in valor.items():
+        if not isinstance(valores, list):
+            valores = [valores]
+        condiciones[_marcador(nombre, salida)] = {str(v).strip().casefold() for v in valores}
+    return condiciones
+
+
+class Salida:
+    """Una salida del archivo de rutas: plantilla, modo y filas que le tocan."""
+
+    def __init__(self, nombre, plantilla, modo="individual", si=None, no=None, agrupar=None, carpeta=None):
+        if modo not in MODOS:
+            raise ErrorRutas(f"Salida '{nombre}': modo inválido '{modo}' (válidos: {', '.join(MODOS)})")
+        if agrupar and modo != "consolidado":
+            raise ErrorRutas(f"Salida '{nombre}': 'agrupar' solo se usa con el modo 'consolidado'")
+        self.nombre = nombre
+        self.plantilla = Path(plantilla)
+        self.modo = modo
+        self.si = _condiciones(si, nombre)
+        self.no = _condiciones(no, nombre)
+        self.agrupar = _marcador(agrupar, nombre) if agrupar else None
+        self.carpeta = carpeta or nombre
+
+    def mascara(self, columnas: dict) -> pd.Series:
+        """Filas (de columnas_de_contexto) que van a esta salida."""
+        indice = next(iter(columnas.values())).index
+        mascara = pd.Series(True, index=indice)
+        for marcador, valores in self.si.items():
+            mascara &= columnas[marcador].str.strip().str.casefold().isin(valores)
+        for marcador, valores in self.no.items():
+            mascara &= ~columnas[marcador].str.strip().str.casefold().isin(valores)
+        return mascara
+
+
+def cargar_rutas(ruta) -> list:
+    """Lee y valida el archivo JSON de rutas; devuelve la lista de Salida."""
+    ruta = Path(ruta)
+    try:
+        datos = json.loads(ruta.read_text(encoding="utf-8"))
+    except ValueError as e:
+        raise ErrorRutas(f"{ruta.name} no es un JSON válido: {e}") from None
+    salidas_json = datos.get("salidas") if isinstance(datos, dict) else None
+    if not salidas_json:
+        raise ErrorRutas(f"{ruta.name} debe tener una lista 'salidas' no vacía")
+
+    salidas, nombres = [], set()
+    for i, s in enumerate(salidas_json, start=1):
+        if not isinstance(s, dict) or "plantilla" not in s:
+            raise ErrorRutas(f"La salida {i} debe ser un objeto con 'plantilla'")
+        s = dict(s)
+        s.setdefault("nombre", Path(s["plantilla"]).stem)
+        if s["nombre"] in nombres:
+            raise ErrorRutas(f"Nombre de salida repetido: '{s['nombre']}'")
+        nombres.add(s["nombre"])
+        desconocidas = set(s) - {"nombre", "plantilla", "modo", "si", "no", "agrupar", "carpeta"}
+        if desconocidas:
+            raise ErrorRutas(f"Salida '{s['nombre']}': claves desconocidas {sorted(desconocidas)}")
+        s["plantilla"] = (ruta.parent / s["plantilla"]).resolve()
+        salidas.append(Salida(**s))
+    return salidas
@@ -0,0 +1,368 @@
+# -*- coding: utf-8 -*-
+"""
+Servicio HTTP local para generar notificaciones bajo demanda.
+
+Cada ejecución de app.py o app_unidoc.py paga el arranque del intérprete, la
+importación de pandas/python-docx y el análisis de la plantilla, aunque solo se
+necesiten unas pocas notificaciones. Este servicio se queda en memoria con las
+plantillas ya compiladas (caché LRU de varias plantillas) y la lista de
+estudiantes indexada por ID y cédula, de modo que cada petición solo renderiza
+y empaqueta el documento.
+
+    python servicio.py --puerto 8765
+
+Rutas:
+  GET  /salud                                  estado del servicio (JSON)
+  GET  /notificacion?id=<ID o cédula>[&plantilla=<archivo.docx>]
+  POST /notificacion  {"id": ...} o {"contexto": {...}}[, "plantilla": ...]
+  POST /lote          {"ids": [...]} o {"contextos": [...]}[, "plantilla": ...]
+
+/notificacion devuelve los bytes del .docx; /lote devuelve un .zip en
+streaming (transfer-encoding chunked) con un .docx por estudiante. En los
+contextos JSON las claves pueden escribirse con o sin llaves ("CEDULA" o
+"{{CEDULA}}"); los marcadores que falten quedan vacíos.
+"""
+
+import argparse
+import io
+import json
+import threading
+import time
+import zipfile
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from nombres import Nombrador, nombre_de_archivo
+from contexto import MARKERS, iterar_contextos
+from archivos import NIVEL_COMPRESION
+from escritor_docx import EscritorDocx
+from ingesta import leer_estudiantes
+from plantilla import PlantillaCompilada
+from reglas_validacion import MODO_POR_DEFECTO, agregar_argumentos
+from validacion import crear_validador
+
+BASE_DIR = Path(__file__).parent
+EXCEL_FILE = BASE_DIR / "otro.xlsx"
+TEMPLATE_DOCX = BASE_DIR / "plantilla.docx"
+
+TIPO_DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+# Plantillas compiladas que se mantienen en memoria a la vez
+MAX_PLANTILLAS = 4
+
+
+class ErrorPeticion(Exception):
+    """Error atribuible a la petición: se responde con `estado` y el mensaje."""
+
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+def _firma(ruta: Path):
+    info = ruta.stat()
+    return info.st_mtime_ns, info.st_size
+
+
+def normalizar_contexto(contexto):
+    """Contexto JSON → replacements con todas las claves de MARKERS."""
+    if not isinstance(contexto, dict):
+        raise ErrorPeticion(HTTPStatus.BAD_REQUEST, "El contexto debe ser un objeto JSON.")
+    replacements = dict.fromkeys(MARKERS, "")
+    for clave, valor in contexto.items():
+        clave = clave if clave.startswith("{{") else f"{{{{{clave}}}}}"
+        replacements[clave] = "" if valor is None else str(valor)
+    return replacements
+
+
+class _EnCache:
+    """Plantilla compilada con su escritor y el candado que serializa su uso."""
+
+    def __init__(self, ruta, compresion):
+        self.escritor = EscritorDocx(PlantillaCompilada(ruta), compresion)
+        self.candado = threading.Lock()
+
+    def renderizar(self, replacements) -> bytes:
+        # El documento de trabajo de la plantilla es compartido: uno a la vez
+        with self.candado:
+            return self.escritor.a_bytes(self.escritor.plantilla.renderizar(replacements))
+
+
+class Servicio:
+    """Estado del servicio: caché LRU de plantillas e índice de estudiantes."""
+
+    def __init__(self, excel=EXCEL_FILE, dir_plantillas=BASE_DIR, plantilla=TEMPLATE_DOCX,
+                 max_plantillas=MAX_PLANTILLAS, compresion=NIVEL_COMPRESION, validacion=MODO_POR_DEFECTO):
+        self.excel = Path(excel)
+        self.dir_plantillas = Path(dir_plantillas).resolve()
+        self.plantilla_por_defecto = Path(plantilla)
+        self.max_plantillas = max(1, max_plantillas)
+        self.compresion = compresion
+        self.validacion = validacion
+        self._validacion = []  # Resumen de la última validación del Excel
+        self._plantillas = OrderedDict()
+        self._candado_plantillas = threading.Lock()
+        self._estudiantes = {}
+        self._n_estudiantes = 0
+        self._firma_excel = None
+        self._candado_excel = threading.Lock()
+
+    # ---------- PLANTILLAS ----------
+    def _ruta_plantilla(self, nombre):
+        if not nombre:
+            return self.plantilla_por_defecto
+        ruta = (self.dir_plantillas / nombre).resolve()
+        # Solo archivos .docx dentro de la carpeta de plantillas
+        if ruta.parent != self.dir_plantillas or ruta.suffix.lower() != ".docx":
+            raise ErrorPeticion(HTTPStatus.BAD_REQUEST, f"Plantilla no permitida: {nombre}")
+        return ruta
+
+    def plantilla(self, nombre=None) -> _EnCache:
+        """Plantilla compilada (de la caché si el archivo no cambió)."""
+        ruta = self._ruta_plantilla(nombre)
+        try:
+            clave = (str(ruta), *_firma(ruta))
+        except OSError:
+            raise ErrorPeticion(HTTPStatus.NOT_FOUND, f"No se encuentra la plantilla: {ruta.name}") from None
+        with self._candado_plantillas:
+            en_cache = self._plantillas.get(clave)
+            if en_cache is not None:
+                self._plantillas.move_to_end(clave)
+                return en_cache
+            en_cache = _EnCache(ruta, self.compresion)
+            # Una versión anterior del mismo archivo ya no sirve
+            for vieja in [c for c in self._plantillas if c[0] == clave[0]]:
+                del self._plantillas[vieja]
+            self._plantillas[clave] = en_cache
+            while len(self._plantillas) > self.max_plantillas:
+                self._plantillas.popitem(last=False)
+            return en_cache
+
+    # ---------- ESTUDIANTES ----------
+    def _indice_estudiantes(self):
+        """Índice ID/cédula → replacements, recargado si el Excel cambió."""
+        with self._candado_excel:
+            firma = _firma(self.excel)
+            if firma != self._firma_excel:
+                indice, n = {}, 0
+                estudiantes = leer_estudiantes(self.excel)
+                # Misma validación que los scripts: cédulas con su 0 inicial y,
+                # en modo estricto, sin las filas con errores
+                validador = crear_validador(self.validacion)
+                if validador is not None:
+                    estudiantes = validador.validar(estudiantes)
+                    self._validacion = validador.resumen()
+                for n, replacements in enumerate(iterar_contextos(estudiantes), start=1):
+                    indice.setdefault(replacements["{{ID}}"], replacements)
+                    indice.setdefault(replacements["{{CEDULA}}"], replacements)
+                self._estudiantes, self._n_estudiantes, self._firma_excel = indice, n, firma
+            return self._estudiantes
+
+    def buscar(self, identificador):
+        """Replacements del estudiante con ese ID o cédula (también sin el 0 inicial)."""
+        indice = self._indice_estudiantes()
+        clave = str(identificador).strip()
+        replacements = indice.get(clave)
+        if replacements is None and len(clave) == 9 and clave.isdigit():
+            replacements = indice.get(clave.zfill(10))
+        if replacements is None:
+            raise ErrorPeticion(HTTPStatus.NOT_FOUND, f"No se encuentra el estudiante: {identificador}")
+        return replacements
+
+    def contexto_de(self, peticion):
+        """Replacements a partir de {"id": ...} o {"contexto": {...}}."""
+        if "contexto" in peticion:
+            return normalizar_contexto(peticion["contexto"])
+        if "id" in peticion:
+            return self.buscar(peticion["id"])
+        raise ErrorPeticion(HTTPStatus.BAD_REQUEST, "Indique 'id' o 'contexto'.")
+
+    def estado(self):
+        with self._candado_plantillas:
+            plantillas = [Path(c[0]).name for c in self._plantillas]
+        return {
+            "estado": "ok",
+            "excel": str(self.excel),
+            "estudiantes": self._n_estudiantes,
+            "validacion": self._validacion,
+            "plantillas_en_cache": plantillas,
+        }
+
+
+class _Fragmentado(io.RawIOBase):
+    """Salida HTTP con transfer-encoding chunked (para el zip en streaming)."""
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+
+    def writable(self):
+        return True
+
+    def write(self, datos):
+        if datos:
+            self.wfile.write(b"%X\r\n%s\r\n" % (len(datos), bytes(datos)))
+        return len(datos)
+
+    def terminar(self):
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class Manejador(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    servicio: Servicio = None
+
+    # ---------- RESPUESTAS ----------
+    def _responder(self, estado, cuerpo, tipo, encabezados=()):
+        self.send_response(estado)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(cuerpo)))
+        for nombre, valor in encabezados:
+            self.send_header(nombre, valor)
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def _json(self, estado, datos):
+        self._responder(estado, json.dumps(datos, ensure_ascii=False).encode("utf-8"),
+                        "application/json; charset=utf-8")
+
+    def _docx(self, replacements, nombre_plantilla, inicio):
+        datos = self.servicio.plantilla(nombre_plantilla).renderizar(replacements)
+        self._responder(HTTPStatus.OK, datos, TIPO_DOCX, [
+            ("Content-Disposition", f'attachment; filename="{nombre_de_archivo(replacements)}"'),
+            ("X-Tiempo-ms", f"{(time.perf_counter() - inicio) * 1000:.1f}"),
+        ])
+
+    def _lote(self, peticion):
+        # Todo lo que se puede comprobar antes del 200 se responde con un 400
+        if "contextos" in peticion:
+            clave, tipos, descripcion = "contextos", dict, "un objeto JSON"
+        elif "ids" in peticion:
+            clave, tipos, descripcion = "ids", (str, int), "un texto o un número"
+        else:
+            raise ErrorPeticion(HTTPStatus.BAD_REQUEST, "Indique 'ids' o 'contextos'.")
+        elementos = peticion[clave]
+        if not isinstance(elementos, list):
+            raise ErrorPeticion(HTTPStatus.BAD_REQUEST, f"'{clave}' debe ser una lista.")
+        for indice, elemento in enumerate(elementos):
+            if not isinstance(elemento, tipos) or isinstance(elemento, bool):
+                raise ErrorPeticion(HTTPStatus.BAD_REQUEST, f"{clave}[{indice}]: debe ser {descripcion}.")
+        plantilla = self.servicio.plantilla(peticion.get("plantilla"))
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/zip")
+        self.send_header("Content-Disposition", 'attachment; filename="notificaciones.zip"')
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        # Desde aquí ya no se puede enviar otro estado: los errores van al zip
+        self._salida = salida = _Fragmentado(self.wfile)
+        errores, nombrador = [], Nombrador()
+        # Los .docx ya están comprimidos: se guardan sin volver a comprimir
+        with zipfile.ZipFile(salida, "w", zipfile.ZIP_STORED) as zf:
+            for indice, elemento in enumerate(elementos):
+                try:
+                    if clave == "ids":
+                        replacements = self.servicio.buscar(elemento)
+                    else:
+                        replacements = normalizar_contexto(elemento)
+                    datos = plantilla.renderizar(replacements)
+                except Exception as e:
+                    # Una fila con datos inválidos no corta el lote
+                    errores.append(f"{clave}[{indice}]: {e}")
+                    continue
+                zf.writestr(nombrador.ruta(replacements), datos)
+            if errores:
+                zf.writestr("ERRORES.txt", "\n".join(errores) + "\n")
+        salida.terminar()
+        self._salida = None
+
+    # ---------- RUTAS ----------
+    def _atender(self, metodo):
+        inicio = time.perf_counter()
+        url = urlparse(self.path)
+        self._salida = None  # Cuerpo chunked en curso (encabezados ya enviados)
+        try:
+            if metodo == "GET" and url.path == "/salud":
+                self._json(HTTPStatus.OK, self.servicio.estado())
+            elif metodo == "GET" and url.path == "/notificacion":
+                parametros = {k: v[0] for k, v in parse_qs(url.query).items()}
+                if "id" not in parametros:
+                    raise ErrorPeticion(HTTPStatus.BAD_REQUEST, "Falta el parámetro 'id'.")
+                self._docx(self.servicio.buscar(parametros["id"]), parametros.get("plantilla"), inicio)
+            elif metodo == "POST" and url.path in ("/notificacion", "/lote"):
+                peticion = self._leer_json()
+                if url.path == "/lote":
+                    self._lote(peticion)
+                else:
+                    self._docx(self.servicio.contexto_de(peticion), peticion.get("plantilla"), inicio)
+            else:
+                raise ErrorPeticion(HTTPStatus.NOT_FOUND, f"Ruta desconocida: {metodo} {url.path}")
+        except Exception as e:
+            if self._salida is not None:
+                # El 200 ya salió: se cierra el cuerpo y la conexión, sin otro estado
+                self.log_error("Error a mitad de la respuesta: %s", e)
+                self.close_connection = True
+                try:
+                    self._salida.terminar()
+                except OSError:
+                    pass
+            elif isinstance(e, ErrorPeticion):
+                self._json(e.estado, {"error": str(e)})
+            else:
+                self._json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"Error inesperado: {e}"})
+
+    def _leer_json(self):
+        largo = int(self.headers.get("Content-Length") or 0)
+        try:
+            peticion = json.loads(self.rfile.read(largo) or b"{}")
+        except ValueError:
+            raise ErrorPeticion(HTTPStatus.BAD_REQUEST, "El cuerpo no es un JSON válido.") from None
+        if not isinstance(peticion, dict):
+            raise ErrorPeticion(HTTPStatus.BAD_REQUEST, "El cuerpo debe ser un objeto JSON.")
+        return peticion
+
+    def do_GET(self):
+        self._atender("GET")
+
+    def do_POST(self):
+        self._atender("POST")
+
+
+def servir(servicio, host="127.0.0.1", puerto=8765, precargar=True):
+    """Arranca el servidor (bloquea hasta Ctrl+C)."""
+    if precargar:
+        # Plantilla por defecto y Excel listos antes de la primera petición
+        servicio.plantilla()
+        servicio._indice_estudiantes()
+    manejador = type("ManejadorServicio", (Manejador,), {"servicio": servicio})
+    servidor = ThreadingHTTPServer((host, puerto), manejador)
+    print(f"Servicio de notificaciones en http://{host}:{servidor.server_port} (Ctrl+C para detener)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servicio HTTP local que genera notificaciones bajo demanda.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interfaz de escucha. Por defecto, 127.0.0.1 (solo local).")
+    parser.add_argument("-p", "--puerto", type=int, default=8765, help="Puerto. Por defecto, 8765.")
+    parser.add_argument("--excel", default=EXCEL_FILE, help="Excel de estudiantes. Por defecto, 'otro.xlsx'.")
+    parser.add_argument("--plantilla", default=TEMPLATE_DOCX,
+                        help="Plantilla por defecto. Por defecto, 'plantilla.docx'.")
+    parser.add_argument("--plantillas", default=BASE_DIR,
+                        help="Carpeta de las plantillas que se pueden pedir por nombre. Por defecto, la del script.")
+    parser.add_argument("--max_plantillas", type=int, default=MAX_PLANTILLAS,
+                        help=f"Plantillas compiladas en memoria a la vez. Por defecto, {MAX_PLANTILLAS}.")
+    parser.add_argument("--compresion", type=int, choices=range(10), default=NIVEL_COMPRESION, metavar="0-9",
+                        help=f"Nivel de compresión de los documentos. Por defecto, {NIVEL_COMPRESION}.")
+    agregar_argumentos(parser)
+    args = parser.parse_args()
+    servir(
+        Servicio(args.excel, args.plantillas, args.plantilla, args.max_plantillas, args.compresion, args.validacion),
+        args.host, args.puerto,
+    )
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Resumen por MIEMBRO DEL TRIBUNAL: un documento consolidado por profesor con
+todos los estudiantes que tiene asignados en TRL1, TRL2 o TRL3.
+
+En lugar de filtrar el Excel una vez por profesor, se arma un índice
+invertido (profesor → estudiantes) en una sola pasada por las filas; luego
+cada profesor se escribe con el mismo EscritorConsolidado de app_unidoc.py,
+repartiendo los profesores entre varios procesos.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+from plantilla import PlantillaCompilada
+from consolidado import EscritorConsolidado
+from archivos import NIVEL_COMPRESION
+from paralelo import normalizar_workers
+
+MARCADORES_TRIBUNAL = ("{{TRIBUNAL_1}}", "{{TRIBUNAL_2}}", "{{TRIBUNAL_3}}")
+
+# Plantilla compilada propia de cada proceso trabajador
+_plantilla = None
+_compresion = NIVEL_COMPRESION
+
+
+def normalizar_profesor(nombre) -> str:
+    """Nombre con los espacios normalizados ('' si la celda está vacía)."""
+    return " ".join(str(nombre).split())
+
+
+def indexar(contextos) -> dict:
+    """
+    Índice invertido en una sola pasada: profesor → lista de contextos de sus
+    estudiantes, en el orden del Excel. Los nombres se agrupan sin distinguir
+    mayúsculas; se conserva la forma en que aparecen por primera vez. Un
+    estudiante con el mismo profesor en dos puestos aparece una sola vez.
+    """
+    indice, nombres = {}, {}
+    for ctx in contextos:
+        vistos = set()
+        for marcador in MARCADORES_TRIBUNAL:
+            profesor = normalizar_profesor(ctx.get(marcador, ""))
+            clave = profesor.casefold()
+            if not profesor or clave in vistos:
+                continue
+            vistos.add(clave)
+            nombre = nombres.setdefault(clave, profesor)
+            indice.setdefault(nombre, []).append(ctx)
+    return indice
+
+
+def _inicializar(datos, compresion=NIVEL_COMPRESION):
+    """Inicializador de cada proceso: compila la plantilla una vez."""
+    global _plantilla, _compresion
+    _plantilla, _compresion = PlantillaCompilada(datos), compresion
+
+
+def _consolidar(tarea, plantilla=None, compresion=None):
+    """Escribe el documento de un profesor. Devuelve None o el mensaje de error."""
+    _, contextos, ruta_salida = tarea
+    try:
+        with EscritorConsolidado(plantilla or _plantilla, ruta_salida,
+                                 _compresion if compresion is None else compresion) as escritor:
+            for ctx in contextos:
+                escritor.agregar(ctx)
+    except Exception as e:
+        return str(e)
+    return None
+
+
+def generar_resumenes(plantilla, tareas, workers=1, compresion=NIVEL_COMPRESION):
+    """
+    Genera cada tarea (profesor, contextos, ruta_salida) y produce
+    (tarea, error) en el orden de envío; `error` es None si se guardó.
+
+    Los profesores con más estudiantes se envían primero para repartir mejor
+    la carga. Con workers=1 todo se hace en el proceso actual.
+    """
+    tareas = sorted(tareas, key=lambda t: len(t[1]), reverse=True)
+    workers = min(normalizar_workers(workers), max(len(tareas), 1))
+    if workers == 1:
+        for tarea in tareas:
+            yield tarea, _consolidar(tarea, plantilla, compresion)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_inicializar,
+                             initargs=(plantilla.datos, compresion)) as executor:
+        try:
+            yield from zip(tareas, executor.map(_consolidar, tareas))
+        except BaseException:
+            executor.shutdown(cancel_futures=True)
+            raise
@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+"""
+VALIDACIÓN del listado de estudiantes ANTES de renderizar.
+
+Todas las reglas se evalúan por columnas (vectorizadas, sin recorrer filas):
+
+- Cédula ecuatoriana: 10 dígitos (se recupera el 0 inicial que Excel pierde
+  al guardarla como número), provincia 01–24 o 30, tercer dígito menor que 6
+  y dígito verificador (módulo 10 con coeficientes 2,1,2,1...).
+- Duplicados por cédula (se conserva la primera aparición) y por ID, con
+  agrupación por hash (también entre bloques, en modo streaming).
+- Reglas por columna: ID, nombres y apellidos obligatorios; carrera, tema y
+  tribunal incompletos se informan como advertencia.
+
+Las filas con ERRORES se descartan antes de gastar tiempo en renderizarlas;
+las ADVERTENCIAS solo se informan (las reglas y los modos están en
+reglas_validacion.py). El resultado se guarda como JSON legible por máquina.
+Para revisar un Excel sin generar nada:
+
+    python validacion.py otro.xlsx -o validacion.json
+"""
+
+import argparse
+import json
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+
+from contexto import (
+    COL_CEDULA, COL_ID, COL_APELLIDOS, COL_NOMBRES, COL_CARRERA, COL_TEMA,
+    COL_TRIB1, COL_TRIB2, COL_TRIB3,
+)
+from archivos import escribir_atomico
+from perfilado import medir
+from reglas_validacion import ERROR, REGLAS
+
+_COEFICIENTES = np.array([2, 1, 2, 1, 2, 1, 2, 1, 2])
+_ID_VALIDO = re.compile(r"[A-Za-z0-9._/-]+")
+
+
+def _factorizar(serie: pd.Series, agrupar=False):
+    """
+    Códigos por fila y valores distintos (sin espacios en los extremos); las
+    celdas vacías o con solo espacios quedan con código -1. El trabajo con
+    texto se hace una vez por valor distinto, no por fila. Con agrupar=True,
+    los valores que solo difieren en los espacios comparten código.
+    """
+    codigos, unicos = pd.factorize(serie.to_numpy(dtype=object, na_value=None))
+    limpios = np.array([str(u).strip() for u in unicos.tolist()], dtype=object)
+    if agrupar:
+        nuevos, limpios = pd.factorize(limpios)
+        codigos = np.append(nuevos, -1)[codigos]
+        limpios = np.asarray(limpios, dtype=object)
+    vacios = np.append(limpios == "", True)
+    return np.where(vacios[codigos], -1, codigos), limpios
+
+
+def normalizar_cedulas(serie: pd.Series) -> pd.Series:
+    """Cédulas como texto de 10 dígitos cuando se puede (sin '.0' ni 0 inicial perdido)."""
+    if serie.dtype.kind in "iu":
+        cedulas = serie.astype(str)
+        nueve = (serie >= 10 ** 8) & (serie < 10 ** 9)
+    else:
+        cedulas = serie.fillna("").astype(str).str.strip().str.replace(r"\.0$", "", regex=True)
+        nueve = cedulas.str.fullmatch(r"\d{9}")
+    if nueve.any():
+        cedulas = cedulas.mask(nueve, cedulas.str.zfill(10))
+    return cedulas
+
+
+def revisar_cedulas(cedulas: pd.Series) -> dict:
+    """Máscaras (código → array bool) de las cédulas ya normalizadas que fallan."""
+    n = len(cedulas)
+    formato = np.zeros(n, dtype=bool)
+    estructura = np.zeros(n, dtype=bool)
+    verificador = np.zeros(n, dtype=bool)
+    largo10 = (cedulas.str.len() == 10).to_numpy()
+    if largo10.any():
+        # Matriz N×10 de dígitos directamente desde los bytes del texto
+        crudos = np.frombuffer(cedulas[largo10].str.cat().encode("ascii", "replace"), dtype=np.uint8)
+        digitos = crudos.reshape(-1, 10).astype(np.int64) - ord("0")
+        solo_digitos = ((digitos >= 0) & (digitos <= 9)).all(axis=1)
+        provincia = digitos[:, 0] * 10 + digitos[:, 1]
+        estructura_ok = (((provincia >= 1) & (provincia <= 24)) | (provincia == 30)) & (digitos[:, 2] < 6)
+        productos = digitos[:, :9] * _COEFICIENTES
+        productos = np.where(productos > 9, productos - 9, productos)
+        esperado = (10 - productos.sum(axis=1) % 10) % 10
+        formato[largo10] = solo_digitos
+        estructura[largo10] = solo_digitos & ~estructura_ok
+        verificador[largo10] = solo_digitos & estructura_ok & (esperado != digitos[:, 9])
+    return {
+        "cedula_formato": ~formato,
+        "cedula_estructura": estructura,
+        "cedula_verificador": verificador,
+    }
+
+
+class Validador:
+    """
+    Valida bloques de filas (ingesta.leer_estudiantes / iterar_bloques) y
+    acumula los problemas; los duplicados se detectan también entre bloques.
+    Con filtrar=False las filas con errores se informan pero no se descartan.
+    """
+
+    def __init__(self, filtrar=True):
+        self.filtrar = filtrar
+        self.filas = 0
+        self.excluidas = 0
+        self._cedulas = set()
+        self._ids = set()
+        self._problemas = []  # DataFrames por bloque
+
+    @staticmethod
+    def _repetidos(codigos, distintos, anteriores):
+        """Filas cuyo valor ya apareció antes, en este bloque o en los anteriores."""
+        repetidos = pd.Series(codigos).duplicated().to_numpy()
+        if anteriores:
+            vistos = np.array([v in anteriores for v in distintos] + [False], dtype=bool)
+            repetidos = repetidos | vistos[codigos]
+        anteriores.update(distintos.tolist())
+        return repetidos & (codigos >= 0)
+
+    def _reglas(self, df):
+        cedulas = normalizar_cedulas(df[COL_CEDULA])
+        mascaras = revisar_cedulas(cedulas)
+
+        # Duplicados: agrupación por hash (factorize) dentro del bloque y
+        # contra los valores de los bloques anteriores
+        codigos, distintos = pd.factorize(cedulas.to_numpy())
+        codigos = np.where(mascaras["cedula_formato"], -1, codigos)
+        mascaras["cedula_duplicada"] = self._repetidos(codigos, distintos, self._cedulas)
+
+        ids, ids_distintos = _factorizar(df[COL_ID], agrupar=True)
+        nombres, nombres_distintos = _factorizar(df[COL_NOMBRES])
+        apellidos, apellidos_distintos = _factorizar(df[COL_APELLIDOS])
+        mascaras["id_vacio"] = ids < 0
+        malos = np.array([not _ID_VALIDO.fullmatch(v) for v in ids_distintos] + [False], dtype=bool)
+        mascaras["id_formato"] = malos[ids]
+        mascaras["id_duplicado"] = self._repetidos(ids, ids_distintos, self._ids)
+
+        vacias = {col: _factorizar(df[col])[0] < 0 for col in (
+            COL_CARRERA, COL_TEMA, COL_TRIB1, COL_TRIB2, COL_TRIB3)}
+        mascaras["nombres_vacio"] = nombres < 0
+        mascaras["apellidos_vacio"] = apellidos < 0
+        mascaras["carrera_vacia"] = vacias[COL_CARRERA]
+        mascaras["tema_vacio"] = vacias[COL_TEMA]
+        mascaras["tribunal_incompleto"] = vacias[COL_TRIB1] | vacias[COL_TRIB2] | vacias[COL_TRIB3]
+
+        # Tabla de problemas: una fila por (fila del listado, regla incumplida);
+        # los textos solo se arman para las filas con problemas
+        partes = []
+        for codigo, mascara in mascaras.items():
+            posiciones = np.flatnonzero(mascara)
+            if len(posiciones):
+                partes.append(pd.DataFrame({"posicion": posiciones, "regla": codigo, "severidad": REGLAS[codigo][0]}))
+        if partes:
+            problemas = pd.concat(partes, ignore_index=True)
+            posiciones = problemas.pop("posicion").to_numpy()
+            texto = lambda codigos, distintos: np.append(distintos, "")[codigos[posiciones]]
+            # Número de fila en la hoja (índice que pone ingesta)
+            problemas.insert(0, "fila", df.index.to_numpy()[posiciones])
+            problemas.insert(1, "cedula", cedulas.to_numpy()[posiciones])
+            problemas.insert(2, "id", texto(ids, ids_distintos))
+            problemas.insert(3, "nombre", [
+                f"{n} {a}".strip() for n, a in zip(texto(nombres, nombres_distintos), texto(apellidos, apellidos_distintos))
+            ])
+            partes = [problemas]
+
+        errores = np.zeros(len(df), dtype=bool)
+        for codigo, mascara in mascaras.items():
+            if REGLAS[codigo][0] == ERROR:
+                errores |= mascara
+        return cedulas, errores, partes
+
+    def validar(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Valida un bloque; devuelve las filas a generar (sin las erróneas si filtrar)."""
+        if df.empty:
+            return df
+        with medir("validacion"):
+            cedulas, errores, partes = self._reglas(df)
+            self.filas += len(df)
+            self._problemas.extend(partes)
+            # La cédula normalizada (con su 0 inicial) es la que va al documento
+            df = df.assign(**{COL_CEDULA: cedulas.to_numpy()})
+            if not self.filtrar or not errores.any():
+                return df
+            self.excluidas += int(errores.sum())
+            return df[~errores]
+
+    @property
+    def ninguna_valida(self) -> bool:
+        """True si se validaron filas y todas quedaron excluidas."""
+        return bool(self.filas) and self.excluidas == self.filas
+
+    def problemas(self) -> pd.DataFrame:
+        """Todos los problemas encontrados, ordenados por fila."""
+        if not self._problemas:
+            return pd.DataFrame(columns=["fila", "cedula", "id", "nombre", "regla", "severidad"])
+        return pd.concat(self._problemas, ignore_index=True).sort_values("fila", kind="stable")
+
+    def informe(self) -> dict:
+        """Informe legible por máquina: totales, conteo por regla y detalle por fila."""
+        problemas = self.problemas()
+        conteos = problemas["regla"].value_counts()
+        return {
+            "filas": self.filas,
+            "excluidas": self.excluidas,
+            "filtrar": self.filtrar,
+            "reglas": {
+                codigo: {"severidad": sev, "descripcion": desc, "filas": int(conteos.get(codigo, 0))}
+                for codigo, (sev, desc) in REGLAS.items()
+            },
+            "problemas": problemas.to_dict("records"),
+        }
+
+    def resumen(self) -> list:
+        """Líneas de texto con las reglas incumplidas (para la consola o el log)."""
+        conteos = self.problemas()["regla"].value_counts()
+        lineas = []
+        for codigo, (severidad, descripcion) in REGLAS.items():
+            if conteos.get(codigo, 0):
+                lineas.append(f"{severidad.upper()}: {descripcion}: {conteos[codigo]} filas")
+        if self.excluidas:
+            lineas.append(f"Se excluyeron {self.excluidas} de {self.filas} filas con errores.")
+        return lineas
+
+    def guardar(self, ruta):
+        """Escribe el informe JSON (de forma atómica)."""
+        datos = json.dumps(self.informe(), ensure_ascii=False, indent=1, default=str)
+        escribir_atomico(ruta, datos.encode("utf-8"))
+        return ruta
+
+
+def crear_validador(modo):
+    """Validador para un modo de --validacion (reglas_validacion.MODOS); None con 'no'."""
+    return None if modo == "no" else Validador(filtrar=modo == "estricta")
+
+
+if __name__ == "__main__":
+    from ingesta import leer_estudiantes
+
+    parser = argparse.ArgumentParser(description="Valida el Excel de estudiantes sin generar documentos.")
+    parser.add_argument("excel", nargs="?", default="otro.xlsx", help="Archivo Excel. Por defecto, 'otro.xlsx'.")
+    parser.add_argument("-o", "--output", help="Guarda el informe JSON en esta ruta.")
+    args = parser.parse_args()
+
+    validador = Validador()
+    validas = validador.validar(leer_estudiantes(args.excel))
+    for linea in validador.resumen() or ["Sin problemas."]:
+        print(linea)
+    print(f"{len(validas)} de {validador.filas} filas listas para generar.")
+    if args.output:
+        print(f"Informe: {validador.guardar(args.output)}")
+    if validas.empty:
+        sys.exit(1)